@@ -0,0 +1,147 @@
+"""
+Member cache memory per policy on synthetic guilds.
+
+Builds a guild of real `discord.Member` objects, measures what the full
+cache holds, then trims it with `core.members.MemberCache` and measures
+what the kept members and the compact slots hold instead. Also times a
+humans/bots/boosters count from the counters against a member list scan.
+
+    python -m benchmarks.members [sizes] [policy]
+
+`sizes` is comma separated, 1000,100000,1000000 by default, `policy` is
+a MEMBER_CACHE_POLICY value, roles,voice,recent by default.
+"""
+
+import asyncio
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from discord import Guild, Intents, Member
+from discord.state import ConnectionState
+
+from core.members import MemberCache
+
+# Share of synthetic members with some role, a voice state, recent
+# activity, a bot account and a boost, roughly a large community server.
+ROLES = 0.3
+VOICE = 0.005
+RECENT = 0.02
+BOTS = 0.002
+BOOSTERS = 0.005
+
+JOINED_AT = "2023-05-01T12:00:00.000000+00:00"
+
+
+def payload(member_id: int, rng: random.Random) -> dict:
+    return {
+        "user": {
+            "id": str(member_id),
+            "username": f"member{member_id}",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": "a1b2c3d4e5f60718293a4b5c6d7e8f90" if rng.random() < 0.6 else None,
+            "bot": rng.random() < BOTS,
+        },
+        "roles": [str(10_000 + rng.randrange(40))] if rng.random() < ROLES else [],
+        "joined_at": JOINED_AT,
+        "premium_since": JOINED_AT if rng.random() < BOOSTERS else None,
+        "nick": None,
+        "pending": False,
+        "flags": 0,
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def build(size: int) -> Guild:
+    state = ConnectionState(
+        dispatch=lambda *args, **kwargs: None,
+        handlers={},
+        hooks={},
+        http=None,  # type: ignore
+        intents=Intents.all(),
+    )
+    guild = Guild(data={"id": "1", "name": "benchmark", "member_count": size}, state=state)  # type: ignore
+    rng = random.Random(size)
+    for member_id in range(1_000_000, 1_000_000 + size):
+        guild._add_member(Member(data=payload(member_id, rng), guild=guild, state=state))  # type: ignore
+
+    return guild
+
+
+class Unpinned:
+    async def get(self, guild_id: int) -> tuple:
+        return ()
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def scan(guild: Guild) -> tuple:
+    members = guild.members
+    bots = sum(1 for member in members if member.bot)
+    boosters = sum(1 for member in members if member.premium_since is not None)
+    return len(members) - bots, bots, boosters
+
+
+def timed(func, *args) -> float:
+    started = time.perf_counter_ns()
+    func(*args)
+    return (time.perf_counter_ns() - started) / 1000
+
+
+async def measure(size: int, policy: str) -> tuple:
+    tracemalloc.start()
+    baseline = traced()
+    guild = build(size)
+    full = traced() - baseline
+
+    bot = SimpleNamespace(guilds=[guild], user=None, forcenicks=Unpinned())
+    settings = SimpleNamespace(POLICY=policy, RECENT=3600, SWEEP_INTERVAL=300, SWEEP_BATCH=5000)
+    cache = MemberCache(bot, settings)
+    members = cache.index(guild)
+
+    now = int(time.time())
+    rng = random.Random(-size)
+    for member_id, slot in members.slots.items():  # type: ignore
+        if rng.random() < RECENT:
+            slot.seen = now
+        if rng.random() < VOICE:
+            guild._voice_states[member_id] = None  # type: ignore
+
+    scanned = timed(scan, guild)
+    await cache.sweep()
+    kept = len(guild._members)
+    trimmed = traced() - baseline
+    counted = timed(cache.counts, guild)
+
+    guild._members.clear()
+    slots = traced() - baseline
+    tracemalloc.stop()
+    return full, trimmed, slots, kept, scanned, counted
+
+
+async def main(sizes: list, policy: str) -> None:
+    print(f"policy {policy}")
+    print(
+        f"{'members':>10}{'full MiB':>11}{'trimmed MiB':>13}{'slots MiB':>11}"
+        f"{'kept':>10}{'B/member':>10}{'B/slot':>8}{'scan µs':>11}{'count µs':>10}"
+    )
+    for size in sizes:
+        full, trimmed, slots, kept, scanned, counted = await measure(size, policy)
+        print(
+            f"{size:>10,}{full / 2**20:>11.1f}{trimmed / 2**20:>13.1f}{slots / 2**20:>11.1f}"
+            f"{kept:>10,}{full / size:>10.0f}{slots / size:>8.0f}{scanned:>11.0f}{counted:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in (sys.argv[1] if len(sys.argv) > 1 else "1000,100000,1000000").split(",")]
+    policy = sys.argv[2] if len(sys.argv) > 2 else "roles,voice,recent"
+    asyncio.run(main(sizes, policy))
@@ -0,0 +1,73 @@
+"""
+Per-query tracing overhead in each sampling mode.
+
+Wraps a trivial coroutine the same way `core.database.Database` wraps
+a query and reports the added cost per call against an untraced baseline.
+
+    python -m benchmarks.tracing [iterations] [ratio]
+"""
+
+import asyncio
+import sys
+import time
+from typing import Optional, Sequence
+
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from utils.tracing import MODES, build_provider
+
+QUERY = "SELECT language FROM user_settings WHERE user_id = $1"
+
+
+class CountingExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.spans = 0
+
+    def export(self, spans: Sequence) -> SpanExportResult:
+        self.spans += len(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+async def query() -> int:
+    return 1
+
+
+async def run(tracer: Optional[object], iterations: int) -> float:
+    started = time.perf_counter_ns()
+    if tracer is None:
+        for _ in range(iterations):
+            await query()
+    else:
+        for _ in range(iterations):
+            with tracer.start_as_current_span("db_fetchval") as span:  # type: ignore
+                span.set_attribute("db.statement", QUERY)
+                await query()
+
+    return (time.perf_counter_ns() - started) / iterations
+
+
+async def main(iterations: int, ratio: float) -> None:
+    baseline = await run(None, iterations)
+    print(f"{'mode':<8}{'ns/query':>12}{'overhead':>12}{'exported':>12}")
+    print(f"{'none':<8}{baseline:>12.0f}{0:>12.0f}{0:>12}")
+
+    for mode in MODES:
+        exporter = CountingExporter()
+        provider = build_provider(mode, ratio, exporter)
+        elapsed = await run(provider.get_tracer("benchmark"), iterations)
+        provider.shutdown()
+        print(
+            f"{mode:<8}{elapsed:>12.0f}{elapsed - baseline:>12.0f}{exporter.spans:>12}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 0.01,
+        )
+    )
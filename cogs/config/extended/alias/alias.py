@@ -12,6 +12,7 @@ from discord.ext.commands import (
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.prefilter import accepts, in_guild
 from utils.tools.formatter import plural
 from managers.paginator import Paginator
 
@@ -39,6 +40,7 @@ class Alias(MixinMeta, metaclass=CompositeMetaClass):
         return not bool(search(r"\s", name)) and name.isprintable()
 
     @Cog.listener("on_message_without_command")
+    @accepts(in_guild)
     async def alias_listener(self, ctx: Context) -> None:
         """
         Invokes an alias if one is provided.
@@ -2,15 +2,17 @@ from __future__ import annotations
 
 from copy import copy
 from string import Formatter
-from typing import List, Optional, cast
+from typing import TYPE_CHECKING, List, Optional, cast
 
 from discord import Guild
 from discord.ext.commands import BadArgument
 from discord.ext.commands.view import ExpectedClosingQuoteError, StringView
 
-from main import Pride
 from core.context import Context
 
+if TYPE_CHECKING:
+    from core.bot import Pride
+
 
 class _TrackingFormatter(Formatter):
     def __init__(self):
@@ -103,7 +105,7 @@ class AliasEntry:
 
     @classmethod
     async def get(cls, guild: Guild, name: str) -> Optional[AliasEntry]:
-        bot = cast(Pride, guild._state._get_client())
+        bot = cast("Pride", guild._state._get_client())
 
         record = await bot.db.fetchrow(
             """
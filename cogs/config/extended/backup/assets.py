@@ -0,0 +1,214 @@
+import asyncio
+from base64 import b64decode
+from hashlib import sha256
+from logging import getLogger
+from os import replace, stat, utime
+from pathlib import Path
+from secrets import token_hex
+from time import time
+from typing import Dict, Iterable, List, Optional
+
+from asyncpg import Connection
+from discord import Asset
+
+from .types import DesignData
+
+log = getLogger("evict/backup")
+
+REFERENCE_PREFIX = "asset:"
+GRACE_PERIOD = 60 * 60
+
+
+def is_reference(value: Optional[str]) -> bool:
+    return bool(value) and value.startswith(REFERENCE_PREFIX)  # type: ignore
+
+
+def references(design: DesignData) -> List[str]:
+    """The digests a backup's design section points at."""
+
+    return [
+        value[len(REFERENCE_PREFIX) :]
+        for value in design.values()
+        if is_reference(value)  # type: ignore
+    ]
+
+
+class AssetStore:
+    """
+    Content-addressed blob store for guild backup assets.
+
+    Blobs live on local disk under their sha256 digest so identical
+    icons and banners are stored once no matter how many backups use them.
+    The `backup_assets` table counts references; blobs are only removed
+    by `collect` once nothing has referenced them for a grace period.
+
+    Writers store a blob before the backup referencing it is committed,
+    so `collect` can race a writer reusing a blob it just dropped. Every
+    write bumps the blob's mtime and the sweeper moves a blob aside
+    before checking it, putting back any blob a writer used since.
+    """
+
+    root: Path
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self.path_for(digest)
+        try:
+            # Unlike `touch`, never leaves an empty blob behind a sweep.
+            utime(path)
+            return
+        except FileNotFoundError:
+            pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{digest}.{token_hex(4)}.tmp")
+        tmp.write_bytes(data)
+        replace(tmp, path)
+
+    async def put(self, data: bytes) -> str:
+        digest = sha256(data).hexdigest()
+        await asyncio.to_thread(self._write, digest, data)
+        return digest
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        path = self.path_for(digest)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            log.warning("Backup asset %s is missing from the store.", digest)
+            return None
+
+    async def dump(self, assets: Dict[str, Optional[Asset]]) -> DesignData:
+        """
+        Fetch every asset concurrently and store it,
+        returning references in place of the raw data.
+        """
+
+        async def fetch(asset: Optional[Asset]) -> Optional[str]:
+            if not asset:
+                return None
+
+            return REFERENCE_PREFIX + await self.put(await asset.read())
+
+        values = await asyncio.gather(*(fetch(asset) for asset in assets.values()))
+        return dict(zip(assets.keys(), values))  # type: ignore
+
+    async def load(self, design: DesignData) -> Dict[str, bytes]:
+        """
+        Resolve a backup's design section into raw bytes,
+        accepting both references and legacy base64 payloads.
+        """
+
+        async def resolve(value: str) -> Optional[bytes]:
+            if is_reference(value):
+                return await self.get(value[len(REFERENCE_PREFIX) :])
+
+            return b64decode(value)
+
+        keys = [key for key, value in design.items() if value is not None]
+        values = await asyncio.gather(*(resolve(design[key]) for key in keys))  # type: ignore
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    async def retain(self, conn: Connection, digests: Iterable[str]) -> None:
+        digests = list(digests)
+        if not digests:
+            return
+
+        await conn.executemany(
+            """
+            INSERT INTO backup_assets (digest, refs)
+            VALUES ($1, 1)
+            ON CONFLICT (digest) DO UPDATE
+            SET refs = backup_assets.refs + 1,
+                updated_at = NOW()
+            """,
+            [(digest,) for digest in digests],
+        )
+
+    async def release(self, conn: Connection, digests: Iterable[str]) -> None:
+        digests = list(digests)
+        if not digests:
+            return
+
+        await conn.executemany(
+            """
+            UPDATE backup_assets
+            SET refs = GREATEST(refs - 1, 0),
+                updated_at = NOW()
+            WHERE digest = $1
+            """,
+            [(digest,) for digest in digests],
+        )
+
+    def _remove(self, path: Path, cutoff: float) -> bool:
+        """
+        Remove a blob unless it was written since `cutoff`.
+
+        The blob is renamed first, so a writer either finds it gone and
+        writes it again, or has bumped its mtime before the check.
+        """
+
+        aside = path.with_name(f"{path.name}.{token_hex(4)}.gc")
+        try:
+            replace(path, aside)
+        except FileNotFoundError:
+            return False
+
+        if stat(aside).st_mtime >= cutoff:
+            # Identical content either way, so overwriting a rewrite is fine.
+            replace(aside, path)
+            return False
+
+        aside.unlink()
+        return True
+
+    def _sweep(self, unreferenced: List[str], known: set[str]) -> int:
+        cutoff = time() - GRACE_PERIOD
+        removed = sum(self._remove(self.path_for(digest), cutoff) for digest in unreferenced)
+
+        if not self.root.exists():
+            return removed
+
+        # Blobs written for a backup which never got committed.
+        for path in self.root.glob("*/*/*"):
+            if path.name in known:
+                continue
+
+            try:
+                if stat(path).st_mtime < cutoff:
+                    removed += self._remove(path, cutoff)
+            except FileNotFoundError:
+                continue
+
+        return removed
+
+    async def collect(self, pool) -> int:
+        """Remove blobs which are no longer referenced by any backup."""
+
+        unreferenced = [
+            record["digest"]
+            for record in await pool.fetch(
+                """
+                DELETE FROM backup_assets
+                WHERE refs <= 0
+                AND updated_at < NOW() - make_interval(secs => $1)
+                RETURNING digest
+                """,
+                float(GRACE_PERIOD),
+            )
+        ]
+        known = {
+            record["digest"]
+            for record in await pool.fetch("SELECT digest FROM backup_assets")
+        }
+
+        removed = await asyncio.to_thread(self._sweep, unreferenced, known)
+        if removed:
+            log.info("Collected %s unreferenced backup assets.", removed)
+
+        return removed
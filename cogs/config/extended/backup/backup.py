@@ -2,18 +2,25 @@ from contextlib import suppress
 from json import dumps
 from logging import getLogger
 from secrets import token_urlsafe
+from time import monotonic
 from typing import Optional, cast
 
 from discord import Embed, HTTPException, Message
-from discord.ext.commands import BucketType, cooldown, group
+from discord.ext.commands import BucketType, group
+from discord.ext.tasks import loop
 from discord.utils import format_dt
 
 from cogs.config.extended.security.antinuke import Settings
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.cooldowns import cooldown
 from managers.paginator import Paginator
 
+import config
+
+from .assets import AssetStore, references
 from .models import BackupLoader, BackupViewer, dump
+from .planner import RestorePlan, summarize
 from .types import BooleanArgs
 
 log = getLogger("evict/backup")
@@ -42,13 +49,29 @@ class Backup(MixinMeta, metaclass=CompositeMetaClass):
         #         data["total_size"],
         #     )
 
+        self.assets = AssetStore(config.BACKUP.ASSET_ROOT)
+        if self.bot.cluster_id == 0:
+            self.collect_assets.start()
+
         self.bot.add_check(self.check_backup_restrictions)
         return await super().cog_load()
 
     async def cog_unload(self) -> None:
+        self.collect_assets.cancel()
         self.bot.remove_check(self.check_backup_restrictions)
         return await super().cog_unload()
 
+    @loop(hours=6)
+    async def collect_assets(self) -> None:
+        """
+        Remove backup assets which no backup references anymore.
+        """
+
+        try:
+            await self.assets.collect(self.bot.db)
+        except Exception as exc:
+            log.error("Failed to collect backup assets: %s", exc)
+
     async def check_backup_restrictions(self, ctx: Context) -> bool:
         """
         Check the restrictions for the backup command.
@@ -99,20 +122,36 @@ class Backup(MixinMeta, metaclass=CompositeMetaClass):
 
         async with ctx.typing():
             key = token_urlsafe(12)
-            backup = await dump(ctx.guild)
-
-            await self.bot.db.execute(
-                """
-                INSERT INTO backup (key, guild_id, user_id, data)
-                VALUES ($1, $2, $3, $4)
-                ON CONFLICT (key, guild_id) DO UPDATE
-                SET data = EXCLUDED.data
-                """,
-                key,
-                ctx.guild.id,
-                ctx.author.id,
-                (dumps(backup).encode()).decode(),
-            )
+            backup = await dump(ctx.guild, self.assets)
+
+            async with self.bot.db.acquire() as conn, conn.transaction():
+                replaced = await conn.fetchval(
+                    """
+                    SELECT data
+                    FROM backup
+                    WHERE key = $1
+                    AND guild_id = $2
+                    FOR UPDATE
+                    """,
+                    key,
+                    ctx.guild.id,
+                )
+                if replaced is not None:
+                    await self.assets.release(conn, BackupViewer(replaced).assets)
+
+                await self.assets.retain(conn, references(backup["design"]))
+                await conn.execute(
+                    """
+                    INSERT INTO backup (key, guild_id, user_id, data)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (key, guild_id) DO UPDATE
+                    SET data = EXCLUDED.data
+                    """,
+                    key,
+                    ctx.guild.id,
+                    ctx.author.id,
+                    dumps(backup),
+                )
 
         if ctx.author.is_on_mobile():
             with suppress(HTTPException):
@@ -209,17 +248,41 @@ class Backup(MixinMeta, metaclass=CompositeMetaClass):
             "\n".join(warnings),
         )
 
-        backup = BackupLoader(self.bot, ctx.guild, record["data"])
+        backup = BackupLoader(self.bot, ctx.guild, record["data"], self.assets, key)
+
+        message = await ctx.neutral(f"Preparing to load backup `{key}`..")
+        last_update = 0.0
+
+        async def report(plan: RestorePlan) -> None:
+            nonlocal last_update
+            if monotonic() - last_update < 5 or plan.done == plan.total:
+                return
+
+            last_update = monotonic()
+            with suppress(HTTPException):
+                await ctx.neutral(
+                    f"Loading backup `{key}`.. ({plan.done}/{plan.total} steps)",
+                    patch=message,
+                )
 
-        await ctx.neutral(f"Preparing to load backup `{key}`..")
-        await backup.load(ctx.author, options)
+        plan = await backup.load(ctx.author, options, on_progress=report)
 
         if ctx.guild.text_channels:
+            description = "Successfully  loaded the backup"
+            if plan.failed:
+                description = "\n".join(
+                    [
+                        "Loaded the backup with some failures",
+                        *summarize(plan),
+                        f"Run `{ctx.prefix}backup restore {key}` again to retry them",
+                    ]
+                )
+
             return await ctx.guild.text_channels[0].send(
                 content=ctx.author.mention,
                 embed=Embed(
                     title="Backup Loaded",
-                    description="Successfully  loaded the backup",
+                    description=description,
                 ),
                 delete_after=10,
             )
@@ -234,17 +297,21 @@ class Backup(MixinMeta, metaclass=CompositeMetaClass):
         Remove a restore point.
         """
 
-        result = await self.bot.db.execute(
-            """
-            DELETE FROM backup
-            WHERE key = $1
-            AND user_id = $2
-            """,
-            key,
-            ctx.author.id,
-        )
-        if result == "DELETE 0":
-            return await ctx.warn("You don't have a backup with that identifier!")
+        async with self.bot.db.acquire() as conn, conn.transaction():
+            data = await conn.fetchval(
+                """
+                DELETE FROM backup
+                WHERE key = $1
+                AND user_id = $2
+                RETURNING data
+                """,
+                key,
+                ctx.author.id,
+            )
+            if data is None:
+                return await ctx.warn("You don't have a backup with that identifier!")
+
+            await self.assets.release(conn, BackupViewer(data).assets)
 
         return await ctx.approve(
             f"Successfully  removed the restore point with key `{key}`"
@@ -1,10 +1,10 @@
 import asyncio
-from asyncio import Semaphore
-from base64 import b64decode, b64encode
 from contextlib import suppress
+from functools import partial
 from json import loads
 from logging import getLogger
-from typing import Any, Coroutine, Dict, List, Optional
+from time import monotonic
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
 
 from discord import (
     CategoryChannel,
@@ -14,7 +14,6 @@ from discord import (
     Guild,
     HTTPException,
     Member,
-    NotFound,
     Object,
     PermissionOverwrite,
     Permissions,
@@ -23,35 +22,31 @@ from discord import (
     TextChannel,
     VerificationLevel,
 )
-from discord.utils import get
 
-from main import Pride
 from utils.tools import capture_time
 
-from .types import BackupData, BooleanArgs
+from .assets import AssetStore, references
+from .planner import ProgressCallback, RestoreCheckpoint, RestorePlan, RestoreStep
+from .types import BackupData, BooleanArgs, CategoryData, ChannelData, RoleData
+
+if TYPE_CHECKING:
+    from core.bot import Pride
+
 
 log = getLogger("evict/backup")
 
 
-async def dump(guild: Guild) -> BackupData:
+async def dump(guild: Guild, assets: AssetStore) -> BackupData:
     return {
         "name": guild.name,
-        "design": {
-            "icon": (
-                b64encode(await guild.icon.read()).decode() if guild.icon else None
-            ),
-            "banner": (
-                b64encode(await guild.banner.read()).decode() if guild.banner else None
-            ),
-            "splash": (
-                b64encode(await guild.splash.read()).decode() if guild.splash else None
-            ),
-            "discovery_splash": (
-                b64encode(await guild.discovery_splash.read()).decode()
-                if guild.discovery_splash
-                else None
-            ),
-        },
+        "design": await assets.dump(
+            {
+                "icon": guild.icon,
+                "banner": guild.banner,
+                "splash": guild.splash,
+                "discovery_splash": guild.discovery_splash,
+            }
+        ),
         "afk_channel": guild._afk_channel_id,
         "afk_timeout": guild.afk_timeout,
         "verification_level": guild.verification_level.value,
@@ -127,10 +122,11 @@ class BackupViewer:
         return self.data["name"]
 
     @property
-    def icon(self) -> Optional[bytes]:
-        buffer = self.data["design"]["icon"]
-        if buffer:
-            return b64decode(buffer)
+    def assets(self) -> List[str]:
+        return references(self.data["design"])
+
+    async def icon(self, assets: AssetStore) -> Optional[bytes]:
+        return (await assets.load({"icon": self.data["design"]["icon"]})).get("icon")  # type: ignore
 
     def emoji(self, _type: int) -> str:
         if _type == ChannelType.voice.value:
@@ -179,81 +175,276 @@ class BackupLoader:
     guild: Guild
     data: BackupData
     options: BooleanArgs
-    semaphore: Semaphore
     reason: str
     id_translator: dict[int, int]
+    plan: Optional[RestorePlan]
 
-    def __init__(self, bot: "Pride", guild: Guild, data: str):
+    def __init__(
+        self,
+        bot: "Pride",
+        guild: Guild,
+        data: str,
+        assets: AssetStore,
+        key: str = "manual",
+    ):
         self.bot = bot
         self.guild = guild
         self.data = loads(data)
+        self.assets = assets
         self.options = BooleanArgs([])
-        self.semaphore = Semaphore(4)
         self.reason = "Backup loaded by evict"
         self.id_translator = {}
+        self.plan = None
+        self.checkpoint = RestoreCheckpoint(bot.redis, guild.id, key)
+        self._last_checkpoint = 0.0
+        self._checkpointed = 0
 
-    async def get_overwrites(self, data: dict[str, dict[str, Optional[bool]]]):
+    def get_overwrites(
+        self,
+        data: dict[str, dict[str, Optional[bool]]],
+    ) -> Dict[Member | Role, PermissionOverwrite]:
         overwrites: Dict[Member | Role, PermissionOverwrite] = {}
         for union_id, overwrite in data.items():
-            try:
-                union = await self.guild.fetch_member(int(union_id))
-            except NotFound:
-                union = get(self.guild.roles, id=self.id_translator.get(int(union_id)))
-
+            union = self.guild.get_member(int(union_id)) or self.guild.get_role(
+                self.id_translator.get(int(union_id), 0)
+            )
             if union:
                 overwrites[union] = PermissionOverwrite(**overwrite)
 
         return overwrites
 
-    async def run_tasks(
+    def _role_dependencies(
         self,
-        coros: List[Coroutine[Any, Any, None]],
-        wait: bool = False,
-    ) -> None:
-        async def exec(_coro: Coroutine[Any, Any, None]) -> None:
-            try:
-                await _coro
-            except Exception:
-                ...
-            finally:
-                self.semaphore.release()
-
-        tasks: List[asyncio.Task] = []
-        for coro in coros:
-            await self.semaphore.acquire()
-            tasks.append(self.bot.loop.create_task(exec(coro)))
-
-        if wait and tasks:
-            await asyncio.wait(tasks)
-
-    async def prepare(self):
+        overwrites: dict[str, dict[str, Optional[bool]]],
+    ) -> List[str]:
+        return [f"role:{union_id}" for union_id in overwrites]
+
+    def plan_prepare(self, plan: RestorePlan) -> str:
+        steps: List[str] = []
+        restored = set(self.id_translator.values())
+
         if self.options.roles:
-            log.debug("Deleting roles for %s (%s).", self.guild, self.guild.id)
             for role in self.guild.roles:
-                if not role.is_assignable():
+                if not role.is_assignable() or role.id in restored:
                     continue
 
-                with suppress(HTTPException):
-                    await role.delete(reason=self.reason)
+                steps.append(
+                    plan.add(
+                        f"delete:role:{role.id}",
+                        "roles",
+                        partial(role.delete, reason=self.reason),
+                    )
+                )
 
         if self.options.channels:
-            log.debug("Deleting channels for %s (%s).", self.guild, self.guild.id)
+            community_channels = [
+                channel.id
+                for channel in (
+                    self.guild.public_updates_channel,
+                    self.guild.rules_channel,
+                )
+                if channel and channel.id not in restored
+            ]
+            community = (
+                plan.add(
+                    "community:disable",
+                    "guild",
+                    partial(self.guild.edit, community=False, reason=self.reason),
+                )
+                if community_channels
+                else None
+            )
+
             for channel in self.guild.channels:
-                with suppress(HTTPException):
-                    if channel in (
-                        self.guild.public_updates_channel,
-                        self.guild.rules_channel,
-                    ):
-                        await self.guild.edit(community=False)
+                if channel.id in restored:
+                    continue
 
-                    await channel.delete(reason=self.reason)
+                steps.append(
+                    plan.add(
+                        f"delete:channel:{channel.id}",
+                        "channels",
+                        partial(channel.delete, reason=self.reason),
+                        depends=(
+                            [community]
+                            if community and channel.id in community_channels
+                            else ()
+                        ),
+                    )
+                )
 
-    async def load_settings(self):
-        design: dict[str, bytes] = {
-            key: b64decode(value)  # type: ignore
-            for key, value in self.data["design"].items()
-            if value is not None
+        return plan.barrier("prepare", steps)
+
+    async def restore_role(self, data: RoleData) -> None:
+        kwargs = {
+            "name": data["name"],
+            "hoist": data["hoist"],
+            "mentionable": data["mentionable"],
+            "color": Color(data["color"]),
+            "permissions": Permissions(data["permissions"]),
+            "reason": self.reason,
         }
+        role: Optional[Role] = None
+        if data["default"]:
+            kwargs.pop("name")
+            role = self.guild.default_role
+
+        elif data["premium"]:
+            role = self.guild.premium_subscriber_role
+
+        if not role:
+            role = await asyncio.wait_for(self.guild.create_role(**kwargs), 10)
+
+        elif role.is_assignable():
+            await role.edit(**kwargs)
+
+        self.id_translator[data["id"]] = role.id
+
+    async def restore_role_positions(self) -> None:
+        """
+        Roles are created concurrently, so their order is
+        restored afterwards in a single bulk request.
+        """
+
+        roles = [
+            role
+            for data in sorted(self.data["roles"], key=lambda data: data["position"])
+            if (role := self.guild.get_role(self.id_translator.get(data["id"], 0)))
+            and role.is_assignable()
+        ]
+        if roles:
+            await self.guild.edit_role_positions(
+                {role: position for position, role in enumerate(roles, start=1)},
+                reason=self.reason,
+            )
+
+    async def restore_member_roles(self, member_id: int, role_ids: List[int]) -> None:
+        member = self.guild.get_member(member_id)
+        roles = [
+            role
+            for role_id in role_ids
+            if (role := self.guild.get_role(self.id_translator.get(role_id, 0)))
+        ]
+        if member and roles:
+            await member.add_roles(*roles, reason=self.reason)
+
+    def plan_roles(self, plan: RestorePlan, after: str) -> List[str]:
+        steps: List[str] = []
+        members: Dict[int, List[int]] = {}
+
+        for data in reversed(self.data["roles"]):
+            steps.append(
+                plan.add(
+                    f"role:{data['id']}",
+                    "roles",
+                    partial(self.restore_role, data),
+                    depends=[after],
+                )
+            )
+            if data["default"] or data["premium"]:
+                continue
+
+            for member_id in data["members"]:
+                members.setdefault(member_id, []).append(data["id"])
+
+        steps.append(plan.add("role:positions", "roles", self.restore_role_positions, steps))
+        for member_id, role_ids in members.items():
+            plan.add(
+                f"member:{member_id}",
+                "members",
+                partial(self.restore_member_roles, member_id, role_ids),
+                depends=[f"role:{role_id}" for role_id in role_ids],
+            )
+
+        return steps
+
+    async def restore_category(self, data: CategoryData) -> None:
+        category = await self.guild.create_category(
+            name=data["name"],
+            overwrites=self.get_overwrites(data["overwrites"]),
+            reason=self.reason,
+        )
+        self.id_translator[data["id"]] = category.id
+
+    async def restore_channel(self, data: ChannelData) -> None:
+        coro = (
+            self.guild.create_voice_channel
+            if data["type"] == ChannelType.voice.value
+            else (
+                self.guild.create_stage_channel
+                if data["type"] == ChannelType.stage_voice.value
+                else self.guild.create_text_channel
+            )
+        )
+
+        kwargs = {
+            "name": data["name"],
+            "overwrites": self.get_overwrites(data["overwrites"]),
+            "position": data["position"],
+            "reason": self.reason,
+        }
+        if (
+            data["category_id"]
+            and (
+                channel := self.guild.get_channel(
+                    self.id_translator.get(data["category_id"])  # type: ignore
+                )
+            )
+            and isinstance(channel, CategoryChannel)
+        ):
+            kwargs["category"] = channel
+
+        for key, value in (
+            ("topic", data["topic"]),
+            ("nsfw", data["nsfw"]),
+            ("slowmode_delay", data["slowmode_delay"]),
+            (
+                "bitrate",
+                (
+                    data["bitrate"]
+                    if data["bitrate"] and data["bitrate"] <= self.guild.bitrate_limit
+                    else None
+                ),
+            ),
+            ("user_limit", data["user_limit"]),
+        ):
+            if not value:
+                continue
+
+            kwargs[key] = value
+
+        channel = await coro(**kwargs)
+        self.id_translator[data["id"]] = channel.id
+
+    def plan_channels(self, plan: RestorePlan, after: str) -> List[str]:
+        steps: List[str] = []
+        for data in self.data["categories"]:
+            steps.append(
+                plan.add(
+                    f"category:{data['id']}",
+                    "channels",
+                    partial(self.restore_category, data),
+                    depends=[after, *self._role_dependencies(data["overwrites"])],
+                )
+            )
+
+        for data in self.data["channels"]:
+            depends = [after, *self._role_dependencies(data["overwrites"])]
+            if data["category_id"]:
+                depends.append(f"category:{data['category_id']}")
+
+            steps.append(
+                plan.add(
+                    f"channel:{data['id']}",
+                    "channels",
+                    partial(self.restore_channel, data),
+                    depends=depends,
+                )
+            )
+
+        return steps
+
+    async def load_settings(self):
+        design = await self.assets.load(self.data["design"])
 
         rules_channel: TextChannel = self.guild.get_channel(
             self.id_translator.get(self.data["rules_channel"])  # type: ignore
@@ -287,169 +478,112 @@ class BackupLoader:
             reason=self.reason,
         )
 
-        if "COMMUNITY" in self.guild.features:
-            for data in self.data["channels"]:
-                if data["type"] not in (
-                    ChannelType.news.value,
-                    ChannelType.forum.value,
-                    ChannelType.media.value,
-                ):
-                    continue
-
-                channel = self.guild.get_channel(self.id_translator.get(data["id"]))  # type: ignore
-                if not channel:
-                    continue
-
-                with suppress(HTTPException):
-                    await channel.edit(type=ChannelType(data["type"]))  # type: ignore
-
-    async def load_roles(self):
-        tasks: List[Coroutine[Any, Any, None]] = []
-        members: Dict[Member, List[Role]] = {}
-
-        for data in reversed(self.data["roles"]):
-            kwargs = {
-                "name": data["name"],
-                "hoist": data["hoist"],
-                "mentionable": data["mentionable"],
-                "color": Color(data["color"]),
-                "permissions": Permissions(data["permissions"]),
-                "reason": self.reason,
-            }
-            role: Optional[Role] = None
-            if data["default"]:
-                kwargs.pop("name")
-                role = self.guild.default_role
-
-            elif data["premium"]:
-                role = self.guild.premium_subscriber_role
-
-            with suppress(HTTPException):
-                if role and role.is_assignable():
-                    await role.edit(**kwargs)
-
-                elif not role:
-                    try:
-                        role = await asyncio.wait_for(
-                            self.guild.create_role(**kwargs), 10
-                        )
-                    except asyncio.TimeoutError:
-                        break
-
-                    for member_id in data["members"]:
-                        member = self.guild.get_member(member_id)
-                        if not member:
-                            continue
+    async def restore_channel_type(self, data: ChannelData) -> None:
+        if "COMMUNITY" not in self.guild.features:
+            return
 
-                        if member not in members:
-                            members[member] = []
+        channel = self.guild.get_channel(self.id_translator.get(data["id"]))  # type: ignore
+        if channel:
+            await channel.edit(type=ChannelType(data["type"]))  # type: ignore
 
-                        members[member].append(role)
+    def plan_settings(self, plan: RestorePlan, after: List[str]) -> None:
+        settings = plan.add("settings", "guild", self.load_settings, depends=after)
+        for data in self.data["channels"]:
+            if data["type"] not in (
+                ChannelType.news.value,
+                ChannelType.forum.value,
+                ChannelType.media.value,
+            ):
+                continue
 
-                self.id_translator[data["id"]] = role.id
+            plan.add(
+                f"channel:type:{data['id']}",
+                "channels",
+                partial(self.restore_channel_type, data),
+                depends=[settings],
+            )
+
+    def plan_bans(self, plan: RestorePlan) -> None:
+        for user_id, reason in self.data["bans"].items():
+            plan.add(
+                f"ban:{user_id}",
+                "bans",
+                partial(self.guild.ban, Object(int(user_id)), reason=reason),
+            )
+
+    async def _checkpoint_step(self, step: RestoreStep) -> None:
+        """
+        Steps which created a role or channel are saved right away,
+        a resume would otherwise create them a second time.
+        Everything else is safe to repeat, so those saves are throttled.
+        """
+
+        created = len(self.id_translator) != self._checkpointed
+        if not created and monotonic() - self._last_checkpoint < 2:
+            return
+
+        self._last_checkpoint = monotonic()
+        self._checkpointed = len(self.id_translator)
+        await self.checkpoint.save(self.plan.completed, self.id_translator)  # type: ignore
+
+    def build_plan(self, completed: Set[str]) -> RestorePlan:
+        plan = RestorePlan(completed=completed)
+        prepared = self.plan_prepare(plan)
+
+        after: List[str] = [prepared]
+        if self.options.roles:
+            after.extend(self.plan_roles(plan, prepared))
 
-        tasks.extend(
-            member.add_roles(*roles, reason=self.reason)
-            for member, roles in members.items()
-        )
-        await self.run_tasks(tasks)
+        if self.options.channels:
+            after.extend(self.plan_channels(plan, prepared))
 
-    async def load_categories(self):
-        for data in self.data["categories"]:
-            with suppress(HTTPException):
-                overwrites = await self.get_overwrites(data["overwrites"])
-                category = await self.guild.create_category(
-                    name=data["name"],
-                    overwrites=overwrites,
-                    reason=self.reason,
-                )
+        if self.options.settings:
+            self.plan_settings(plan, after)
 
-                self.id_translator[data["id"]] = category.id
+        if self.options.bans:
+            self.plan_bans(plan)
 
-    async def load_channels(self):
-        await self.load_categories()
+        return plan
 
-        for data in self.data["channels"]:
-            try:
-                overwrites = await self.get_overwrites(data["overwrites"])
-                coro = (
-                    self.guild.create_voice_channel
-                    if data["type"] == ChannelType.voice.value
-                    else (
-                        self.guild.create_stage_channel
-                        if data["type"] == ChannelType.stage_voice.value
-                        else self.guild.create_text_channel
-                    )
-                )
-
-                kwargs = {
-                    "name": data["name"],
-                    "overwrites": overwrites,
-                    "position": data["position"],
-                    "reason": self.reason,
-                }
-                if (
-                    data["category_id"]
-                    and (
-                        channel := self.guild.get_channel(
-                            self.id_translator.get(data["category_id"])  # type: ignore
-                        )
-                    )
-                    and isinstance(channel, CategoryChannel)
-                ):
-                    kwargs["category"] = channel
-
-                for key, value in (
-                    ("topic", data["topic"]),
-                    ("nsfw", data["nsfw"]),
-                    ("slowmode_delay", data["slowmode_delay"]),
-                    (
-                        "bitrate",
-                        (
-                            data["bitrate"]
-                            if data["bitrate"]
-                            and data["bitrate"] <= self.guild.bitrate_limit
-                            else None
-                        ),
-                    ),
-                    ("user_limit", data["user_limit"]),
-                ):
-                    if not value:
-                        continue
-
-                    kwargs[key] = value
-
-                channel = await coro(**kwargs)
-                self.id_translator[data["id"]] = channel.id
-            except HTTPException as exc:
-                log.error(exc)
-
-    async def load_bans(self):
-        tasks = [
-            self.guild.ban(Object(int(user_id)), reason=reason)
-            for user_id, reason in self.data["bans"].items()
-        ]
-        await self.run_tasks(tasks)
-
-    async def load(self, loader: Member, options: BooleanArgs):
+    async def load(
+        self,
+        loader: Member,
+        options: BooleanArgs,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> RestorePlan:
         self.options = options
         self.reason = f"Backup loaded by {loader}"
 
-        log.info("Loading backup for %s (%s).", self.guild, self.guild.id)
+        completed, self.id_translator = await self.checkpoint.load()
+        self._checkpointed = len(self.id_translator)
+        if completed:
+            log.info(
+                "Resuming backup for %s (%s) with %s completed steps.",
+                self.guild,
+                self.guild.id,
+                len(completed),
+            )
+
+        if not self.guild.chunked:
+            with suppress(HTTPException, asyncio.TimeoutError):
+                await self.guild.chunk(cache=True)
+
+        self.plan = plan = self.build_plan(completed)
+        log.info(
+            "Loading backup for %s (%s) in %s steps.",
+            self.guild,
+            self.guild.id,
+            plan.total,
+        )
         with capture_time(
             f"Finished loading backup for {self.guild} ({self.guild.id})",
             log,
         ):
-            await self.prepare()
-            steps = [
-                ("roles", self.load_roles),
-                ("channels", self.load_channels),
-                ("settings", self.load_settings),
-                ("bans", self.load_bans),
-            ]
-            for option, coro in steps:
-                if self.options.get(option):
-                    log.debug(
-                        "Loading %s for %s (%s).", option, self.guild, self.guild.id
-                    )
-                    await coro()
+            await plan.run(on_progress=on_progress, on_complete=self._checkpoint_step)
+
+        if plan.failed:
+            await self.checkpoint.save(plan.completed, self.id_translator)
+        else:
+            await self.checkpoint.clear()
+
+        return plan
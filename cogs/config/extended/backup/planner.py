@@ -0,0 +1,234 @@
+import asyncio
+from json import dumps, loads
+from logging import getLogger
+from time import monotonic
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Iterable, List, Optional, Set
+
+log = getLogger("evict/backup")
+
+ROUTE_BUDGETS: Dict[str, int] = {
+    "guild": 1,
+    "roles": 2,
+    "channels": 3,
+    "members": 5,
+    "bans": 5,
+}
+CHECKPOINT_TTL = 60 * 60 * 24
+
+ProgressCallback = Callable[["RestorePlan"], Awaitable[None]]
+
+
+class RestoreStep:
+    """
+    A single API operation in a restore, keyed so it can be
+    recognised again when a restore is resumed.
+    """
+
+    __slots__ = ("key", "route", "factory", "depends", "dependents", "status")
+
+    key: str
+    route: str
+    factory: Callable[[], Coroutine[Any, Any, Any]]
+    depends: Set[str]
+    dependents: Set[str]
+    status: str
+
+    def __init__(
+        self,
+        key: str,
+        route: str,
+        factory: Callable[[], Coroutine[Any, Any, Any]],
+        depends: Iterable[str] = (),
+    ):
+        self.key = key
+        self.route = route
+        self.factory = factory
+        self.depends = set(depends)
+        self.dependents = set()
+        self.status = "pending"
+
+
+class RestorePlan:
+    """
+    Dependency graph of restore steps.
+
+    Steps run as soon as everything they depend on has finished,
+    with concurrency bounded per route so independent work overlaps
+    without bursting into the same rate-limit bucket.
+    Dependencies order the work, they don't gate it: a failed step is
+    recorded and retried on resume while its dependents still run.
+    """
+
+    steps: Dict[str, RestoreStep]
+    completed: Set[str]
+    failed: Dict[str, str]
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        completed: Iterable[str] = (),
+    ):
+        self.steps = {}
+        self.completed = set(completed)
+        self.failed = {}
+        self.budgets = {**ROUTE_BUDGETS, **(budgets or {})}
+        self._semaphores = {
+            route: asyncio.Semaphore(limit) for route, limit in self.budgets.items()
+        }
+        self.started_at = monotonic()
+
+    def add(
+        self,
+        key: str,
+        route: str,
+        factory: Callable[[], Coroutine[Any, Any, Any]],
+        depends: Iterable[str] = (),
+    ) -> str:
+        self.steps[key] = RestoreStep(key, route, factory, depends)
+        return key
+
+    def barrier(self, key: str, depends: Iterable[str]) -> str:
+        async def noop() -> None:
+            return None
+
+        return self.add(key, "guild", noop, depends)
+
+    @property
+    def total(self) -> int:
+        return len(self.steps)
+
+    @property
+    def done(self) -> int:
+        return sum(1 for step in self.steps.values() if step.status in ("done", "failed"))
+
+    async def run(
+        self,
+        on_progress: Optional[ProgressCallback] = None,
+        on_complete: Optional[Callable[[RestoreStep], Awaitable[None]]] = None,
+    ) -> None:
+        for step in self.steps.values():
+            step.depends &= self.steps.keys()
+            for dependency in step.depends:
+                self.steps[dependency].dependents.add(step.key)
+
+            if step.key in self.completed:
+                step.status = "done"
+
+        remaining = {
+            key: len([d for d in step.depends if self.steps[d].status != "done"])
+            for key, step in self.steps.items()
+            if step.status != "done"
+        }
+        if not remaining:
+            return
+
+        finished: asyncio.Queue[RestoreStep] = asyncio.Queue()
+        tasks: Set[asyncio.Task] = set()
+        in_flight = 0
+
+        async def execute(step: RestoreStep) -> None:
+            semaphore = self._semaphores.setdefault(step.route, asyncio.Semaphore(1))
+            async with semaphore:
+                step.status = "running"
+                try:
+                    await step.factory()
+                except Exception as exc:
+                    step.status = "failed"
+                    self.failed[step.key] = str(exc)
+                    log.debug("Restore step %s failed: %s", step.key, exc)
+                else:
+                    step.status = "done"
+                    self.completed.add(step.key)
+
+            await finished.put(step)
+
+        def schedule(key: str) -> None:
+            nonlocal in_flight
+            remaining.pop(key)
+            in_flight += 1
+            task = asyncio.create_task(execute(self.steps[key]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        for key in [key for key, count in remaining.items() if not count]:
+            schedule(key)
+
+        while in_flight:
+            step = await finished.get()
+            in_flight -= 1
+            if on_complete and step.status == "done":
+                await on_complete(step)
+
+            if on_progress:
+                await on_progress(self)
+
+            for dependent in step.dependents:
+                if dependent not in remaining:
+                    continue
+
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    schedule(dependent)
+
+        if remaining:
+            # Only reachable through a dependency cycle.
+            log.warning("Restore plan has %s unreachable steps.", len(remaining))
+
+
+class RestoreCheckpoint:
+    """
+    Persists which steps finished along with the id translation table,
+    so an interrupted restore can pick up where it stopped.
+    """
+
+    def __init__(self, redis: Any, guild_id: int, key: str):
+        self.redis = redis
+        self.name = f"backup:restore:{guild_id}:{key}"
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> tuple[Set[str], Dict[int, int]]:
+        try:
+            raw = await self.redis.get(self.name)
+        except Exception as exc:
+            log.warning("Failed to load restore checkpoint %s: %s", self.name, exc)
+            return set(), {}
+
+        if not raw:
+            return set(), {}
+
+        data = raw if isinstance(raw, dict) else loads(raw)
+        return (
+            set(data["completed"]),
+            {int(old): new for old, new in data["id_translator"].items()},
+        )
+
+    async def save(self, completed: Set[str], id_translator: Dict[int, int]) -> None:
+        payload = dumps(
+            {
+                "completed": list(completed),
+                "id_translator": {str(old): new for old, new in id_translator.items()},
+            },
+            separators=(",", ":"),
+        )
+        async with self._lock:
+            try:
+                await self.redis.set(self.name, payload, ex=CHECKPOINT_TTL)
+            except Exception as exc:
+                log.warning("Failed to save restore checkpoint %s: %s", self.name, exc)
+
+    async def clear(self) -> None:
+        try:
+            await self.redis.delete(self.name)
+        except Exception as exc:
+            log.warning("Failed to clear restore checkpoint %s: %s", self.name, exc)
+
+
+def summarize(plan: RestorePlan) -> List[str]:
+    """Group failed steps by their route for reporting."""
+
+    failures: Dict[str, int] = {}
+    for key in plan.failed:
+        route = plan.steps[key].route
+        failures[route] = failures.get(route, 0) + 1
+
+    return [f"{count} {route} step(s) failed" for route, count in failures.items()]
@@ -1,8 +1,8 @@
 from typing import Annotated, List, Optional, cast
 
 from asyncpg import UniqueViolationError
-from discord import Embed, Member, Message, Role, TextChannel
-from discord.ext.commands import BadArgument, Command, Converter, group, has_permissions
+from discord import Embed, Guild, Member, Message, Role, TextChannel
+from discord.ext.commands import BadArgument, Cog, Command, Converter, group, has_permissions
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
@@ -11,6 +11,8 @@ from utils.tools.formatter import plural
 from managers.paginator import Paginator
 import discord
 
+from .policy import IPC_COMMAND, RestrictionPolicies
+
 
 class CommandConverter(Converter):
     async def convert(self, ctx: Context, argument: str) -> Command:
@@ -30,14 +32,27 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
     to disable or enable specific commands.
     """
 
+    restrictions: RestrictionPolicies
+
     async def cog_load(self) -> None:
+        self.restrictions = RestrictionPolicies(self.bot)
+        if self.bot.ipc:
+            self.bot.ipc.add_handler(IPC_COMMAND, self.restrictions.handle_ipc)
+
         self.bot.add_check(self.check_command_restrictions)
         return await super().cog_load()
 
     async def cog_unload(self) -> None:
         self.bot.remove_check(self.check_command_restrictions)
+        if self.bot.ipc:
+            self.bot.ipc.handlers.pop(IPC_COMMAND, None)
+
         return await super().cog_unload()
 
+    @Cog.listener("on_guild_remove")
+    async def restrictions_guild_remove(self, guild: Guild) -> None:
+        self.restrictions.discard(guild.id)
+
     async def check_command_restrictions(self, ctx: Context) -> bool:
         """
         Check the restrictions for a command.
@@ -62,67 +77,24 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
         except AttributeError:
             return True
 
-        if await self.bot.db.fetchrow(
-            """
-            SELECT 1
-            FROM commands.ignore
-            WHERE guild_id = $1
-            AND (
-                target_id = $2
-                OR target_id = $3
-            )
-            """,
-            ctx.guild.id,
-            ctx.author.id,
-            ctx.channel.id,
-        ):
-            return False
+        policy = self.restrictions.get(ctx.guild.id)
+        if policy is None:
+            policy = await self.restrictions.fetch(ctx.guild.id)
 
-        elif await self.bot.db.fetchrow(
-            """
-            SELECT 1
-            FROM commands.disabled
-            WHERE guild_id = $1
-            AND channel_id = $2
-            AND (
-                command = $3
-                OR command = $4
-            )
-            """,
-            ctx.guild.id,
-            ctx.channel.id,
-            ctx.command.qualified_name,
-            (
-                ctx.command.parent.qualified_name  # type: ignore
-                if ctx.command.parent
-                else None
-            ),
-        ):
-            return False
-
-        elif await self.bot.db.fetchrow(
-            """
-                SELECT 1
-                FROM commands.restricted
-                WHERE guild_id = $1
-                AND NOT role_id = ANY($2::BIGINT[])
-                AND (
-                    command = $3
-                    OR command = $4
-                )
-                """,
-            ctx.guild.id,
-            [role.id for role in ctx.author.roles],
-            ctx.command.qualified_name,
-            (
-                ctx.command.parent.qualified_name  # type: ignore
-                if ctx.command.parent
-                else None
-            ),
-        ):
-            return False
+        author = ctx.author
+        guild_id = ctx.guild.id
+        command_names = (
+            (ctx.command.qualified_name, ctx.command.parent.qualified_name)  # type: ignore
+            if ctx.command.parent
+            else (ctx.command.qualified_name,)
+        )
 
-        return True
+        return policy.permits(
+            (author.id, ctx.channel.id),
+            ctx.channel.id,
+            command_names,
+            lambda role_id: role_id == guild_id or author._roles.has(role_id),
+        )
 
     @group(invoke_without_command=True, example="(#channel or @member)")
     @has_permissions(manage_guild=True)
@@ -152,6 +124,15 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
         if not result:
             return await ctx.warn(f"{target.mention} is already being ignored!")
 
+        await self.restrictions.update(
+            {
+                "guild_id": ctx.guild.id,
+                "table": "ignore",
+                "action": "add",
+                "target_id": target.id,
+            }
+        )
+
         return await ctx.approve(f"Now ignoring {target.mention}")
 
     @ignore.command(
@@ -186,6 +167,15 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
         if not result:
             return await ctx.warn(f"{target.mention} isn't being ignored!")
 
+        await self.restrictions.update(
+            {
+                "guild_id": ctx.guild.id,
+                "table": "ignore",
+                "action": "remove",
+                "target_id": target.id,
+            }
+        )
+
         return await ctx.approve(f"Now allowing {target.mention} to invoke commands")
 
     @ignore.command(
@@ -288,6 +278,7 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
                 f"The command **{command.qualified_name}** is already disabled in all channels!"
             )
 
+        channels = ctx.guild.text_channels if channel is None else [channel]
         await self.bot.db.executemany(
             """
             INSERT INTO commands.disabled (guild_id, channel_id, command)
@@ -297,11 +288,18 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
             """,
             [
                 (ctx.guild.id, channel.id, command.qualified_name)
-                for channel in (
-                    ctx.guild.text_channels if channel is None else [channel]
-                )
+                for channel in channels
             ],
         )
+        await self.restrictions.update(
+            {
+                "guild_id": ctx.guild.id,
+                "table": "disabled",
+                "action": "add",
+                "channel_ids": [channel.id for channel in channels],
+                "command": command.qualified_name,
+            }
+        )
 
         if not channel:
             return await ctx.approve(
@@ -406,6 +404,15 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
             command.qualified_name,
             channel_ids if channel is None else [channel.id],
         )
+        await self.restrictions.update(
+            {
+                "guild_id": ctx.guild.id,
+                "table": "disabled",
+                "action": "remove",
+                "channel_ids": channel_ids if channel is None else [channel.id],
+                "command": command.qualified_name,
+            }
+        )
 
         if not channel:
             return await ctx.approve(
@@ -461,10 +468,28 @@ class CommandManagement(MixinMeta, metaclass=CompositeMetaClass):
                 role.id,
                 command.qualified_name,
             )
+            await self.restrictions.update(
+                {
+                    "guild_id": ctx.guild.id,
+                    "table": "restricted",
+                    "action": "remove",
+                    "role_id": role.id,
+                    "command": command.qualified_name,
+                }
+            )
             return await ctx.approve(
                 f"Removed the restriction on **{command.qualified_name}** for {role.mention}"
             )
 
+        await self.restrictions.update(
+            {
+                "guild_id": ctx.guild.id,
+                "table": "restricted",
+                "action": "add",
+                "role_id": role.id,
+                "command": command.qualified_name,
+            }
+        )
         return await ctx.approve(
             f"Now allowing {role.mention} to use **{command.qualified_name}**"
         )
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Set, TypedDict
+
+from utils.logger import log
+
+if TYPE_CHECKING:
+    from main import Pride
+
+
+IPC_COMMAND = "command_restrictions_update"
+
+
+class RestrictionChange(TypedDict, total=False):
+    guild_id: int
+    table: str
+    action: str
+    target_id: int
+    role_id: int
+    channel_ids: list[int]
+    command: str
+
+
+class RestrictionPolicy:
+    """
+    Compiled view of the `commands.ignore`, `commands.disabled`
+    and `commands.restricted` rows for a single guild.
+    """
+
+    __slots__ = ("ignored", "disabled", "restricted")
+
+    ignored: Set[int]
+    disabled: Dict[int, Set[str]]
+    restricted: Dict[str, Set[int]]
+
+    def __init__(self) -> None:
+        self.ignored = set()
+        self.disabled = {}
+        self.restricted = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> RestrictionPolicy:
+        policy = cls()
+        for record in records:
+            policy.apply(
+                {
+                    "table": record["kind"],
+                    "action": "add",
+                    "target_id": record["id"],
+                    "role_id": record["id"],
+                    "channel_ids": [record["id"]],
+                    "command": record["command"],
+                }
+            )
+
+        return policy
+
+    def permits(
+        self,
+        target_ids: tuple[int, int],
+        channel_id: int,
+        command_names: tuple[str, ...],
+        has_role: Callable[[int], bool],
+    ) -> bool:
+        """
+        Check whether a member may run a command in a channel.
+
+        A member must hold every role a command is restricted to,
+        matching the behaviour of the original per-table queries.
+        """
+
+        if target_ids[0] in self.ignored or target_ids[1] in self.ignored:
+            return False
+
+        if disabled := self.disabled.get(channel_id):
+            if any(name in disabled for name in command_names):
+                return False
+
+        if self.restricted:
+            for name in command_names:
+                required = self.restricted.get(name)
+                if required and not all(has_role(role_id) for role_id in required):
+                    return False
+
+        return True
+
+    def apply(self, change: RestrictionChange) -> None:
+        """Apply a single incremental change to the policy."""
+
+        table, action = change["table"], change["action"]
+        if table == "ignore":
+            if action == "add":
+                self.ignored.add(change["target_id"])
+            else:
+                self.ignored.discard(change["target_id"])
+
+        elif table == "disabled":
+            command = change["command"]
+            for channel_id in change["channel_ids"]:
+                if action == "add":
+                    self.disabled.setdefault(channel_id, set()).add(command)
+                elif commands := self.disabled.get(channel_id):
+                    commands.discard(command)
+                    if not commands:
+                        del self.disabled[channel_id]
+
+        elif table == "restricted":
+            command = change["command"]
+            if action == "add":
+                self.restricted.setdefault(command, set()).add(change["role_id"])
+            elif roles := self.restricted.get(command):
+                roles.discard(change["role_id"])
+                if not roles:
+                    del self.restricted[command]
+
+
+class RestrictionPolicies:
+    """
+    Per-guild restriction policies, loaded lazily in a single
+    round trip and kept current through incremental changes
+    which are mirrored to every other cluster over IPC.
+    """
+
+    def __init__(self, bot: "Pride") -> None:
+        self.bot = bot
+        self._policies: Dict[int, RestrictionPolicy] = {}
+        self._pending: Dict[int, asyncio.Task[RestrictionPolicy]] = {}
+        self._stale: Set[int] = set()
+
+    def get(self, guild_id: int) -> Optional[RestrictionPolicy]:
+        return self._policies.get(guild_id)
+
+    async def fetch(self, guild_id: int) -> RestrictionPolicy:
+        if (policy := self._policies.get(guild_id)) is not None:
+            return policy
+
+        task = self._pending.get(guild_id)
+        if task is None:
+            task = self._pending[guild_id] = asyncio.create_task(self._load(guild_id))
+
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._pending.pop(guild_id, None)
+
+    async def _load(self, guild_id: int) -> RestrictionPolicy:
+        records = await self.bot.db.fetch(
+            """
+            SELECT 'ignore' AS kind, target_id AS id, NULL AS command
+            FROM commands.ignore
+            WHERE guild_id = $1
+            UNION ALL
+            SELECT 'disabled', channel_id, command
+            FROM commands.disabled
+            WHERE guild_id = $1
+            UNION ALL
+            SELECT 'restricted', role_id, command
+            FROM commands.restricted
+            WHERE guild_id = $1
+            """,
+            guild_id,
+        )
+        policy = RestrictionPolicy.from_records(records)
+        if guild_id in self._stale:
+            # A change landed while we were loading, the next fetch reloads.
+            self._stale.discard(guild_id)
+        else:
+            self._policies[guild_id] = policy
+
+        return policy
+
+    def apply(self, change: RestrictionChange) -> None:
+        """
+        Apply a change to the local policy.
+        Guilds which aren't loaded yet will pick it up on first fetch.
+        """
+
+        guild_id = change["guild_id"]
+        if change.get("action") == "reload":
+            # Rows were rewritten in bulk, the next fetch reloads them.
+            self._policies.pop(guild_id, None)
+            if guild_id in self._pending:
+                self._stale.add(guild_id)
+
+        elif (policy := self._policies.get(guild_id)) is not None:
+            policy.apply(change)
+
+        elif guild_id in self._pending:
+            self._stale.add(guild_id)
+
+    async def update(self, change: RestrictionChange) -> None:
+        """Apply a change locally and propagate it to the other clusters."""
+
+        self.apply(change)
+        if not self.bot.ipc:
+            return
+
+        try:
+            await self.bot.ipc.publish(IPC_COMMAND, dict(change))
+        except Exception as exc:
+            log.error(f"Failed to propagate command restriction change: {exc}")
+
+    async def reload(self, guild_id: int) -> None:
+        """Drop a guild's policy on every cluster after a bulk rewrite."""
+
+        await self.update({"guild_id": guild_id, "action": "reload"})
+
+    async def handle_ipc(self, data: dict) -> None:
+        self.apply(data)  # type: ignore
+
+    def discard(self, guild_id: int) -> None:
+        self._policies.pop(guild_id, None)
@@ -7,6 +7,7 @@ from discord.utils import format_dt
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.prefilter import accepts, authored_by, in_guild
 from utils.tools.formatter import codeblock, plural, vowel
 from managers.paginator import Paginator
 from utils.conversions.script import Script
@@ -108,6 +109,7 @@ class Disboard(MixinMeta, metaclass=CompositeMetaClass):
             )
 
     @Cog.listener("on_message")
+    @accepts(in_guild, authored_by(302050872383242240))
     async def bump_listener(self, message: Message):
         """
         Listen for the bump message.
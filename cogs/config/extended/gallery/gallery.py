@@ -9,6 +9,7 @@ from xxhash import xxh32_hexdigest
 
 from utils.tools import CompositeMetaClass, MixinMeta, quietly_delete
 from core.context import Context
+from core.prefilter import accepts, feature, from_human, in_guild
 from managers.paginator import Paginator
 
 IMAGE_PATTERN = re.compile(
@@ -53,6 +54,8 @@ class Gallery(MixinMeta, metaclass=CompositeMetaClass):
         except UniqueViolationError:
             return await ctx.warn("That channel is already a gallery channel!")
 
+        await self.bot.features.invalidate("gallery")
+
         return await ctx.approve(
             f"Now restricting {channel.mention} to only allow images"
         )
@@ -80,6 +83,8 @@ class Gallery(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn("That channel isn't a gallery channel!")
 
+        await self.bot.features.invalidate("gallery")
+
         return await ctx.approve(
             f"No longer restricting {channel.mention} to only allow images"
         )
@@ -104,6 +109,8 @@ class Gallery(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn("No gallery channels exist for this server!")
 
+        await self.bot.features.invalidate("gallery")
+
         return await ctx.approve("Successfully  removed all gallery channels")
 
     @gallery.command(
@@ -139,6 +146,7 @@ class Gallery(MixinMeta, metaclass=CompositeMetaClass):
         return await paginator.start()
 
     @Cog.listener("on_message")
+    @accepts(in_guild, from_human, feature("gallery"))
     async def gallery_listener(self, message: Message) -> None:
         """
         Delete messages that aren't images in gallery channels.
@@ -12,10 +12,17 @@ class Info(MixinMeta, metaclass=CompositeMetaClass):
     """
     View server information and statistics.
     """
+
+    @property
+    def image_generator(self) -> InfoImageGenerator:
+        if (generator := getattr(self, "_image_generator", None)) is None:
+            generator = self._image_generator = InfoImageGenerator(self.bot)
+
+        return generator
+
     async def generate_image(self, guild, stats, top_stats=None):
         """Generate and return server info image"""
-        image_generator = InfoImageGenerator()
-        return await image_generator.generate_server_info(guild, stats, top_stats)
+        return await self.image_generator.generate_server_info(guild, stats, top_stats)
 
     @group(invoke_without_command=True)
     async def info(self, ctx: Context) -> Message:
@@ -325,7 +332,6 @@ class Info(MixinMeta, metaclass=CompositeMetaClass):
             ctx.guild.id
         )
 
-        image_generator = InfoImageGenerator()
         user_stats = {
             'ranks': {
                 'message': message_rank,
@@ -348,7 +354,7 @@ class Info(MixinMeta, metaclass=CompositeMetaClass):
             }
         }
 
-        image = await image_generator.generate_user_info(ctx.guild, user, user_stats)
+        image = await self.image_generator.generate_user_info(ctx.guild, user, user_stats)
         return await ctx.send(file=image)
 
     @info.group(name="chart")
@@ -412,11 +418,11 @@ class Info(MixinMeta, metaclass=CompositeMetaClass):
             'member_count': ctx.guild.member_count,
             'active_members': stats['active_members'],
             'total_messages': stats['total_messages'],
-            'guild_icon': ctx.guild.icon
+            'guild_icon': ctx.guild.icon,
+            'guild_id': ctx.guild.id
         }
 
-        image_generator = InfoImageGenerator()
-        image = await image_generator.generate_chart(chart_stats)
+        image = await self.image_generator.generate_chart(chart_stats)
         view = ChartView(ctx, 'messages', stats)
         return await ctx.send(file=image, view=view)
 
@@ -472,11 +478,11 @@ class Info(MixinMeta, metaclass=CompositeMetaClass):
             'created_at': ctx.guild.created_at,
             'member_count': ctx.guild.member_count,
             'active_members': stats['active_members'],
-            'guild_icon': ctx.guild.icon
+            'guild_icon': ctx.guild.icon,
+            'guild_id': ctx.guild.id
         }
 
-        image_generator = InfoImageGenerator()
-        image = await image_generator.generate_chart(chart_stats)
+        image = await self.image_generator.generate_chart(chart_stats)
         view = ChartView(ctx, 'voice', stats)
         return await ctx.send(file=image, view=view)
 
@@ -527,7 +533,6 @@ class ChartView(View):
                     )
             await interaction.response.edit_message(attachments=[], embed=embed, view=self)
         else:
-            image_generator = InfoImageGenerator()
             chart_stats = {
                 'type': self.type,
                 'series': self.stats[f'{self.type}_series'],
@@ -536,7 +541,8 @@ class ChartView(View):
                 'created_at': self.ctx.guild.created_at,
                 'member_count': self.ctx.guild.member_count,
                 'active_members': self.stats['active_members'],
-                'guild_icon': self.ctx.guild.icon
+                'guild_icon': self.ctx.guild.icon,
+                'guild_id': self.ctx.guild.id
             }
             
             if self.type == 'messages':
@@ -544,7 +550,7 @@ class ChartView(View):
             elif self.type == 'voice':
                 chart_stats['total_hours'] = sum(self.stats['voice_series'])
                 
-            image = await image_generator.generate_chart(chart_stats)
+            image = await self.ctx.cog.image_generator.generate_chart(chart_stats)
             await interaction.response.edit_message(attachments=[image], embed=None, view=self)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
@@ -5,12 +5,14 @@ from typing import Annotated, List, Optional, cast
 
 from asyncpg import UniqueViolationError
 from discord import Embed, HTTPException, Member, Message, Role, TextChannel, Thread
-from discord.ext.commands import BucketType, Cog, cooldown, group, has_permissions
+from discord.ext.commands import BucketType, Cog, group, has_permissions
 from pydantic import BaseModel
 from typing_extensions import Self
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.cooldowns import cooldown
+from core.prefilter import accepts, feature, in_guild
 from utils.conversions import StrictRole
 from utils.tools.formatter import plural
 from managers.paginator import Paginator
@@ -197,6 +199,7 @@ class Level(MixinMeta, metaclass=CompositeMetaClass):
             await script.send(channel)
 
     @Cog.listener("on_message_without_command")
+    @accepts(in_guild, feature("level"))
     async def level_listener(self, ctx: Context):
         """
         Award XP to members for sending messages.
@@ -394,6 +397,7 @@ class Level(MixinMeta, metaclass=CompositeMetaClass):
             ),
         )
 
+        await self.bot.features.invalidate("level")
         return await ctx.approve(
             f"The level system has been {'enabled' if status else 'disabled'}"
         )
@@ -437,6 +441,7 @@ class Level(MixinMeta, metaclass=CompositeMetaClass):
             ),
         )
 
+        await self.bot.features.invalidate("level")
         return await ctx.approve(
             f"{'Now' if stack_roles else 'No longer'} stacking level roles"
         )
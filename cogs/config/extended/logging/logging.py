@@ -39,6 +39,7 @@ from discord.ext import tasks
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.prefilter import accepts, feature
 from utils.tools.formatter import human_join, plural, shorten
 from managers.paginator import Paginator
 
@@ -167,6 +168,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
             channel.id,
             value,
         )
+        await self.bot.features.invalidate("logging")
 
         if value == LogType.ALL():
             return await ctx.approve(f"Now logging all events in {channel.mention}")
@@ -228,6 +230,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn(f"Logging in {channel.mention} doesn't exist!")
 
+        await self.bot.features.invalidate("logging")
         return await ctx.approve(f"No longer logging in {channel.mention}")
 
     @logging.command(
@@ -475,6 +478,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
                 )
 
     @Cog.listener("on_member_join")
+    @accepts(feature("logging"))
     async def log_member_join(self, member: Member) -> None:
         """
         Log when a member joins.
@@ -532,6 +536,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_member_remove")
+    @accepts(feature("logging"))
     async def log_member_remove(self, member: Member) -> None:
         """
         Log when a member leaves.
@@ -587,6 +592,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_member_update")
+    @accepts(feature("logging"))
     async def log_member_update(self, before: Member, after: Member) -> None:
         """
         Log when a member updates.
@@ -656,6 +662,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_voice_state_update")
+    @accepts(feature("logging"))
     async def log_voice_state_update(
         self,
         member: Member,
@@ -855,6 +862,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_message_delete")
+    @accepts(feature("logging"))
     async def log_message_delete(self, message: Message) -> None:
         """
         Log when a message is deleted.
@@ -974,6 +982,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_message_edit")
+    @accepts(feature("logging"))
     async def log_message_edit(self, before: Message, after: Message) -> None:
         """
         Log when a message is edited.
@@ -1114,6 +1123,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_role_create")
+    @accepts(feature("logging"))
     async def log_role_creation(self, entry: AuditLogEntry) -> None:
         """
         Log when a role is created.
@@ -1184,6 +1194,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_role_update")
+    @accepts(feature("logging"))
     async def log_role_updated(self, entry: AuditLogEntry) -> None:
         """
         Log when a role is updated.
@@ -1321,6 +1332,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_role_delete")
+    @accepts(feature("logging"))
     async def log_role_deletion(self, entry: AuditLogEntry) -> None:
         """
         Log when a role is deleted.
@@ -1369,6 +1381,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_member_role_update")
+    @accepts(feature("logging"))
     async def log_member_role_update(self, entry: AuditLogEntry) -> None:
         """
         Log when a member's roles are updated.
@@ -1436,6 +1449,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_channel_create")
+    @accepts(feature("logging"))
     async def log_channel_creation(self, entry: AuditLogEntry) -> None:
         """
         Log when a channel is created.
@@ -1501,6 +1515,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_channel_update")
+    @accepts(feature("logging"))
     async def log_channel_updated(self, entry: AuditLogEntry) -> None:
         """
         Log when a channel is updated.
@@ -1686,6 +1701,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_channel_delete")
+    @accepts(feature("logging"))
     async def log_channel_deletion(self, entry: AuditLogEntry) -> None:
         """
         Log when a channel is deleted.
@@ -1741,6 +1757,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_invite_create")
+    @accepts(feature("logging"))
     async def log_invite_creation(self, entry: AuditLogEntry) -> None:
         """
         Log when an invite is created.
@@ -1770,6 +1787,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_invite_delete")
+    @accepts(feature("logging"))
     async def log_invite_deletion(self, entry: AuditLogEntry) -> None:
         """
         Log when an invite is deleted.
@@ -1805,6 +1823,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_emoji_create")
+    @accepts(feature("logging"))
     async def log_emoji_creation(self, entry: AuditLogEntry) -> None:
         """
         Log when an emoji is created.
@@ -1833,6 +1852,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_emoji_update")
+    @accepts(feature("logging"))
     async def log_emoji_updated(self, entry: AuditLogEntry) -> None:
         """
         Log when an emoji is updated.
@@ -1867,6 +1887,7 @@ class Logging(MixinMeta, metaclass=CompositeMetaClass):
         )
 
     @Cog.listener("on_audit_log_entry_emoji_delete")
+    @accepts(feature("logging"))
     async def log_emoji_deletion(self, entry: AuditLogEntry) -> None:
         """
         Log when an emoji is deleted.
@@ -6,6 +6,7 @@ from discord.ext.commands import Cog, group, has_permissions
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.prefilter import accepts, channel_types, feature, in_guild
 from utils.tools.formatter import plural
 from managers.paginator import Paginator
 
@@ -18,6 +19,7 @@ class Publisher(MixinMeta, metaclass=CompositeMetaClass):
     """
 
     @Cog.listener("on_message")
+    @accepts(in_guild, channel_types(ChannelType.news), feature("publisher"))
     async def publisher_listener(self, message: Message) -> None:
         """
         Automatically publish an announcment message.
@@ -102,6 +104,7 @@ class Publisher(MixinMeta, metaclass=CompositeMetaClass):
         except UniqueViolationError:
             return await ctx.warn(f"Already publishing messages in {channel.mention}!")
 
+        await self.bot.features.invalidate("publisher")
         return await ctx.approve(
             f"Now automatically publishing messages in {channel.mention}"
         )
@@ -134,6 +137,7 @@ class Publisher(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn(f"Channel {channel.mention} isn't being watched!")
 
+        await self.bot.features.invalidate("publisher")
         return await ctx.approve(f"No longer publishing messages in {channel.mention}")
 
     @publisher.command(
@@ -160,6 +164,7 @@ class Publisher(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn("No channels are being watched!")
 
+        await self.bot.features.invalidate("publisher")
         return await ctx.approve(f"No longer watching {plural(result, md='`'):channel}")
 
     @publisher.command(
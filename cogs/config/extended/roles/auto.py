@@ -1,10 +1,8 @@
-import asyncio
 from logging import getLogger
-from random import uniform
-from typing import Annotated, List, Literal, cast
+from typing import Annotated, Literal
 
-from discord import Embed, Guild, HTTPException, Member, Message, Role
-from discord.ext.commands import Cog, Range, flag, group, has_permissions
+from discord import Embed, Message, Role
+from discord.ext.commands import Range, flag, group, has_permissions
 from humanfriendly import format_timespan
 
 from utils.tools import CompositeMetaClass, MixinMeta
@@ -175,6 +173,7 @@ class AutoRoles(MixinMeta, metaclass=CompositeMetaClass):
             flags.action,
             flags.delay,
         )
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
 
         return await ctx.approve(
             f"Now assigning {role.mention} to new members"
@@ -217,6 +216,8 @@ class AutoRoles(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn(f"{role.mention} is not an existing auto role!")
 
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
+
         return await ctx.approve(f"Successfully removed {role.mention} as an auto role")
 
     @autorole.command(
@@ -243,6 +244,8 @@ class AutoRoles(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn("No auto roles exist for this server!")
 
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
+
         return await ctx.approve(
             f"Successfully  removed {plural(result, md='`'):auto role}"
         )
@@ -285,88 +288,3 @@ class AutoRoles(MixinMeta, metaclass=CompositeMetaClass):
             ),
         )
         return await paginator.start()
-
-    async def assign_auto_role(
-        self,
-        guild: Guild,
-        role: Role,
-        member_id: int,
-        action: Literal["add", "remove"],
-        delay: float,
-    ) -> None:
-        """
-        Assign or remove an auto role.
-        """
-
-        delay = delay or uniform(0.5, 1.5)
-        await asyncio.sleep(delay)
-
-        member = guild.get_member(member_id)
-        if (
-            member is None
-            or not guild.me.guild_permissions.manage_roles
-            or role >= guild.me.top_role
-        ):
-            return
-
-        try:
-            if action == "add" and role not in member.roles:
-                await member.add_roles(role, reason="Auto role")
-
-            elif action == "remove" and role in member.roles:
-                await member.remove_roles(role, reason="Auto role")
-
-        except HTTPException:
-            log.debug(
-                "Failed to %s auto role %s (%s) in %s (%s).",
-                action,
-                role.name,
-                role.id,
-                member.guild.name,
-                member.guild.id,
-            )
-
-    @Cog.listener("on_member_join")
-    async def autorole_event(self, member: Member) -> None:
-        """
-        Automatically assign roles to new members.
-        """
-
-        guild = member.guild
-        records = await self.bot.db.fetch(
-            """
-            SELECT role_id, action, delay
-            FROM auto_role
-            WHERE guild_id = $1
-            """,
-            member.guild.id,
-        )
-
-        scheduled_deletion: List[int] = []
-        for record in records:
-            role_id = cast(int, record["role_id"])
-            role = guild.get_role(role_id)
-            if not role:
-                scheduled_deletion.append(role_id)
-                continue
-
-            asyncio.create_task(
-                self.assign_auto_role(
-                    guild,
-                    role,
-                    member.id,
-                    record["action"],
-                    record["delay"],
-                )
-            )
-
-        if scheduled_deletion:
-            await self.bot.db.execute(
-                """
-                DELETE FROM auto_role
-                WHERE guild_id = $1
-                AND role_id = ANY($2::BIGINT[])
-                """,
-                member.guild.id,
-                scheduled_deletion,
-            )
@@ -2,7 +2,7 @@ from contextlib import suppress
 from datetime import timedelta
 from logging import getLogger
 from time import time
-from typing import Annotated, List, Optional, cast
+from typing import TYPE_CHECKING, Annotated, List, Optional, cast
 from colorama import Fore
 
 from config import EMOJIS
@@ -26,7 +26,6 @@ from typing_extensions import Self
 from xxhash import xxh32_hexdigest
 
 from config import CLIENT
-from main import Pride
 from utils.tools import CompositeMetaClass, MixinMeta
 from core import Context, FlagConverter
 from utils.conversions import Duration, Status
@@ -44,6 +43,10 @@ from processors.antinuke import (
     process_punishment_data
 )
 
+if TYPE_CHECKING:
+    from core.bot import Pride
+
+
 log = getLogger("evict/nuke")
 
 
@@ -2,7 +2,7 @@ from asyncio import sleep, create_task, gather
 from contextlib import suppress
 from datetime import timedelta, datetime, timezone
 from logging import getLogger
-from typing import Annotated, Dict, List, Literal, Optional, Tuple, TypedDict, cast, Union
+from typing import Annotated, List, Literal, Optional, Tuple, TypedDict, cast, Union
 
 from discord import Asset, Embed, Guild, HTTPException, Member, Message, Role, AutoModTrigger, AutoModRuleTriggerType, AutoModRuleEventType, AutoModRuleAction, AutoModRuleActionType
 from discord import Status as DiscordStatus
@@ -22,6 +22,8 @@ import config
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core import Context, FlagConverter
+from core.prefilter import accepts, from_human, in_guild
+from core.join import JoinContext
 from utils.conversions import Status
 from utils.tools.formatter import plural
 import discord 
@@ -194,6 +196,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 """,
                 ctx.guild.id,
             )
+            await self.bot.join_pipeline.invalidate(ctx.guild.id)
             return await ctx.approve("Join protection has been disabled")
 
         await self.bot.db.execute(
@@ -207,6 +210,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
             ctx.guild.id,
             dict(flags),
         )
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
         return await ctx.approve(
             "Join protection has been enabled.",
             f"Threshold set as `{flags.amount}` "
@@ -289,6 +293,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 """,
                 ctx.guild.id,
             )
+            await self.bot.join_pipeline.invalidate(ctx.guild.id)
             return await ctx.approve("Default avatar protection has been disabled")
 
         await self.bot.db.execute(
@@ -302,6 +307,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
             ctx.guild.id,
             dict(flags),
         )
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
         return await ctx.approve(
             f"Default avatar protection has been enabled "
             f"with punishment as **{flags.punishment}**"
@@ -342,6 +348,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 """,
                 ctx.guild.id,
             )
+            await self.bot.join_pipeline.invalidate(ctx.guild.id)
             return await ctx.approve("Automation protection has been disabled")
 
         members = list(
@@ -385,6 +392,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
             ctx.guild.id,
             dict(flags),
         )
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
         return await ctx.approve(
             f"Automation protection has been enabled "
             f"with punishment as **{flags.punishment}**"
@@ -428,6 +436,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 ),
                 process_raid_mitigation(self.bot, guild, ends_at)
             )
+            await self.bot.join_pipeline.invalidate(guild.id)
 
             with suppress(HTTPException):
                 embed = Embed(
@@ -474,6 +483,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 """,
                 guild.id,
             )
+            await self.bot.join_pipeline.invalidate(guild.id)
 
         finally:
             self.active_raids.remove(guild.id)
@@ -517,36 +527,33 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
         except (discord.Forbidden, discord.HTTPException):
             pass
 
-    @Cog.listener("on_member_join")
-    async def check_raid(self, member: Member) -> None:
+    async def cog_load(self) -> None:
+        self.bot.join_pipeline.add_stage("antiraid", self.check_raid, after="hardban")
+        return await super().cog_load()
+
+    async def cog_unload(self) -> None:
+        self.bot.join_pipeline.remove_stage("antiraid")
+        return await super().cog_unload()
+
+    async def check_raid(self, ctx: JoinContext) -> None:
         """
-        Check for simultaneous joins & default avatars.
+        Join pipeline stage checking for simultaneous joins,
+        default avatars and browser only accounts.
         """
 
-        if member.bot:
+        member = ctx.member
+        if member.bot or (settings := ctx.features.antiraid) is None:
             return
 
-        config = cast(
-            Optional[Dict[str, AmountFlags.Schema]],
-            await self.bot.db.fetchrow(
-                """
-                SELECT *
-                FROM antiraid
-                WHERE guild_id = $1
-                """,
-                member.guild.id,
-            ),
-        )
-        if not config:
-            return
-
-        elif config["locked"] is True and (config := config["joins"]) is not None:
+        if settings.locked and (joins := settings.joins) is not None:
             punished = await self.do_punishment(
                 member.guild,
                 member,
-                punishment=config["punishment"],
+                punishment=joins["punishment"],
                 reason="Server is on lockdown. (ANTIRAID ACTIVE)",
             )
+            if punished:
+                ctx.stop()
 
             return log.info(
                 "%s %s (%s) during an active raid in %s (%s).",
@@ -557,16 +564,15 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 member.guild.id,
             )
 
-        elif (
-            self.is_default(member.avatar)
-            and (avatar := config.get("avatar")) is not None
-        ):
+        elif self.is_default(member.avatar) and (avatar := settings.avatar) is not None:
             punished = await self.do_punishment(
                 member.guild,
                 member,
                 punishment=avatar["punishment"],
                 reason="Default avatar detected",
             )
+            if punished:
+                ctx.stop()
 
             return log.debug(
                 "Default avatar detected from %s (%s) in %s (%s) [%s].",
@@ -583,7 +589,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 status == DiscordStatus.offline
                 for status in [member.mobile_status, member.desktop_status]
             )
-            and (browser := config.get("browser")) is not None
+            and (browser := settings.browser) is not None
         ):
             punished = await self.do_punishment(
                 member.guild,
@@ -591,6 +597,8 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 punishment=browser["punishment"],
                 reason="Spoofed gateway detected (BROWSER)",
             )
+            if punished:
+                ctx.stop()
 
             return log.debug(
                 "Spoofed gateway detected from %s (%s) in %s (%s) [%s].",
@@ -601,7 +609,7 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
                 "PUNISHED" if punished else "FAILED TO PUNISH",
             )
 
-        elif not (config := config.get("joins")):
+        elif not (joins := settings.joins):
             return
 
         key = f"sec.joins:{member.guild.id}"
@@ -633,26 +641,23 @@ class AntiRaid(MixinMeta, metaclass=CompositeMetaClass):
             members.append(m)
 
         self.bot.loop.create_task(pipe.execute())
-        if len(members) < config["amount"]:
+        if len(members) < joins["amount"]:
             return
 
-        future = self.submit_incident(member.guild, members, config["punishment"])
+        ctx.stop()
+        future = self.submit_incident(member.guild, members, joins["punishment"])
         self.bot.loop.create_task(future)
 
-        pipe = self.bot.redis.pipeline()
-        for member in members:
-            if not isinstance(member, Member):
-                pipe.srem(key, member.id)
-                continue
-
+        for raider in members:
             await self.do_punishment(
-                member.guild,
-                member,
-                punishment=config["punishment"],
-                reason=f"Detected {len(members)}/{config['amount']} simultaneous joins",
+                raider.guild,
+                raider,
+                punishment=joins["punishment"],
+                reason=f"Detected {len(members)}/{joins['amount']} simultaneous joins",
             )
 
     @Cog.listener("on_message")
+    @accepts(in_guild, from_human)
     async def check_mentions(self, message: Message) -> None:
         """
         Check for mention spam.
@@ -23,13 +23,16 @@ from discord.abc import GuildChannel
 from discord.ext.commands import Cog, Range, flag, group, has_permissions
 from discord.utils import find
 
-from main import Pride
 from utils.tools import quietly_delete
 from core import Context, FlagConverter
 from utils.conversions import Status
 from utils.tools.formatter import plural, shorten
 from managers.paginator import Paginator
 
+if TYPE_CHECKING:
+    from core.bot import Pride
+
+
 log = getLogger("evict/star")
 
 
@@ -261,8 +264,8 @@ class Starboard(Cog):
     A starboard to upvote posts obviously.
     """
 
-    def __init__(self, bot: Pride):
-        self.bot: Pride = bot
+    def __init__(self, bot: "Pride"):
+        self.bot: "Pride" = bot
 
     @group(
         aliases=["star", "board", "sb"],
@@ -80,7 +80,7 @@ class Statistics(MixinMeta, metaclass=CompositeMetaClass):
                 record["option"],
             )
             if option == "members":
-                value = len(channel.guild.members)
+                value = self.bot.member_cache.counts(channel.guild).total
 
             elif option == "boosts":
                 value = channel.guild.premium_subscription_count
@@ -209,7 +209,7 @@ class Statistics(MixinMeta, metaclass=CompositeMetaClass):
 
         try:
             await channel.edit(
-                name=f"{option.title()}: {(len(ctx.guild.members) if option == 'members' else ctx.guild.premium_subscription_count):,}",
+                name=f"{option.title()}: {(self.bot.member_cache.counts(ctx.guild).total if option == 'members' else ctx.guild.premium_subscription_count):,}",
                 reason=f"Set as {option} counter by {ctx.author} ({ctx.author.id})",
             )
         except RateLimited as exc:
@@ -9,6 +9,7 @@ from xxhash import xxh32_hexdigest
 
 from utils.tools import CompositeMetaClass, MixinMeta, quietly_delete
 from core.context import Context
+from core.prefilter import accepts, feature, from_human, in_guild
 from utils.tools.formatter import codeblock, vowel
 from managers.paginator import Paginator
 from managers.parser import Script
@@ -20,6 +21,7 @@ class Sticky(MixinMeta, metaclass=CompositeMetaClass):
     """
 
     @Cog.listener("on_message")
+    @accepts(in_guild, from_human, feature("sticky"))
     async def sticky_listener(self, message: Message) -> None:
         """
         Stick messages to the bottom of a channel.
@@ -155,6 +157,7 @@ class Sticky(MixinMeta, metaclass=CompositeMetaClass):
                 "Your sticky message wasn't able to be sent!", codeblock(exc.text)
             )
 
+        await self.bot.features.invalidate("sticky")
         return await ctx.approve(
             f"Added {vowel(script.format)} sticky message to {channel.mention}",
         )
@@ -271,6 +274,7 @@ class Sticky(MixinMeta, metaclass=CompositeMetaClass):
         if not message_id:
             return await ctx.warn(f"{channel.mention} doesn't have a sticky message!")
 
+        await self.bot.features.invalidate("sticky")
         message = channel.get_partial_message(message_id)
         await quietly_delete(message)
 
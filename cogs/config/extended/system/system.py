@@ -24,6 +24,7 @@ from xxhash import xxh32_hexdigest
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core import Context, FlagConverter
+from core.prefilter import accepts, message_types
 from utils.tools.formatter import codeblock, plural, vowel
 from managers.paginator import Paginator
 from utils.conversions.embed import EmbedScript as Script
@@ -261,6 +262,7 @@ class System(MixinMeta, metaclass=CompositeMetaClass):
         return await self._process_message_send(member, 'boost')
 
     @Cog.listener("on_message")
+    @accepts(message_types(MessageType.new_member))
     async def welcome_system(self, message: Message):
         """
         Add the system welcome message to redis.
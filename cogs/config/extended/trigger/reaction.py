@@ -7,6 +7,7 @@ from xxhash import xxh64_hexdigest
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core.context import Context
+from core.prefilter import accepts, feature, in_guild
 from utils.tools.formatter import plural
 from managers.paginator import Paginator
 
@@ -17,6 +18,7 @@ class Reaction(MixinMeta, metaclass=CompositeMetaClass):
     """
 
     @Cog.listener("on_message_without_command")
+    @accepts(in_guild, feature("reaction_trigger"))
     async def reaction_listener(self, ctx: Context) -> None:
         """
         Automatically react to a trigger.
@@ -135,6 +137,7 @@ class Reaction(MixinMeta, metaclass=CompositeMetaClass):
                 f"A reaction trigger with {emoji} for **{trigger}** already exists!"
             )
 
+        await self.bot.features.invalidate("reaction_trigger")
         return await ctx.approve(f"Now reacting with {emoji} for **{trigger}**")
 
     @reaction.command(
@@ -168,6 +171,7 @@ class Reaction(MixinMeta, metaclass=CompositeMetaClass):
                 f"No reaction trigger with {emoji} for **{trigger}** exists!"
             )
 
+        await self.bot.features.invalidate("reaction_trigger")
         return await ctx.approve(f"No longer reacting with {emoji} for **{trigger}**")
 
     @reaction.command(
@@ -194,6 +198,7 @@ class Reaction(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn("No reaction triggers exist for this server!")
 
+        await self.bot.features.invalidate("reaction_trigger")
         return await ctx.approve(
             f"Successfully  removed {plural(result, md='`'):reaction trigger}"
         )
@@ -8,6 +8,7 @@ from xxhash import xxh64_hexdigest
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core import Context, FlagConverter
+from core.prefilter import accepts, feature, in_guild
 from utils.conversions import Status
 from utils.conversions.discord import StrictRole
 from utils.tools.formatter import codeblock, plural, vowel
@@ -46,6 +47,7 @@ class Response(MixinMeta, metaclass=CompositeMetaClass):
     """
 
     @Cog.listener("on_message_without_command")
+    @accepts(in_guild, feature("response_trigger"))
     async def response_listener(self, ctx: Context) -> None:
         """
         Automatically respond to a trigger in channels and threads.
@@ -199,6 +201,7 @@ class Response(MixinMeta, metaclass=CompositeMetaClass):
                 f"A response trigger for **{trigger}** already exists!"
             )
 
+        await self.bot.features.invalidate("response_trigger")
         return await ctx.approve(
             f"Now responding with {vowel(script_obj.format)} message for **{trigger}**"
             + (
@@ -283,6 +286,7 @@ class Response(MixinMeta, metaclass=CompositeMetaClass):
                 f"A response trigger for **{trigger}** doesn't exist!"
             )
 
+        await self.bot.features.invalidate("response_trigger")
         return await ctx.approve(f"Removed response trigger for **{trigger}**")
 
     @response.command(
@@ -352,6 +356,7 @@ class Response(MixinMeta, metaclass=CompositeMetaClass):
         if result == "DELETE 0":
             return await ctx.warn("No response triggers exist for this server!")
 
+        await self.bot.features.invalidate("response_trigger")
         return await ctx.approve(
             f"Successfully  removed {plural(result, md='`'):response trigger}"
         )
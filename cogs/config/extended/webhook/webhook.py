@@ -6,7 +6,6 @@ from discord import Embed, HTTPException, Message, TextChannel
 from discord.ext.commands import (
     BucketType,
     Range,
-    cooldown,
     flag,
     group,
     has_permissions,
@@ -15,6 +14,7 @@ from discord.utils import get
 
 from utils.tools import CompositeMetaClass, MixinMeta
 from core import Context, FlagConverter
+from core.cooldowns import cooldown
 from utils.tools.formatter import codeblock, vowel
 from managers.paginator import Paginator
 from managers.parser import Script
@@ -51,6 +51,7 @@ class Whitelist(MixinMeta, metaclass=CompositeMetaClass):
                 ctx.guild.id,
             ),
         )
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
 
         return await ctx.approve(
             f"The **whitelist system** has been **{'enabled' if status else 'disabled'}**"
@@ -81,6 +82,7 @@ class Whitelist(MixinMeta, metaclass=CompositeMetaClass):
             ctx.guild.id,
             action,
         )
+        await self.bot.join_pipeline.invalidate(ctx.guild.id)
 
         return await ctx.approve(f"Whitelist action has been set to **{action}**")
 
@@ -154,33 +156,3 @@ class Whitelist(MixinMeta, metaclass=CompositeMetaClass):
             return
 
         await self.bot.redis.delete(f"whitelist:{member.guild.id}:{member.id}")
-
-    @Cog.listener("on_member_join")
-    async def whitelist_listener(self, member: Member) -> None:
-        """
-        Check if a user is whitelisted when they join.
-        """
-
-        if member.bot:
-            return
-
-        if await self.bot.redis.get(f"whitelist:{member.guild.id}:{member.id}"):
-            return
-
-        record = await self.bot.db.fetchrow(
-            """
-            SELECT status, action
-            FROM whitelist
-            WHERE guild_id = $1
-            """,
-            member.guild.id,
-        )
-        if not record or not record["status"]:
-            return
-
-        with suppress(HTTPException):
-            if record["action"] == "kick":
-                await member.kick(reason="Not permitted. (WHITELIST SYSTEM)")
-
-            elif record["action"] == "ban":
-                await member.ban(reason="Not permitted. (WHITELIST SYSTEM)")
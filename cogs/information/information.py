@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from itertools import groupby
-from typing import Optional, Literal
+from typing import TYPE_CHECKING, Optional, Literal
 import aiohttp
 import json
 from uuid import UUID
@@ -57,8 +57,6 @@ import discord
 import time
 from pathlib import Path
 
-from main import Pride
-
 from utils.tools import dominant_color
 from core.context import Context
 from core import FlagConverter
@@ -67,6 +65,10 @@ from utils.converters.basic import Location
 from managers.paginator import Paginator
 
 import logging
+
+if TYPE_CHECKING:
+    from core.bot import Pride
+
 logger = logging.getLogger(__name__)
 
 REPO_PATH = "/root/evict.new/.git"
@@ -722,20 +724,19 @@ class Information(Cog):
             icon_url=guild.icon,
         )
 
-        humans = list(list(filter(lambda member: not member.bot, guild.members)))
-        bots = list(list(filter(lambda member: member.bot, guild.members)))
+        counts = self.bot.member_cache.counts(guild)
 
         embed.add_field(
             name=await self.bot.get_text("information.membercount.FIELDS.MEMBERS", ctx), 
-            value=f"{len(guild.members):,}"
+            value=f"{counts.total:,}"
         )
         embed.add_field(
             name=await self.bot.get_text("information.membercount.FIELDS.HUMANS", ctx), 
-            value=f"{len(humans):,}"
+            value=f"{counts.humans:,}"
         )
         embed.add_field(
             name=await self.bot.get_text("information.membercount.FIELDS.BOTS", ctx), 
-            value=f"{len(bots):,}"
+            value=f"{counts.bots:,}"
         )
 
         return await ctx.send(embed=embed)
@@ -1679,56 +1680,55 @@ class Information(Cog):
     @has_permissions(manage_messages=True)
     async def poll_create(self, ctx: Context, *, flags: PollFlags) -> Message:
         """Create a new poll using flags"""
-        async with ctx.dask.acquire():
-            options = ["Yes", "No"] 
+        options = ["Yes", "No"] 
+        
+        if ctx.interaction: 
+            modal = PollChoicesModal(title=flags.title)
+            await ctx.interaction.response.send_modal(modal)
+            await modal.wait()
             
-            if ctx.interaction: 
-                modal = PollChoicesModal(title=flags.title)
-                await ctx.interaction.response.send_modal(modal)
-                await modal.wait()
-                
-                if not modal.choices:
-                    return await ctx.warn(self.bot.get_text("information.poll.create.CANCELLED"))
+            if not modal.choices:
+                return await ctx.warn(self.bot.get_text("information.poll.create.CANCELLED"))
 
-            ends_at = None
-            if flags.duration:
-                try:
-                    duration_seconds = parse_duration(flags.duration)
-                    ends_at = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
-                except ValueError:
-                    return await ctx.warn(self.bot.get_text("information.poll.create.INVALID_DURATION"))
-
-            settings = {
-                "anonymous": flags.anonymous,
-                "multiple_choice": flags.multiple_choice,
-                "required_role": None,
-                "show_voters": not flags.anonymous,
-                "live_results": True
-            }
+        ends_at = None
+        if flags.duration:
+            try:
+                duration_seconds = parse_duration(flags.duration)
+                ends_at = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
+            except ValueError:
+                return await ctx.warn(self.bot.get_text("information.poll.create.INVALID_DURATION"))
 
-            poll_id = await self.bot.db.fetchval("""
-                INSERT INTO polls (
-                    guild_id, channel_id, message_id, creator_id,
-                    title, description, choices, settings, ends_at
-                )
-                VALUES ($1, $2, 0, $3, $4, $5, $6, $7, $8)
-                RETURNING poll_id
-            """, ctx.guild.id, ctx.channel.id, ctx.author.id,
-                flags.title, flags.description, json.dumps(options),
-                json.dumps(settings), ends_at)
+        settings = {
+            "anonymous": flags.anonymous,
+            "multiple_choice": flags.multiple_choice,
+            "required_role": None,
+            "show_voters": not flags.anonymous,
+            "live_results": True
+        }
 
-            embed = await self.create_poll_embed(poll_id)
-            view = PollView(poll_id)
+        poll_id = await self.bot.db.fetchval("""
+            INSERT INTO polls (
+                guild_id, channel_id, message_id, creator_id,
+                title, description, choices, settings, ends_at
+            )
+            VALUES ($1, $2, 0, $3, $4, $5, $6, $7, $8)
+            RETURNING poll_id
+        """, ctx.guild.id, ctx.channel.id, ctx.author.id,
+            flags.title, flags.description, json.dumps(options),
+            json.dumps(settings), ends_at)
 
-            msg = await ctx.send(embed=embed, view=view)
+        embed = await self.create_poll_embed(poll_id)
+        view = PollView(poll_id)
 
-            await self.bot.db.execute("""
-                UPDATE polls 
-                SET message_id = $1 
-                WHERE poll_id = $2
-            """, msg.id, poll_id)
-            
-            return msg
+        msg = await ctx.send(embed=embed, view=view)
+
+        await self.bot.db.execute("""
+            UPDATE polls 
+            SET message_id = $1 
+            WHERE poll_id = $2
+        """, msg.id, poll_id)
+        
+        return msg
 
     async def create_poll_embed(self, poll_id: UUID) -> Embed:
         """Create the poll embed"""
@@ -1831,120 +1831,117 @@ class Information(Cog):
         """
         List all active polls in the server
         """
-        async with ctx.dask.acquire():
-            query = """
-                SELECT p.*, COUNT(v.vote_id) as vote_count
-                FROM polls p
-                LEFT JOIN poll_votes v ON p.poll_id = v.poll_id
-                WHERE p.guild_id = $1 AND p.is_active = true
-            """
-            params = [ctx.guild.id]
-            
-            if creator:
-                query += " AND p.creator_id = $2"
-                params.append(creator.id)
-                
-            query += " GROUP BY p.poll_id"
+        query = """
+            SELECT p.*, COUNT(v.vote_id) as vote_count
+            FROM polls p
+            LEFT JOIN poll_votes v ON p.poll_id = v.poll_id
+            WHERE p.guild_id = $1 AND p.is_active = true
+        """
+        params = [ctx.guild.id]
+        
+        if creator:
+            query += " AND p.creator_id = $2"
+            params.append(creator.id)
             
-            if sort_by.lower() == "votes":
-                query += " ORDER BY vote_count DESC"
-            else:
-                query += " ORDER BY p.created_at DESC"
-                
-            polls = await self.bot.db.fetch(query, *params)
+        query += " GROUP BY p.poll_id"
+        
+        if sort_by.lower() == "votes":
+            query += " ORDER BY vote_count DESC"
+        else:
+            query += " ORDER BY p.created_at DESC"
             
-            if not polls:
-                return await ctx.warn(
-                    await self.bot.get_text(
-                        "information.poll.list.NO_POLLS.FILTERED" if creator else "information.poll.list.NO_POLLS.DEFAULT",
-                        ctx,
-                        creator=creator.mention if creator else None
-                    )
-                )
-
-            entries = []
-            for poll in polls:
-                vote_count = await self.bot.db.fetchval(
-                    "SELECT COUNT(*) FROM poll_votes WHERE poll_id = $1",
-                    poll['poll_id']
-                )
-                
-                entry = (
-                    await self.bot.get_text("information.poll.list.ENTRY.TITLE", ctx, title=poll['title']) + "\n" +
-                    await self.bot.get_text("information.poll.list.ENTRY.CREATOR", ctx,
-                        creator=ctx.guild.get_member(poll['creator_id']).mention) + "\n" +
-                    await self.bot.get_text("information.poll.list.ENTRY.VOTES", ctx, count=vote_count) + "\n" +
-                    await self.bot.get_text("information.poll.list.ENTRY.ID", ctx, id=poll['poll_id']) + "\n" +
-                    await self.bot.get_text("information.poll.list.ENTRY.CREATED", ctx,
-                        time=format_dt(poll['created_at'], 'R'))
+        polls = await self.bot.db.fetch(query, *params)
+        
+        if not polls:
+            return await ctx.warn(
+                await self.bot.get_text(
+                    "information.poll.list.NO_POLLS.FILTERED" if creator else "information.poll.list.NO_POLLS.DEFAULT",
+                    ctx,
+                    creator=creator.mention if creator else None
                 )
-                if poll['ends_at']:
-                    entry += "\n" + await self.bot.get_text("information.poll.list.ENTRY.ENDS", ctx,
-                        time=format_dt(poll['ends_at'], 'R'))
-                entries.append(entry)
+            )
 
-            paginator = Paginator(
-                ctx,
-                entries=entries,
-                embed=Embed(title=await self.bot.get_text("information.poll.list.EMBED_TITLE", ctx, guild=ctx.guild)),
+        entries = []
+        for poll in polls:
+            vote_count = await self.bot.db.fetchval(
+                "SELECT COUNT(*) FROM poll_votes WHERE poll_id = $1",
+                poll['poll_id']
+            )
+            
+            entry = (
+                await self.bot.get_text("information.poll.list.ENTRY.TITLE", ctx, title=poll['title']) + "\n" +
+                await self.bot.get_text("information.poll.list.ENTRY.CREATOR", ctx,
+                    creator=ctx.guild.get_member(poll['creator_id']).mention) + "\n" +
+                await self.bot.get_text("information.poll.list.ENTRY.VOTES", ctx, count=vote_count) + "\n" +
+                await self.bot.get_text("information.poll.list.ENTRY.ID", ctx, id=poll['poll_id']) + "\n" +
+                await self.bot.get_text("information.poll.list.ENTRY.CREATED", ctx,
+                    time=format_dt(poll['created_at'], 'R'))
             )
-            return await paginator.start()
+            if poll['ends_at']:
+                entry += "\n" + await self.bot.get_text("information.poll.list.ENTRY.ENDS", ctx,
+                    time=format_dt(poll['ends_at'], 'R'))
+            entries.append(entry)
+
+        paginator = Paginator(
+            ctx,
+            entries=entries,
+            embed=Embed(title=await self.bot.get_text("information.poll.list.EMBED_TITLE", ctx, guild=ctx.guild)),
+        )
+        return await paginator.start()
 
     @poll.command(name="end")
     async def poll_end(self, ctx: Context, poll_id: str) -> Message:
         """
         End a poll early
         """
-        async with ctx.dask.acquire():
-            try:
-                poll_id = UUID(poll_id)
-            except ValueError:
-                return await ctx.warn(await self.bot.get_text("information.poll.end.INVALID_ID", ctx))
+        try:
+            poll_id = UUID(poll_id)
+        except ValueError:
+            return await ctx.warn(await self.bot.get_text("information.poll.end.INVALID_ID", ctx))
 
-            poll = await self.bot.db.fetchrow(
-                "SELECT * FROM polls WHERE poll_id = $1 AND guild_id = $2 AND is_active = true",
-                poll_id, ctx.guild.id
-            )
-            
-            if not poll:
-                return await ctx.warn(await self.bot.get_text("information.poll.end.NOT_FOUND", ctx))
-            
-            if not (ctx.author.id == poll['creator_id'] or ctx.author.guild_permissions.manage_guild):
-                return await ctx.warn(await self.bot.get_text("information.poll.end.NO_PERMISSION", ctx))
-            
-            await self.bot.db.execute(
-                "UPDATE polls SET is_active = false WHERE poll_id = $1",
-                poll_id
-            )
-            
-            try:
-                channel = ctx.guild.get_channel(poll['channel_id'])
-                message = await channel.fetch_message(poll['message_id'])
-                embed = await self.create_poll_embed(poll_id)
-                await message.edit(embed=embed, view=None)
-            except:
-                pass
-            
-            return await ctx.approve(await self.bot.get_text("information.poll.end.SUCCESS", ctx))
+        poll = await self.bot.db.fetchrow(
+            "SELECT * FROM polls WHERE poll_id = $1 AND guild_id = $2 AND is_active = true",
+            poll_id, ctx.guild.id
+        )
+        
+        if not poll:
+            return await ctx.warn(await self.bot.get_text("information.poll.end.NOT_FOUND", ctx))
+        
+        if not (ctx.author.id == poll['creator_id'] or ctx.author.guild_permissions.manage_guild):
+            return await ctx.warn(await self.bot.get_text("information.poll.end.NO_PERMISSION", ctx))
+        
+        await self.bot.db.execute(
+            "UPDATE polls SET is_active = false WHERE poll_id = $1",
+            poll_id
+        )
+        
+        try:
+            channel = ctx.guild.get_channel(poll['channel_id'])
+            message = await channel.fetch_message(poll['message_id'])
+            embed = await self.create_poll_embed(poll_id)
+            await message.edit(embed=embed, view=None)
+        except:
+            pass
+        
+        return await ctx.approve(await self.bot.get_text("information.poll.end.SUCCESS", ctx))
 
     @poll.command(name="results")
     async def poll_results(self, ctx: Context, poll_id: str) -> Message:
         """
         View detailed results of a poll
         """
-        async with ctx.dask.acquire():
-            try:
-                poll_id = UUID(poll_id)
-            except ValueError:
-                return await ctx.warn(await self.bot.get_text("information.poll.results.INVALID_ID", ctx))
+        try:
+            poll_id = UUID(poll_id)
+        except ValueError:
+            return await ctx.warn(await self.bot.get_text("information.poll.results.INVALID_ID", ctx))
 
-            results_view = PollResultsView(poll_id)
-            results_embed = await results_view.generate_results(ctx)
-            
-            if not results_embed:
-                return await ctx.warn(await self.bot.get_text("information.poll.results.NOT_FOUND", ctx))
-            
-            return await ctx.send(embed=results_embed, view=results_view)
+        results_view = PollResultsView(poll_id)
+        results_embed = await results_view.generate_results(ctx)
+        
+        if not results_embed:
+            return await ctx.warn(await self.bot.get_text("information.poll.results.NOT_FOUND", ctx))
+        
+        return await ctx.send(embed=results_embed, view=results_view)
 
     @command()
     async def status(self, ctx: Context):
@@ -1962,24 +1959,14 @@ class Information(Cog):
     @hybrid_command(name="language", aliases=["lang"])
     async def language(self, ctx: Context) -> Message:
         """Change your preferred language for bot interactions."""
-        available_languages = []
-        
-        system_dir = Path("langs/system")
-        if system_dir.exists():
-            for lang_file in system_dir.glob("*/*.json"):
-                try:
-                    with lang_file.open(encoding='utf-8') as f:
-                        data = json.load(f)
-                        if all(key in data for key in ['language', 'language_code', 'language_local']):
-                            available_languages.append({
-                                'name': data['language'],
-                                'code': data['language_code'],
-                                'local': data['language_local']
-                            })
-                except Exception as e:
-                    continue
-
-        available_languages = {lang['code']: lang for lang in available_languages}.values()
+        available_languages = {
+            lang['language_code']: {
+                'name': lang['language'],
+                'code': lang['language_code'],
+                'local': lang['language_local']
+            }
+            for lang in self.bot.translations.languages.values()
+        }.values()
         
         select = Select(
             placeholder="Choose a language...",
@@ -2010,6 +1997,7 @@ class Information(Cog):
                 ctx.author.id,
                 selected_lang
             )
+            await self.bot.languages.set(ctx.author.id, selected_lang)
 
             embed = Embed(
                 description=f"✅ Your language has been set to `{selected_lang}`",
@@ -2021,10 +2009,7 @@ class Information(Cog):
         view = View(timeout=180)
         view.add_item(select)
 
-        current_lang = await self.bot.db.fetchval(
-            "SELECT language FROM user_settings WHERE user_id = $1",
-            ctx.author.id
-        ) or "en-US"
+        current_lang = await self.bot.languages.get(ctx.author.id)
 
         embed = Embed(
             description=f"Select your preferred language from the dropdown menu below.\nCurrent language: `{current_lang}`",
@@ -4,13 +4,19 @@ from .settings import (
     DATABASE,
     REDIS,
     MONITORING,
+    TRACING,
     LOGGING,
     CLIENT,
     SHARDING,
     CACHE,
     AUTHORIZATION,
-    DASK,
+    BACKUP,
+    STARTUP,
+    SHEDDING,
+    JOBS,
     RATELIMITS,
+    COOLDOWNS,
+    MEMBER_CACHE,
     LAVALINK
 )
 
@@ -20,12 +26,18 @@ __all__ = [
     "DATABASE",
     "REDIS",
     "MONITORING",
+    "TRACING",
     "LOGGING",
     "CLIENT",
     "SHARDING",
     "CACHE",
     "AUTHORIZATION",
-    "DASK",
+    "BACKUP",
+    "STARTUP",
+    "SHEDDING",
+    "JOBS",
     "RATELIMITS",
+    "COOLDOWNS",
+    "MEMBER_CACHE",
     "LAVALINK"
 ]
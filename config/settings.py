@@ -1,6 +1,5 @@
 import os
 import psutil
-import onnxruntime
 from typing import List, NamedTuple
 from os import getenv
 from dotenv import load_dotenv
@@ -30,15 +29,6 @@ ENV_VARS = {
 for key, value in ENV_VARS.items():
     os.environ[key] = value
 
-onnxruntime.set_default_logger_severity(3)
-ONNX_SESSION_OPTIONS = onnxruntime.SessionOptions()
-ONNX_SESSION_OPTIONS.intra_op_num_threads = logical_cpu_count
-ONNX_SESSION_OPTIONS.inter_op_num_threads = logical_cpu_count
-ONNX_SESSION_OPTIONS.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
-ONNX_SESSION_OPTIONS.enable_cpu_mem_arena = False
-ONNX_SESSION_OPTIONS.enable_mem_pattern = False
-ONNX_SESSION_OPTIONS.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
-
 class LAVALINK:
     """
     Lavalink authentication node.
@@ -254,12 +244,39 @@ class REDIS(NamedTuple):
     PORT: int = int(getenv("REDIS_PORT", "6379"))
     DB: int = int(getenv("REDIS_DB", "0"))
     DSN: str = f"redis://{HOST}:{PORT}/{DB}"
+    MAX_CONNECTIONS: int = int(getenv("REDIS_MAX_CONNECTIONS", "100"))
+    CODEC: str = getenv("REDIS_CODEC", "json")
 
 class Monitoring(NamedTuple):
     """OpenTelemetry monitoring configuration."""
     OTLP_ENDPOINT: str = getenv("OTLP_ENDPOINT", "http://localhost:4317")
     SERVICE_NAME: str = getenv("SERVICE_NAME", "evict-bot")
     ENVIRONMENT: str = getenv("ENVIRONMENT", "development")
+    METRICS_PORT: int = int(getenv("METRICS_PORT", "28000"))
+    METRICS_HOST: str = getenv("METRICS_HOST", "67.219.138.179")
+    METRICS_TARGETS: str = getenv("METRICS_TARGETS", "prometheus/targets.json")
+    LABEL_BUDGET: int = int(getenv("METRICS_LABEL_BUDGET", "25"))
+    TOP_K: int = int(getenv("METRICS_TOP_K", "20"))
+
+class Tracing(NamedTuple):
+    """
+    Trace sampling and export.
+
+    MODE is one of off, head, tail or always. Head sampling keeps
+    SAMPLE_RATIO of traces, tail sampling additionally keeps any trace
+    slower than SLOW_THRESHOLD seconds or with an errored span.
+    """
+    MODE: str = getenv("TRACE_MODE", "tail").lower()
+    SAMPLE_RATIO: float = float(getenv("TRACE_SAMPLE_RATIO", "0.01"))
+    SLOW_THRESHOLD: float = float(getenv("TRACE_SLOW_THRESHOLD", "1.0"))
+    DISABLED: List[str] = [
+        name.strip() for name in getenv("TRACE_DISABLED", "").split(",") if name.strip()
+    ]
+    EXPORTER: str = getenv("TRACE_EXPORTER", "none").lower()
+    MAX_QUEUE_SIZE: int = int(getenv("TRACE_MAX_QUEUE_SIZE", "2048"))
+    MAX_EXPORT_BATCH: int = int(getenv("TRACE_MAX_EXPORT_BATCH", "512"))
+    EXPORT_INTERVAL: float = float(getenv("TRACE_EXPORT_INTERVAL", "5"))
+    MAX_PENDING_TRACES: int = int(getenv("TRACE_MAX_PENDING", "4096"))
 
 class Logging(NamedTuple):
     """Logging configuration."""
@@ -300,14 +317,14 @@ class Sharding(NamedTuple):
     """Sharding configuration."""
     CLUSTER_COUNT: int = int(getenv("CLUSTER_COUNT", "2"))
     TOTAL_SHARDS: int = int(getenv("TOTAL_SHARDS", "6"))
-
-class Dask(NamedTuple):
-    """Dask configuration."""
-    HOST: str = getenv("DASK_HOST", "localhost")
-    PORT: int = int(getenv("DASK_PORT", "8787")) 
-    ALLOW_ANONYMOUS: bool = getenv("DASK_ALLOW_ANONYMOUS", "false").lower() == "true"
-    USERNAME: str = getenv("DASK_USERNAME", "admin")
-    PASSWORD: str = getenv("DASK_PASSWORD", "changeme")
+    HEARTBEAT_INTERVAL: float = float(getenv("CLUSTER_HEARTBEAT_INTERVAL", "5"))
+    HEARTBEAT_TIMEOUT: float = float(getenv("CLUSTER_HEARTBEAT_TIMEOUT", "60"))
+    STARTUP_GRACE: float = float(getenv("CLUSTER_STARTUP_GRACE", "300"))
+    SHUTDOWN_TIMEOUT: float = float(getenv("CLUSTER_SHUTDOWN_TIMEOUT", "30"))
+    MAX_MEMORY_MB: int = int(getenv("CLUSTER_MAX_MEMORY_MB", "0"))
+    RESTART_BACKOFF: float = float(getenv("CLUSTER_RESTART_BACKOFF", "5"))
+    RESTART_BACKOFF_MAX: float = float(getenv("CLUSTER_RESTART_BACKOFF_MAX", "300"))
+    STABLE_AFTER: float = float(getenv("CLUSTER_STABLE_AFTER", "600"))
 
 class RATELIMITS:
     """
@@ -318,7 +335,81 @@ class RATELIMITS:
     PER_1M = 65
     PER_CHANNEL = 20
 
-DASK = Dask()
+class Cooldowns(NamedTuple):
+    """
+    Cooldown engine limits.
+
+    Each cooldown keeps at most MAX_BUCKETS keys, evicting the least
+    recently used. Violations decay with VIOLATION_HALF_LIFE, past
+    VIOLATION_THRESHOLD every further one puts the offender's bucket
+    further into debt, up to MAX_PENALTY times the limit. SHARED also
+    checks user cooldowns against Redis so they hold across clusters.
+    """
+    MAX_BUCKETS: int = int(getenv("COOLDOWN_MAX_BUCKETS", "50000"))
+    MAX_VIOLATIONS: int = int(getenv("COOLDOWN_MAX_VIOLATIONS", "10000"))
+    VIOLATION_HALF_LIFE: float = float(getenv("COOLDOWN_VIOLATION_HALF_LIFE", "3600"))
+    VIOLATION_THRESHOLD: float = float(getenv("COOLDOWN_VIOLATION_THRESHOLD", "5"))
+    MAX_PENALTY: float = float(getenv("COOLDOWN_MAX_PENALTY", "10"))
+    SHARED: bool = getenv("COOLDOWN_SHARED", "false").lower() == "true"
+
+COOLDOWNS = Cooldowns()
+
+class MemberCache(NamedTuple):
+    """
+    Member cache policy.
+
+    POLICY is `all`, or any of `recent`, `roles` and `voice` separated
+    by commas. Members matching none of them are dropped from the cache
+    every SWEEP_INTERVAL seconds, `recent` keeping those seen within the
+    last RECENT seconds. Member counts come from counters either way.
+    """
+    POLICY: str = getenv("MEMBER_CACHE_POLICY", "all")
+    RECENT: float = float(getenv("MEMBER_CACHE_RECENT", "3600"))
+    SWEEP_INTERVAL: float = float(getenv("MEMBER_CACHE_SWEEP_INTERVAL", "300"))
+    SWEEP_BATCH: int = int(getenv("MEMBER_CACHE_SWEEP_BATCH", "5000"))
+
+MEMBER_CACHE = MemberCache()
+
+class Backup(NamedTuple):
+    """Guild backup configuration."""
+    ASSET_ROOT: str = getenv("BACKUP_ASSET_ROOT", "data/backups/assets")
+
+BACKUP = Backup()
+
+class Jobs(NamedTuple):
+    """CPU job queue configuration."""
+    WORKERS: int = int(getenv("JOB_WORKERS", str(min(4, psutil.cpu_count(logical=True) or 1))))
+    TIMEOUT: float = float(getenv("JOB_TIMEOUT", "120"))
+    MAX_RESULT_SIZE: int = int(getenv("JOB_MAX_RESULT_SIZE", str(64 * 1024 * 1024)))
+    INLINE: bool = getenv("JOB_INLINE", "false").lower() == "true"
+
+JOBS = Jobs()
+
+class Startup(NamedTuple):
+    """Cluster startup behaviour."""
+    LAZY: bool = getenv("STARTUP_LAZY", "true").lower() == "true"
+
+STARTUP = Startup()
+
+class Shedding(NamedTuple):
+    """
+    Listener load shedding.
+
+    Above LAG seconds of event loop lag or MAX_INFLIGHT running
+    listeners, low priority listeners are dropped and normal ones
+    deferred; above SEVERE_LAG normal ones are dropped too. Shedding
+    stops once pressure stayed below the thresholds for COOLDOWN seconds.
+    """
+    ENABLED: bool = getenv("SHEDDING_ENABLED", "true").lower() == "true"
+    INTERVAL: float = float(getenv("SHEDDING_INTERVAL", "0.25"))
+    LAG: float = float(getenv("SHEDDING_LAG", "0.25"))
+    SEVERE_LAG: float = float(getenv("SHEDDING_SEVERE_LAG", "1.0"))
+    MAX_INFLIGHT: int = int(getenv("SHEDDING_MAX_INFLIGHT", "2000"))
+    COOLDOWN: float = float(getenv("SHEDDING_COOLDOWN", "5"))
+    MAX_DEFERRED: int = int(getenv("SHEDDING_MAX_DEFERRED", "5000"))
+    DRAIN_BATCH: int = int(getenv("SHEDDING_DRAIN_BATCH", "100"))
+
+SHEDDING = Shedding()
 
 class Cache(NamedTuple):
     """Cache configuration."""
@@ -330,6 +421,7 @@ EMOJIS = EMOJIS()
 DATABASE = Database()
 REDIS = REDIS()
 MONITORING = Monitoring()
+TRACING = Tracing()
 LOGGING = Logging()
 CLIENT = Client()
 SHARDING = Sharding()
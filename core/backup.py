@@ -5,7 +5,6 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Tuple
 from utils.logger import log
-from utils.monitoring import PerformanceMonitoring
 
 class BackupManager:
     def __init__(self, bot):
@@ -14,7 +13,7 @@ class BackupManager:
         self.schemas_dir = self.backup_dir / "schemas"
         self.full_dir = self.backup_dir / "full"
         self.retention_days = 7
-        self.monitoring = PerformanceMonitoring()
+        self.monitoring = bot.monitoring
         
         for directory in (self.backup_dir, self.schemas_dir, self.full_dir):
             directory.mkdir(exist_ok=True)
@@ -25,25 +24,13 @@ class BackupManager:
             timestamp = datetime.now(timezone.utc)
             
             try:
-                schema_task = self.bot.dask.client.submit(
-                    self._create_schema_backup,
-                    timestamp=timestamp
-                )
-                
-                full_task = self.bot.dask.client.submit(
-                    self._create_full_backup,
-                    timestamp=timestamp
-                )
-                
                 schema_success, full_success = await asyncio.gather(
-                    schema_task, 
-                    full_task
+                    self._create_schema_backup(timestamp),
+                    self._create_full_backup(timestamp)
                 )
                 
                 if schema_success and full_success:
-                    self.bot.dask.client.submit(
-                        self._cleanup_old_backups
-                    )
+                    await self._cleanup_old_backups()
                     return True
                     
                 return False
@@ -102,13 +89,13 @@ class BackupManager:
 
         try:
             if data := await self.bot.process_backup(command):
-                await self.bot.dask.client.submit(
+                await self.bot.run_job(
                     self._save_backup,
                     data,
                     local_path
                 )
                 
-                success = await self.bot.dask.client.submit(
+                success = await self.bot.run_job(
                     self._upload_backup,
                     local_path,
                     remote_path
@@ -143,6 +130,9 @@ class BackupManager:
 
     async def _cleanup_old_backups(self) -> None:
         """Clean up old backups."""
+        await asyncio.to_thread(self._remove_expired)
+
+    def _remove_expired(self) -> None:
         current_time = datetime.now(timezone.utc).timestamp()
         retention_seconds = self.retention_days * 24 * 60 * 60
 
@@ -2,7 +2,7 @@ import time
 import asyncio
 import psutil
 from collections import defaultdict
-from typing import Optional, Collection, Dict, Any, cast, List
+from typing import Optional, Collection, Dict, Any, Callable, Coroutine, cast, List
 from discord.ext import commands
 from discord import (
     Intents, AllowedMentions, Activity, ActivityType, 
@@ -12,14 +12,12 @@ from discord import (
 )
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-import json
 from discord.ext.commands import Context
 from aiohttp import ClientSession, TCPConnector
-from redis.asyncio import Redis
-from discord.ext.commands import CooldownMapping, BucketType
+from core.redis import Redis
+from discord.ext.commands import BucketType
 from asyncpraw import Reddit as RedditClient
 from opentelemetry import trace
-from multiprocessing import Pool, cpu_count as logical_cpu_count
 import discord
 import os
 import glob
@@ -39,22 +37,33 @@ from discord.ext.commands import (
 )
 from discord.errors import Forbidden, HTTPException, NotFound
 from managers.parser.TagScript.exceptions import TagScriptError, EmbedParseError
-from core.database import Database, Settings
+from core.database import Database, Settings, database_pool
 from core.cache import cache
 from utils.computation import heavy_computation
-from utils.monitoring import PerformanceMonitoring
 from utils.conversions.embed import EmbedScript
 
-from core.http import MonitoredHTTPClient
+from core.http import RestStats
 from utils.prefix import getprefix
 from core.help import PrideHelp
-from utils.monitoring import PerformanceMonitoring
+from utils.monitoring import PerformanceMonitoring, setup_monitoring
+from utils.metrics import GatewayCounter, start_exporter
 from utils.optimization import setup_cpu_optimizations
-from core.dask import DaskManager
+from core.jobs import JobQueue, Priority
+from core.shedding import LoadShedder
+from core.prefilter import FEATURES_IPC, Features, Prefilter
+from core.cooldowns import Cooldowns
+from core.members import MemberCache
 from utils.tracing import tracer
 from utils.logger import log
 from core.ipc import ClusterIPC
 from core.browser import BrowserHandler
+from core.startup import StartupRegistry
+from core.translations import (
+    DEFAULT_LOCALE,
+    IPC_COMMAND as LANGUAGE_IPC_COMMAND,
+    LanguageCache,
+    TranslationCatalog,
+)
 import config
 from processors.backup import run_pg_dump, process_bunny_upload
 from processors.image_generator import process_image_effect
@@ -67,8 +76,11 @@ from utils.formatter import plural, human_join
 from contextlib import suppress
 from pomice import NodePool
 from core.backup import BackupManager
-import asyncpg
 from core.context import Context
+from managers.patches.permissions import FakePermissions, FAKE_PERMISSIONS_IPC
+from core.join import JoinPipeline, JOIN_FEATURES_IPC
+from core.membership import MembershipIndex
+from core.roles import RoleSnapshots
 
 import jishaku
 import jishaku.flags
@@ -79,11 +91,17 @@ jishaku.Flags.NO_DM_TRACEBACK = True
 jishaku.Flags.NO_UNDERSCORE = True
 jishaku.Flags.FORCE_PAGINATOR = True
 
+GUILD_RATELIMITS = (
+    ("guild_10s", config.RATELIMITS.PER_10S, 10),
+    ("guild_30s", config.RATELIMITS.PER_30S, 30),
+    ("guild_1m", config.RATELIMITS.PER_1M, 60),
+)
+
 class Pride(commands.AutoShardedBot, commands.Cog):
     session: ClientSession
     uptime: datetime
     traceback: Dict[str, Exception]
-    global_cooldown: CooldownMapping
+    cooldowns: Cooldowns
     owner_ids: Collection[int]
     database: Database
     redis: Redis
@@ -100,26 +118,49 @@ class Pride(commands.AutoShardedBot, commands.Cog):
     _last_system_check: float
     _is_ready: asyncio.Event
     monitoring: PerformanceMonitoring
-    translations: dict
+    gateway_events: GatewayCounter
+    translations: TranslationCatalog
+    languages: LanguageCache
+    startup: StartupRegistry
+    fake_permissions: FakePermissions
+    join_pipeline: JoinPipeline
+    forcenicks: MembershipIndex
+    hardbans: MembershipIndex
+    role_snapshots: RoleSnapshots
+    stripped_roles: RoleSnapshots
     tracer: trace.Tracer
-    api_stats: dict
-    _last_stats_cleanup: float
+    rest: RestStats
     ipc: ClusterIPC
-    dask: DaskManager
-    _cleanup_event: asyncio.Event
+    jobs: JobQueue
+    shedder: LoadShedder
+    prefilter: Prefilter
+    features: Features
+    member_cache: MemberCache
     cluster_id: int
     cluster_count: int
-    dask_client: any
 
     def __init__(self, *args, **kwargs):
-        self.monitoring = PerformanceMonitoring()
-        self.dask = DaskManager()
-        self.translations = {}
+        self.monitoring = setup_monitoring()
+        self.gateway_events = GatewayCounter()
+        self.jobs = JobQueue()
+        self.shedder = LoadShedder(self)
+        self.prefilter = Prefilter(self)
+        self.features = Features(self)
+        self.member_cache = MemberCache(self)
         self._load_translations()
+        self.languages = LanguageCache(self)
+        self.fake_permissions = FakePermissions(self)
+        self.forcenicks = MembershipIndex(self, "forcenick")
+        self.hardbans = MembershipIndex(self, "hardban")
+        self.role_snapshots = RoleSnapshots(self)
+        self.stripped_roles = RoleSnapshots(self, "stripped", ttl=86400)
+        self.join_pipeline = JoinPipeline(self)
         
         self.cluster_id = kwargs.pop('cluster_id', 0)
         self.cluster_count = kwargs.pop('cluster_count', 1)
-        self.dask_client = kwargs.pop('dask_client')
+        self.rest = RestStats(clusters=self.cluster_count)
+        self.rest.export()
+        self.startup = StartupRegistry(self.cluster_id, lazy=config.STARTUP.LAZY)
         
         super().__init__(
             *args,
@@ -128,6 +169,7 @@ class Pride(commands.AutoShardedBot, commands.Cog):
             owner_ids=kwargs.get('owner_ids'),
             shard_ids=kwargs.get('shard_ids'),
             shard_count=kwargs.get('shard_count'),
+            http_trace=self.rest.trace_config(),
             intents=Intents(
                 guilds=True,
                 members=True,
@@ -163,17 +205,24 @@ class Pride(commands.AutoShardedBot, commands.Cog):
     async def setup_hook(self) -> None:
         """Setup hook that runs before the bot starts."""
         try:
-            self.monitoring = PerformanceMonitoring(service_name="evict-bot")
+            start_exporter(self.cluster_id)
+            self.shedder.start()
             self.tracer = self.monitoring.tracer
             log.info("Performance monitoring initialized")
             
             with self.tracer.start_span("bot_setup") as setup_span:
-                await self._init_core_services()  
-                await self._init_remaining_services()
+                async with self.startup.phase("core"):
+                    await self._init_core_services()  
+                async with self.startup.phase("services"):
+                    await self._init_remaining_services()
                 setup_span.set_attribute("status", "complete")
             
-            self._setup_process_pool()
-            await self.load_cogs()
+            async with self.startup.phase("cogs"):
+                await self.load_cogs()
+
+            if not self.startup.lazy:
+                async with self.startup.phase("subsystems"):
+                    await self.startup.start_all()
             
             self._is_ready.set()
             log.info("Setup complete!")
@@ -186,7 +235,7 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         """Core handler for cluster stats requests"""
         stats = {
             'guild_count': len(self.guilds),
-            'member_count': sum(g.member_count for g in self.guilds)
+            'member_count': sum(self.member_cache.counts(g).total for g in self.guilds)
         }
         log.info(f"Cluster {self.cluster_id} sending stats: {stats}")
         return stats
@@ -199,20 +248,20 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         )
         log.info("Created client session")
 
-        self._http = MonitoredHTTPClient(
-            self.http._HTTPClient__session,
-            bot=self
-        )
-        log.info("Initialized monitored HTTP client")
-
         if self.ipc is None:
             self.ipc = ClusterIPC(self, self.cluster_id)
             self.ipc.add_handler("get_cluster_stats", self._handle_cluster_stats)
+            self.ipc.add_handler(LANGUAGE_IPC_COMMAND, self.languages.handle_ipc)
+            self.ipc.add_handler(FAKE_PERMISSIONS_IPC, self.fake_permissions.handle_ipc)
+            self.ipc.add_handler(JOIN_FEATURES_IPC, self.join_pipeline.handle_ipc)
+            self.ipc.add_handler(FEATURES_IPC, self.features.handle_ipc)
+            for index in (self.forcenicks, self.hardbans):
+                self.ipc.add_handler(index.ipc_command, index.handle_ipc)
             await self.ipc.start()
             log.info(f"Started IPC system for cluster {self.cluster_id}")
 
-        self.database = await asyncpg.create_pool(
-            dsn=config.DATABASE.DSN,
+        self.database = await database_pool(
+            config.DATABASE.DSN,
             min_size=config.DATABASE.MIN_SIZE,
             max_size=config.DATABASE.MAX_SIZE,
             max_queries=config.DATABASE.MAX_QUERIES,
@@ -225,7 +274,7 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         from core.migrations import run_migrations
         await run_migrations(self.database)
 
-        self.redis = Redis.from_url(config.REDIS.DSN)
+        self.redis = await Redis.from_url(config.REDIS.DSN)
         log.info("Connected to Redis")
 
     async def _init_remaining_services(self):
@@ -237,9 +286,14 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         self.command_stats = defaultdict(lambda: {'calls': 0, 'total_time': 0})
         log.info("Initialized monitoring systems")
 
+        self.features.start()
+        self.member_cache.start()
+
         self.browser = BrowserHandler()
-        await self.browser.init()
-        log.info("Initialized browser")
+        self.startup.register("browser", self.browser.init)
+        self.startup.register("jobs", self.jobs.start)
+        self.add_check(self.check_subsystems)
+        log.info("Registered lazy subsystems")
 
         self.voice_update_task = self.loop.create_task(self.update_voice_times())
         log.info("Started voice update task")
@@ -255,7 +309,8 @@ class Pride(commands.AutoShardedBot, commands.Cog):
                         self.voice_join_times[member.id] = time.time()
         log.info("Initialized voice times")
 
-        await self.load_patches()
+        async with self.startup.phase("patches"):
+            await self.load_patches()
         log.info("Loaded patches")
 
         try:
@@ -276,47 +331,18 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         self._last_system_check = 0
         self.command_stats = defaultdict(lambda: {'calls': 0, 'total_time': 0})
         self._is_ready = asyncio.Event()
-        self._cleanup_event = asyncio.Event()
         self.voice_join_times = {}
-        self.browser = BrowserHandler()
 
     def _setup_cooldowns(self):
-        """Setup cooldown attributes."""
-        self.spam_control = commands.CooldownMapping.from_cooldown(
-            10, 12.0, commands.BucketType.user
-        )
-        self.violations = defaultdict(int)
-        
-        self.global_cooldown = CooldownMapping.from_cooldown(2, 3, BucketType.user)
+        """Setup the command and message flood cooldowns."""
+        self.cooldowns = Cooldowns(self)
+        self.cooldowns.add("global", 2, 3, BucketType.user, shared=True, escalate=True)
         self.add_check(self.check_global_cooldown)
-        
-        self.guild_ratelimits = {
-            '10s': CooldownMapping.from_cooldown(
-                config.RATELIMITS.PER_10S, 
-                10, 
-                BucketType.guild
-            ),
-            '30s': CooldownMapping.from_cooldown(
-                config.RATELIMITS.PER_30S, 
-                30, 
-                BucketType.guild
-            ),
-            '1m': CooldownMapping.from_cooldown(
-                config.RATELIMITS.PER_1M, 
-                60, 
-                BucketType.guild
-            )
-        }
-        
-        self.channel_ratelimit = CooldownMapping.from_cooldown(
-            config.RATELIMITS.PER_CHANNEL, 
-            5, 
-            BucketType.channel
-        )
-        
-        self.heavy_command_cooldown = CooldownMapping.from_cooldown(
-            1, 30, BucketType.user
-        )
+
+        for name, rate, per in GUILD_RATELIMITS:
+            self.cooldowns.add(name, rate, per, BucketType.guild)
+
+        self.cooldowns.add("channel", config.RATELIMITS.PER_CHANNEL, 5, BucketType.channel)
 
     async def _init_monitoring(self) -> None:
         """Initialize monitoring systems."""
@@ -342,23 +368,17 @@ class Pride(commands.AutoShardedBot, commands.Cog):
             if not member.bot
         })
 
-        self._setup_process_pool()
-        
-        self.api_stats = defaultdict(lambda: {
-            'calls': 0,
-            'errors': 0,
-            'total_time': 0,
-            'rate_limits': 0
-        })
-        self._last_stats_cleanup = time.time()
-
-    def _setup_process_pool(self):
-        """Setup the process pool for CPU-bound tasks."""
-        cpu_count = psutil.cpu_count(logical=True)
-        self.process_pool = Pool(
-            processes=min(4, cpu_count),
-            maxtasksperchild=100  
-        )
+    async def run_job(self, func, *args, **kwargs) -> Any:
+        """Run a synchronous CPU-bound function on the job queue's workers."""
+        await self.startup.require("jobs")
+        return await self.jobs.run(func, *args, **kwargs)
+
+    async def check_subsystems(self, ctx: Context) -> bool:
+        """Start whatever the invoked cog declared in `requires` before it runs."""
+        if requires := getattr(ctx.cog, "requires", None):
+            await self.startup.require(*requires)
+
+        return True
 
     @property
     def db(self) -> Database:
@@ -368,6 +388,28 @@ class Pride(commands.AutoShardedBot, commands.Cog):
     def owner(self) -> User:
         return self.get_user(self.owner_ids[0])
 
+    def dispatch(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
+        self.gateway_events.inc(event_name)
+        self.member_cache.observe(event_name, args)
+        super().dispatch(event_name, *args, **kwargs)
+
+    def _schedule_event(
+        self,
+        coro: Callable[..., Coroutine[Any, Any, Any]],
+        event_name: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Optional[asyncio.Task]:
+        if not self.prefilter(coro, event_name, args):
+            return None
+
+        if not self.shedder.admit(coro, event_name, args, kwargs):
+            return None
+
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+        self.shedder.track(task)
+        return task
+
     def get_message(self, message_id: int) -> Optional[Message]:
         return self._connection._get_message(message_id)
 
@@ -534,7 +576,7 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         """Process a heavy computation task"""
         start_time = time.time()
         try:
-            result = await self.dask.submit_task(heavy_computation, *args)
+            result = await heavy_computation(*args)
             return result
         except Exception as e:
             span.record_exception(e)
@@ -543,17 +585,22 @@ class Pride(commands.AutoShardedBot, commands.Cog):
     async def close(self) -> None:
         """Cleanup and close all resources."""
         try:
-            await self.monitoring.shutdown()
+            self.monitoring.shutdown()
+            self.shedder.stop()
+            self.features.stop()
+            self.member_cache.stop()
             
             await self.db.close()
-            
+
+            for snapshots in (self.role_snapshots, self.stripped_roles):
+                await snapshots.flush()
             await self.redis.close()
             
             if hasattr(self, 'session'):
                 await self.session.close()
             
-            if hasattr(self, 'dask_client'):
-                await self.dask_client.close()
+            await self.jobs.stop()
+
             
             tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
             [task.cancel() for task in tasks]
@@ -809,15 +856,13 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         return context
 
     async def check_global_cooldown(self, ctx: Context) -> bool:
-        """Check global cooldown with monitoring."""
+        """Check the per user command cooldown."""
         if ctx.author.id in self.owner_ids:
             return True
 
-        bucket = self.global_cooldown.get_bucket(ctx.message)
-        if bucket:
-            retry_after = bucket.update_rate_limit()
-            if retry_after:
-                raise CommandOnCooldown(bucket, retry_after, BucketType.user)
+        retry_after = await self.cooldowns.hit("global", ctx.message)
+        if retry_after is not None:
+            raise CommandOnCooldown(self.cooldowns["global"]._cooldown, retry_after, BucketType.user)
 
         return True
 
@@ -876,6 +921,10 @@ class Pride(commands.AutoShardedBot, commands.Cog):
 
         return await super().on_message(message)
 
+    async def on_member_join(self, member: Member) -> None:
+        """Run the join pipeline for hard bans, the whitelist and member roles."""
+        await self.join_pipeline.run(member)
+
     async def on_message_edit(self, before: Message, after: Message) -> None:
         """Handle message edits with monitoring."""
         self.dispatch("member_activity", after.channel, after.author)
@@ -923,9 +972,7 @@ class Pride(commands.AutoShardedBot, commands.Cog):
                 next_run = self._calculate_next_backup_time()
                 await asyncio.sleep((next_run - datetime.now(timezone.utc)).total_seconds())
                 
-                success = await self.dask.submit_task(
-                    self.backup_manager.run_backup
-                )
+                success = await self.backup_manager.run_backup()
                 
                 if success:
                     log.info("8-hour backup completed successfully")
@@ -986,111 +1033,28 @@ class Pride(commands.AutoShardedBot, commands.Cog):
             self.system_stats['metrics'].pop(0)
 
     def _load_translations(self):
-        """Load all translation files."""
-        langs_dir = Path("langs")
-        self.translations = {}
-        
-        system_dir = langs_dir / "system"
-        if system_dir.exists():
-            for category_dir in system_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                    
-                for lang_file in category_dir.glob("*.json"):
-                    try:
-                        lang_code = lang_file.stem 
-                        with lang_file.open(encoding='utf-8') as f:
-                            data = json.load(f)
-                            if 'system' in data:
-                                self.translations.setdefault(lang_code, {})
-                                self.translations[lang_code].setdefault('system', {})
-                                self.translations[lang_code]['system'].update(data['system'])
-                    except Exception as e:
-                        log.error(f"Error loading system translation file {lang_file}: {e}")
-
-        for category_dir in langs_dir.iterdir():
-            if not category_dir.is_dir() or category_dir.name == "system":
-                continue
-                
-            category = category_dir.name
-            self.translations[category] = {}
-            
-            for lang_file in category_dir.glob("*.json"):
-                try:
-                    lang_code = lang_file.stem  
-                    with lang_file.open(encoding='utf-8') as f:
-                        self.translations.setdefault(lang_code, {})
-                        self.translations[lang_code][category] = json.load(f)
-                except Exception as e:
-                    log.error(f"Error loading command translation file {lang_file}: {e}")
-                
-        log.info(f"Loaded translations for {len(self.translations)} categories")
+        """Compile all translation files into flat lookup tables."""
+        self.translations = TranslationCatalog.from_directory(Path("langs"))
 
     async def get_text(self, path: str, ctx=None, **kwargs) -> str:
         """
         Get translated text with parameter substitution.
         Path format: 'category.key.subkey.value' or 'system.category.key.value'
         """
-        user_lang = 'en-US'  
+        user_lang = DEFAULT_LOCALE
         if ctx and hasattr(ctx, 'author'):
-            try:
-                user_lang = await self.db.fetchval(
-                    "SELECT language FROM user_settings WHERE user_id = $1",
-                    ctx.author.id
-                ) or 'en-US'
-            except Exception as e:
-                log.error(f"Error fetching user language: {e}")
+            user_lang = await self.languages.get(ctx.author.id)
 
         try:
-            parts = path.split('.')
-            try:
-                current = self.translations[user_lang]
-                for part in parts[:-1]: 
-                    current = current[part]
-                
-                if parts[-1] in current:
-                    result = current[parts[-1]]
-                    if isinstance(result, str):
-                        return result.format(**kwargs) if kwargs else result
-                    elif isinstance(result, dict):
-                        if 'description' in result:
-                            return result['description'].format(**kwargs) if kwargs else result['description']
-            except (KeyError, AttributeError):
-                pass
-
-            try:
-                current = self.translations['en-US']
-                for part in parts[:-1]: 
-                    current = current[part]
-                
-                if parts[-1] in current:
-                    result = current[parts[-1]]
-                    if isinstance(result, str):
-                        return result.format(**kwargs) if kwargs else result
-                    elif isinstance(result, dict):
-                        if 'description' in result:
-                            return result['description'].format(**kwargs) if kwargs else result['description']
-            except (KeyError, AttributeError):
-                pass
-
-            current = self.translations
-            for part in parts:
-                current = current[part]
-            
-            if isinstance(current, str):
-                return current.format(**kwargs) if kwargs else current
-            elif isinstance(result, dict):
-                if 'description' in result:
-                    return result['description'].format(**kwargs) if kwargs else result['description']
-                    
-        except (KeyError, AttributeError) as e:
+            return self.translations.render(path, user_lang, **kwargs)
+        except (KeyError, AttributeError):
             log.warning(f"Missing translation: {path}")
             return f"Missing translation: {path}"
 
     async def process_image(self, buffer: bytes, effect_type: str, **kwargs) -> Any:
         """Process image effects using process pool."""
         try:
-            return await self.dask.submit_pool_task(
+            return await self.run_job(
                 process_image_effect,
                 buffer,
                 effect_type,
@@ -1111,7 +1075,7 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         
         try:
             processor = processors_map[process_type]
-            return await self.dask.submit_pool_task(
+            return await self.run_job(
                 processor,
                 *args,
                 **kwargs
@@ -1123,17 +1087,17 @@ class Pride(commands.AutoShardedBot, commands.Cog):
     async def process_backup(self, command: str) -> Any:
         """Process backup tasks using process pool."""
         try:
-            result = await self.dask.submit_pool_task(
+            result = await self.run_job(
                 run_pg_dump,
-                command
+                command,
+                priority=Priority.LOW,
+                timeout=60 * 60,
+                max_result_size=0
             )
             return result
         except Exception as e:
             log.error(f"Backup processing error: {e}")
             raise
-        finally:
-            if hasattr(self, 'process_pool'):
-                self.process_pool._maintain_pool()
 
     async def _heartbeat_task(self):
         """Task to send periodic heartbeats via IPC."""
@@ -1150,53 +1114,12 @@ class Pride(commands.AutoShardedBot, commands.Cog):
         """Check if message passes rate limits."""
         if not message.guild:
             return True
-            
-        current_time = time.time()
-        
-        for duration, cooldown in self.guild_ratelimits.items():
-            bucket = cooldown.get_bucket(message)
-            if bucket and bucket.update_rate_limit(current_time):
-                guild_violations = self.violation_tracker[message.guild.id]
-                guild_violations['count'] += 1
-                guild_violations['last_violation'] = current_time
-                
-                if guild_violations['count'] > 5:
-                    guild_violations['cooldown_multiplier'] = min(
-                        guild_violations['cooldown_multiplier'] * 2,
-                        10 
-                    )
-                return False
-        
-        if bucket := self.channel_ratelimit.get_bucket(message):
-            if bucket.update_rate_limit(current_time):
+
+        for name, *_ in GUILD_RATELIMITS:
+            if self.cooldowns.check(name, message) is not None:
                 return False
-                
-        return True
 
-    async def _cleanup_violations(self):
-        """Periodically clean up old violation records."""
-        while not self.is_closed():
-            try:
-                current_time = time.time()
-                for guild_id, data in list(self.violation_tracker.items()):
-                    if current_time - data['last_violation'] > 3600:
-                        data['count'] = max(0, data['count'] - 1)
-                        data['cooldown_multiplier'] = max(1, data['cooldown_multiplier'] / 2)
-                        
-                    if data['count'] == 0:
-                        del self.violation_tracker[guild_id]
-                
-                try:
-                    await asyncio.wait_for(
-                        self._cleanup_event.wait(),
-                        timeout=300
-                    )
-                except asyncio.TimeoutError:
-                    continue
-                    
-            except Exception as e:
-                log.error(f"Error in violation cleanup: {e}")
-                await asyncio.sleep(60)  
+        return self.cooldowns.check("channel", message) is None
 
     def get_commands(self) -> List[commands.Command]:
         """Get list of commands for help command."""
@@ -1,9 +1,11 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from http.cookiejar import MozillaCookieJar
-from typing import AsyncGenerator, Literal, Optional
+from math import ceil
+from time import monotonic
 from secrets import token_urlsafe
+from typing import Any, AsyncGenerator, Dict, List, Literal, Optional, Tuple
 from pydantic import BaseModel
-from anyio import CapacityLimiter
 from playwright.async_api import (
     Browser,
     BrowserContext,
@@ -36,74 +38,354 @@ class CookieModel(BaseModel):
     class Config:
         from_attributes = True
 
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/93.0.4577.63 Safari/537.36"
+)
+DEFAULT_VIEWPORT = {"width": 1280, "height": 720}
+HEALTH_TIMEOUT = 2.0
+RESET_TIMEOUT = 5.0
+HEAP_SCRIPT = "() => performance.memory ? performance.memory.usedJSHeapSize : 0"
+CLEAR_STORAGE_SCRIPT = """() => {
+    try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+}"""
+
+
+def fingerprint(state: Dict[str, Any]) -> Tuple[tuple, tuple]:
+    """The cookies and origins with local storage of a context's storage state."""
+
+    cookies = sorted(
+        (cookie["name"], cookie["domain"], cookie["path"], cookie["value"])
+        for cookie in state.get("cookies", ())
+    )
+    origins = sorted(origin["origin"] for origin in state.get("origins", ()) if origin.get("localStorage"))
+    return tuple(cookies), tuple(origins)
+
+
+class ContextSlot:
+    """An isolated browser context and the bookkeeping to retire it."""
+
+    __slots__ = ("context", "pages", "uses", "baseline")
+
+    context: BrowserContext
+    pages: int
+    uses: int
+    baseline: Tuple[tuple, tuple]
+
+    def __init__(self, context: BrowserContext, baseline: Tuple[tuple, tuple]):
+        self.context = context
+        self.pages = 0
+        self.uses = 0
+        self.baseline = baseline
+
+
+class PooledPage:
+    __slots__ = ("page", "slot", "uses", "created_at")
+
+    page: Page
+    slot: ContextSlot
+    uses: int
+    created_at: float
+
+    def __init__(self, page: Page, slot: ContextSlot):
+        self.page = page
+        self.slot = slot
+        self.uses = 0
+        self.created_at = monotonic()
+
+
 class BrowserHandler:
-    def __init__(self) -> None:
-        self.limiter = CapacityLimiter(4)
+    """
+    Playwright browser with a pool of warm pages.
+
+    Pages are spread over several isolated contexts so state leaked by one
+    render can't reach every other one. A page is health-checked before it
+    is handed out, and when it comes back its origin's storage is cleared
+    and it is reset to `about:blank`. A context whose cookies or storage
+    no longer match what it started with is rotated. Pages are replaced
+    after `max_uses` renders or once their JS heap grows past `max_heap`,
+    and a context is replaced once it served `context_uses` pages.
+    The pool grows while callers are queued, up to `max_pages`, and
+    shrinks back towards recent demand when idle.
+    """
+
+    def __init__(
+        self,
+        contexts: int = 3,
+        min_pages: int = 2,
+        max_pages: int = 8,
+        max_uses: int = 50,
+        max_heap: int = 64 * 1024 * 1024,
+        context_uses: int = 500,
+    ) -> None:
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
         self.tracer = trace.get_tracer(__name__)
 
+        self.contexts = contexts
+        self.min_pages = min_pages
+        self.max_pages = max_pages
+        self.max_uses = max_uses
+        self.max_heap = max_heap
+        self.context_uses = context_uses
+
+        self._slots: List[ContextSlot] = []
+        self._idle: List[PooledPage] = []
+        self._available = asyncio.Condition()
+        self._slots_lock = asyncio.Lock()
+        self._size = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._demand = 0.0
+
+    @property
+    def context(self) -> Optional[BrowserContext]:
+        return self._slots[0].context if self._slots else None
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "contexts": len(self._slots),
+            "pages": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "queued": self._waiters,
+        }
+
     async def cleanup(self) -> None:
         """Cleanup browser resources."""
         with self.tracer.start_as_current_span("browser_cleanup"):
+            async with self._available:
+                idle, self._idle = self._idle, []
+                slots, self._slots = self._slots, []
+                self._size -= len(idle)
+
+            for slot in slots:
+                with suppress(Exception):
+                    await slot.context.close()
+
+            if self.browser:
+                with suppress(Exception):
+                    await self.browser.close()
+                self.browser = None
             if self.playwright:
                 await self.playwright.stop()
-            if self.browser:
-                await self.browser.close()
+                self.playwright = None
             log.info("Browser resources cleaned up")
 
+    async def _new_context(self) -> ContextSlot:
+        context = await self.browser.new_context(user_agent=USER_AGENT)
+
+        cookies = [
+            cookie.dict(exclude_unset=True)
+            for _cookie in jar
+            if (cookie := CookieModel.from_orm(_cookie))
+        ]
+        if cookies:
+            await context.add_cookies(cookies)
+
+        return ContextSlot(context, fingerprint(await context.storage_state()))
+
     async def init(self) -> None:
-        """Initialize browser and context."""
+        """Initialize the browser, its contexts and the first warm pages."""
         with self.tracer.start_as_current_span("browser_init"):
+            await self.cleanup()
             try:
-                await self.cleanup()
                 self.playwright = await async_playwright().start()
                 self.browser = await self.playwright.chromium.launch(
                     proxy={
                         "server": f"http://{config.PROXY.HOST}:{config.PROXY.PORT}"
                     } if hasattr(config, 'PROXY') else None
                 )
-                
-                self.context = await self.browser.new_context(
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/93.0.4577.63 Safari/537.36"
+
+                self._slots = list(
+                    await asyncio.gather(
+                        *(self._new_context() for _ in range(max(1, self.contexts)))
                     )
                 )
-                
-                cookies = [
-                    cookie.dict(exclude_unset=True)
-                    for _cookie in jar
-                    if (cookie := CookieModel.from_orm(_cookie))
-                ]
-                if cookies:
-                    await self.context.add_cookies(cookies)
-                
-                log.info("Browser initialized successfully")
-                
-            except Exception as e:
-                log.error(f"Failed to initialize browser: {e}")
-                log.warning("Browser features will be disabled. Bot will continue without browser functionality.")
-                # Don't raise - allow bot to continue without browser
+                await self.warm(self.min_pages)
+            except Exception:
+                # The startup registry records the failure and retries on
+                # the next command needing the browser, from a clean slate.
+                await self.cleanup()
+                raise
 
-    @asynccontextmanager
-    async def borrow_page(self) -> AsyncGenerator[Page, None]:
-        """Borrow a page from the browser context."""
-        if not self.context:
+            log.info("Browser initialized successfully")
+
+    async def warm(self, count: int) -> None:
+        """Open pages ahead of demand, without exceeding `max_pages`."""
+        async with self._available:
+            count = max(0, min(count, self.max_pages - self._size))
+            self._size += count
+
+        pages = await asyncio.gather(
+            *(self._create() for _ in range(count)),
+            return_exceptions=True,
+        )
+        async with self._available:
+            for pooled in pages:
+                if isinstance(pooled, PooledPage):
+                    self._idle.append(pooled)
+                else:
+                    self._size -= 1
+                    log.warning(f"Failed to warm browser page: {pooled}")
+
+            self._available.notify_all()
+
+    async def _slot(self) -> ContextSlot:
+        """The context a new page should open in, recycling exhausted ones."""
+        async with self._slots_lock:
+            for index, slot in enumerate(self._slots):
+                if slot.uses >= self.context_uses and not slot.pages:
+                    with suppress(Exception):
+                        await slot.context.close()
+                    self._slots[index] = await self._new_context()
+
+            fresh = [slot for slot in self._slots if slot.uses < self.context_uses]
+            slot = min(fresh or self._slots, key=lambda slot: slot.pages)
+            slot.pages += 1
+            return slot
+
+    async def _create(self) -> PooledPage:
+        slot = await self._slot()
+        try:
+            page = await slot.context.new_page()
+        except Exception:
+            slot.pages -= 1
+            raise
+
+        return PooledPage(page, slot)
+
+    async def _retire(self, pooled: PooledPage) -> None:
+        pooled.slot.pages -= 1
+        with suppress(Exception):
+            await pooled.page.close()
+
+        async with self._available:
+            self._size -= 1
+            self._available.notify()
+
+    async def _healthy(self, pooled: PooledPage) -> bool:
+        if pooled.page.is_closed() or pooled.slot.uses >= self.context_uses:
+            return False
+
+        try:
+            return await asyncio.wait_for(pooled.page.evaluate("1"), HEALTH_TIMEOUT) == 1
+        except Exception:
+            return False
+
+    async def _reset(self, page: Page) -> Optional[Dict[str, Any]]:
+        """Blank a page, returning its context's storage state or None if it grew too large."""
+        if page.viewport_size != DEFAULT_VIEWPORT:
+            await page.set_viewport_size(DEFAULT_VIEWPORT)
+
+        await page.evaluate(CLEAR_STORAGE_SCRIPT)
+        await page.goto("about:blank")
+        if self.max_heap and await page.evaluate(HEAP_SCRIPT) > self.max_heap:
+            return None
+
+        return await page.context.storage_state()
+
+    async def _reusable(self, pooled: PooledPage) -> bool:
+        """Reset a returned page, reporting whether it should stay pooled."""
+        if pooled.uses >= self.max_uses or pooled.slot.uses >= self.context_uses:
+            return False
+
+        try:
+            state = await asyncio.wait_for(self._reset(pooled.page), RESET_TIMEOUT)
+        except Exception:
+            return False
+
+        if state is None:
+            return False
+
+        if fingerprint(state) != pooled.slot.baseline:
+            # Cookies or storage leaked into the context, retire it.
+            pooled.slot.uses = self.context_uses
+            return False
+
+        return True
+
+    async def acquire(self) -> PooledPage:
+        """
+        Take a healthy page from the pool, opening one if there's room.
+
+        Every acquired page has to be handed back through `release`,
+        prefer `borrow_page` which does so.
+        """
+        if not self._slots:
             raise RuntimeError("Browser context is not initialized")
 
+        while True:
+            async with self._available:
+                self._demand = max(
+                    float(self._in_use + self._waiters + 1), self._demand * 0.9
+                )
+                if not self._idle and self._size >= self.max_pages:
+                    self._waiters += 1
+                    try:
+                        await self._available.wait_for(
+                            lambda: self._idle or self._size < self.max_pages
+                        )
+                    finally:
+                        self._waiters -= 1
+
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    self._size += 1
+                self._in_use += 1
+
+            if pooled is None:
+                try:
+                    pooled = await self._create()
+                except Exception:
+                    async with self._available:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._available.notify()
+                    raise
+
+                return pooled
+
+            if await self._healthy(pooled):
+                return pooled
+
+            async with self._available:
+                self._in_use -= 1
+            await self._retire(pooled)
+
+    async def release(self, pooled: PooledPage) -> None:
+        """Return a page to the pool, replacing or dropping it as needed."""
+        pooled.uses += 1
+        pooled.slot.uses += 1
+        keep = await self._reusable(pooled)
+
+        async with self._available:
+            self._in_use -= 1
+            target = max(self.min_pages, ceil(self._demand))
+            if keep and (self._waiters or self._size <= target):
+                self._idle.append(pooled)
+                self._available.notify()
+                return
+
+        await self._retire(pooled)
+
+    @asynccontextmanager
+    async def borrow_page(self) -> AsyncGenerator[Page, None]:
+        """Borrow a warm page from the pool."""
         with self.tracer.start_as_current_span("borrow_page") as span:
-            await self.limiter.acquire()
             identifier = token_urlsafe(12)
             span.set_attribute("page.id", identifier)
-            
+
+            started = monotonic()
+            pooled = await self.acquire()
+            span.set_attribute("page.wait", monotonic() - started)
+            span.set_attribute("page.uses", pooled.uses)
+
             try:
-                page = await self.context.new_page()
                 log.debug(f"Borrowed page ID {identifier}")
-                yield page
+                yield pooled.page
             finally:
-                self.limiter.release()
-                await page.close()
-                log.debug(f"Released page ID {identifier}") 
\ No newline at end of file
+                await self.release(pooled)
+                log.debug(f"Released page ID {identifier}")
@@ -7,6 +7,8 @@ from functools import wraps
 from typing import Any, Callable, Coroutine, Generic, MutableMapping, Protocol, TypeVar
 from collections import OrderedDict
 
+from utils.metrics import CacheCounter
+
 R = TypeVar("R")
 
 
@@ -121,15 +123,19 @@ def cache(
 
             return ":".join(key)
 
+        counter = CacheCounter(f"{func.__module__}.{func.__qualname__}")
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             key = _make_key(args, kwargs)
             try:
                 task = _internal_cache[key]
             except KeyError:
+                counter.miss.inc()
                 _internal_cache[key] = task = asyncio.create_task(func(*args, **kwargs))
                 return task
             else:
+                counter.hit.inc()
                 return task
 
         def _invalidate(*args: Any, **kwargs: Any) -> bool:
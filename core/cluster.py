@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import signal
+import time
+from ctypes import c_double, c_int
+from multiprocessing.process import BaseProcess
+from typing import List, Optional
+
+import psutil
+
+import config
+from utils.logger import log
+from utils.metrics import write_targets
+
+_context = multiprocessing.get_context("spawn")
+
+
+def shard_layout(total_shards: int, cluster_count: int) -> List[List[int]]:
+    """Split the shard ids into contiguous blocks, one per cluster."""
+
+    per_cluster = math.ceil(total_shards / cluster_count)
+    return [
+        list(range(start, min(start + per_cluster, total_shards)))
+        for start in range(0, total_shards, per_cluster)
+    ]
+
+
+async def _beat(bot, heartbeat: c_double, ready: c_int) -> None:
+    """Touch the shared heartbeat from the event loop, so a blocked loop goes stale."""
+
+    while True:
+        heartbeat.value = time.time()
+        ready.value = int(bot._is_ready.is_set())
+        await asyncio.sleep(config.SHARDING.HEARTBEAT_INTERVAL)
+
+
+async def _serve(
+    cluster_id: int,
+    shard_ids: List[int],
+    total_shards: int,
+    cluster_count: int,
+    heartbeat: c_double,
+    ready: c_int,
+) -> None:
+    from core.bot import Pride
+
+    bot = Pride(
+        cluster_id=cluster_id,
+        cluster_count=cluster_count,
+        shard_ids=shard_ids,
+        shard_count=total_shards,
+        owner_ids=config.CLIENT.OWNER_IDS,
+        description=config.CLIENT.DESCRIPTION,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    beat = asyncio.create_task(_beat(bot, heartbeat, ready))
+    runner = asyncio.create_task(bot.start(config.CLIENT.TOKEN))
+    stopper = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait({runner, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        if runner.done() and runner.exception():
+            raise runner.exception()  # type: ignore
+    finally:
+        beat.cancel()
+        stopper.cancel()
+        if not bot.is_closed():
+            await bot.close()
+
+
+def run_cluster(
+    cluster_id: int,
+    shard_ids: List[int],
+    total_shards: int,
+    cluster_count: int,
+    heartbeat: c_double,
+    ready: c_int,
+) -> None:
+    """Process entry point for a single cluster."""
+
+    from utils.logger import setup_logging
+    from utils.monitoring import setup_monitoring
+
+    setup_logging()
+    setup_monitoring()
+    log.info(f"Starting cluster {cluster_id} with shards {shard_ids}")
+    asyncio.run(
+        _serve(cluster_id, shard_ids, total_shards, cluster_count, heartbeat, ready)
+    )
+
+
+class ClusterProcess:
+    """Supervision state for one cluster's OS process."""
+
+    def __init__(self, cluster_id: int, shard_ids: List[int], total_shards: int, cluster_count: int):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.total_shards = total_shards
+        self.cluster_count = cluster_count
+
+        self.heartbeat = _context.Value("d", 0.0, lock=False)
+        self.ready = _context.Value("i", 0, lock=False)
+        self.process: Optional[BaseProcess] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.next_start = 0.0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self) -> None:
+        self.heartbeat.value = 0.0
+        self.ready.value = 0
+        self.process = _context.Process(
+            target=run_cluster,
+            args=(
+                self.cluster_id,
+                self.shard_ids,
+                self.total_shards,
+                self.cluster_count,
+                self.heartbeat,
+                self.ready,
+            ),
+            name=f"cluster-{self.cluster_id}",
+        )
+        self.process.start()
+        self.started_at = time.monotonic()
+        log.info(f"Cluster {self.cluster_id} started as pid {self.process.pid}")
+
+    def unhealthy(self) -> Optional[str]:
+        """Why the process should be replaced, if it should."""
+
+        if not self.alive:
+            return f"exited with code {self.process.exitcode if self.process else None}"
+
+        now = time.monotonic()
+        if now - self.started_at < config.SHARDING.STARTUP_GRACE:
+            return None
+
+        if time.time() - self.heartbeat.value > config.SHARDING.HEARTBEAT_TIMEOUT:
+            return "missed heartbeats"
+
+        if config.SHARDING.MAX_MEMORY_MB:
+            try:
+                rss = psutil.Process(self.process.pid).memory_info().rss  # type: ignore
+            except psutil.Error:
+                return None
+
+            if rss > config.SHARDING.MAX_MEMORY_MB * 1024 * 1024:
+                return f"using {rss // (1024 * 1024)}MB"
+
+        return None
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        if not self.process:
+            return
+
+        if self.process.is_alive():
+            self.process.terminate()
+            deadline = time.monotonic() + (timeout or config.SHARDING.SHUTDOWN_TIMEOUT)
+            while self.process.is_alive() and time.monotonic() < deadline:
+                await asyncio.sleep(0.5)
+
+            if self.process.is_alive():
+                log.warning(f"Cluster {self.cluster_id} ignored SIGTERM, killing it")
+                self.process.kill()
+
+        self.process.join(timeout=1)
+        self.process = None
+
+    def schedule_restart(self) -> float:
+        """Record a failure and return the backoff delay before the next start."""
+
+        if time.monotonic() - self.started_at > config.SHARDING.STABLE_AFTER:
+            self.failures = 0
+
+        delay = min(
+            config.SHARDING.RESTART_BACKOFF * (2 ** self.failures),
+            config.SHARDING.RESTART_BACKOFF_MAX,
+        )
+        self.failures += 1
+        self.next_start = time.monotonic() + delay
+        return delay
+
+
+class ClusterSupervisor:
+    """
+    Runs every cluster in its own process and keeps it running.
+
+    A cluster is restarted with exponential backoff when its process
+    exits, its heartbeat goes stale or it grows past the memory limit.
+    SIGHUP restarts the clusters one at a time, waiting for each to
+    report ready before moving on.
+    """
+
+    def __init__(self, total_shards: int, cluster_count: int):
+        layout = shard_layout(total_shards, cluster_count)
+        self.clusters = [
+            ClusterProcess(cluster_id, shard_ids, total_shards, len(layout))
+            for cluster_id, shard_ids in enumerate(layout)
+        ]
+        self._stop = asyncio.Event()
+        self._rolling: Optional[asyncio.Task] = None
+
+    async def _wait_ready(self, cluster: ClusterProcess) -> bool:
+        deadline = time.monotonic() + config.SHARDING.STARTUP_GRACE
+        while time.monotonic() < deadline and not self._stop.is_set():
+            if cluster.ready.value:
+                return True
+
+            if not cluster.alive:
+                return False
+
+            await asyncio.sleep(1)
+
+        return bool(cluster.ready.value)
+
+    async def rolling_restart(self) -> None:
+        log.info("Starting rolling restart")
+        for cluster in self.clusters:
+            if self._stop.is_set():
+                return
+
+            await cluster.stop()
+            cluster.failures = 0
+            cluster.start()
+            if not await self._wait_ready(cluster):
+                log.error(f"Cluster {cluster.cluster_id} did not become ready, halting rolling restart")
+                return
+
+        log.info("Rolling restart complete")
+
+    def request_rolling_restart(self) -> None:
+        if self._rolling and not self._rolling.done():
+            log.warning("Rolling restart already in progress")
+            return
+
+        self._rolling = asyncio.create_task(self.rolling_restart())
+
+    async def _check(self) -> None:
+        rolling = self._rolling is not None and not self._rolling.done()
+        for cluster in self.clusters:
+            if cluster.process is None:
+                if not rolling and time.monotonic() >= cluster.next_start:
+                    cluster.start()
+                continue
+
+            if rolling:
+                continue
+
+            if reason := cluster.unhealthy():
+                delay = cluster.schedule_restart()
+                log.error(
+                    f"Cluster {cluster.cluster_id} {reason}, restarting in {delay:.0f}s"
+                )
+                await cluster.stop()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self._stop.set)
+        loop.add_signal_handler(signal.SIGHUP, self.request_rolling_restart)
+
+        log.info(
+            f"Supervising {len(self.clusters)} clusters over "
+            f"{self.clusters[0].total_shards} shards"
+        )
+        write_targets(len(self.clusters))
+        for cluster in self.clusters:
+            cluster.start()
+
+        try:
+            while not self._stop.is_set():
+                await self._check()
+                try:
+                    await asyncio.wait_for(
+                        self._stop.wait(), config.SHARDING.HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._rolling:
+                self._rolling.cancel()
+
+            log.info("Stopping clusters")
+            await asyncio.gather(*(cluster.stop() for cluster in self.clusters))
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, TypeVar
+
+from discord.ext.commands import BucketType, Command, Cooldown, CooldownMapping
+from prometheus_client import Counter, Gauge
+
+import config
+from utils.logger import log
+
+T = TypeVar("T")
+
+COOLDOWN_LIMITED = Counter(
+    "cooldown_limited_total",
+    "Checks refused by a cooldown",
+    ["cooldown"],
+)
+COOLDOWN_BUCKETS = Gauge(
+    "cooldown_buckets",
+    "Token buckets currently held per cooldown",
+    ["cooldown"],
+)
+COOLDOWN_EVICTIONS = Counter(
+    "cooldown_evictions_total",
+    "Buckets evicted before they refilled because a cooldown hit its memory ceiling",
+    ["cooldown"],
+)
+COOLDOWN_PENALTIES = Counter(
+    "cooldown_penalties_total",
+    "Violations which put an offender's bucket into debt",
+    ["cooldown"],
+)
+
+
+class TokenBucket(Cooldown):
+    """
+    A `Cooldown` which refills continuously at `rate` per `per` seconds.
+
+    Unlike the fixed window it replaces, a burst can't straddle a window
+    boundary to get twice the rate through. Tokens may go negative as a
+    penalty, the bucket then needs correspondingly longer to refill.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, rate: float, per: float):
+        super().__init__(rate, per)
+        self._tokens = float(self.rate)
+
+    def _refill(self, current: float) -> float:
+        return min(self.rate, self._tokens + (current - self._last) * self.rate / self.per)
+
+    def full(self, current: float) -> bool:
+        return self._refill(current) >= self.rate
+
+    def get_tokens(self, current: Optional[float] = None) -> int:
+        return max(int(self._refill(current or time.time())), 0)
+
+    def get_retry_after(self, current: Optional[float] = None) -> float:
+        tokens = self._refill(current or time.time())
+        return 0.0 if tokens >= 1 else (1 - tokens) * self.per / self.rate
+
+    def update_rate_limit(
+        self,
+        current: Optional[float] = None,
+        *,
+        tokens: int = 1,
+    ) -> Optional[float]:
+        current = current or time.time()
+        available = self._refill(current)
+        self._last = current
+        if available < tokens:
+            self._tokens = available
+            return (tokens - available) * self.per / self.rate
+
+        self._tokens = available - tokens
+        return None
+
+    def penalize(self, tokens: float, floor: float) -> None:
+        self._tokens = max(self._tokens - tokens, floor)
+
+    def reset(self) -> None:
+        self._tokens = float(self.rate)
+        self._last = 0.0
+
+
+class BucketMap(CooldownMapping):
+    """
+    A `CooldownMapping` of token buckets with a memory ceiling.
+
+    Buckets are kept in use order. Each lookup drops up to two refilled
+    buckets from the cold end, where they usually are since colder
+    buckets were last drained earlier. A bucket still in penalty debt
+    can hold that back, refilled buckets behind it then stay until past
+    `max_size` the least recently used bucket is evicted. Every lookup
+    is O(1).
+    """
+
+    def __init__(
+        self,
+        original: Optional[Cooldown],
+        type: Callable[[Any], Any],
+        name: str = "command",
+        max_size: int = config.COOLDOWNS.MAX_BUCKETS,
+    ):
+        super().__init__(original, type)
+        self._cache: OrderedDict[Any, TokenBucket] = OrderedDict()
+        self.name = name
+        self.max_size = max_size
+        self._size = COOLDOWN_BUCKETS.labels(cooldown=name)
+        self._evictions = COOLDOWN_EVICTIONS.labels(cooldown=name)
+
+    @classmethod
+    def from_cooldown(
+        cls,
+        rate: float,
+        per: float,
+        type: Callable[[Any], Any],
+        name: str = "command",
+    ) -> BucketMap:
+        return cls(TokenBucket(rate, per), type, name)
+
+    def copy(self) -> BucketMap:
+        ret = self.__class__(self._cooldown, self._type, self.name, self.max_size)
+        ret._cache = self._cache.copy()
+        self._size.inc(len(ret._cache))
+        return ret
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _verify_cache_integrity(self, current: Optional[float] = None) -> None:
+        current = current or time.time()
+        for _ in range(2):
+            if not self._cache:
+                return
+
+            key = next(iter(self._cache))
+            if not self._cache[key].full(current):
+                return
+
+            del self._cache[key]
+            self._size.dec()
+
+    def get_bucket(self, message: Any, current: Optional[float] = None) -> Optional[TokenBucket]:
+        if self._type is BucketType.default:
+            return self._cooldown  # type: ignore
+
+        self._verify_cache_integrity(current)
+        key = self._bucket_key(message)
+        bucket = self._cache.get(key)
+        if bucket is not None:
+            self._cache.move_to_end(key)
+            return bucket
+
+        bucket = self.create_bucket(message)
+        if bucket is None:
+            return None
+
+        self._cache[key] = bucket
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self._evictions.inc()
+        else:
+            self._size.inc()
+
+        return bucket
+
+
+def cooldown(rate: int, per: float, type: BucketType = BucketType.default) -> Callable[[T], T]:
+    """Drop-in for `commands.cooldown` backed by a bounded `BucketMap`."""
+
+    def decorator(func: T) -> T:
+        mapping = BucketMap(TokenBucket(rate, per), type)
+        if isinstance(func, Command):
+            func._buckets = mapping
+        else:
+            func.__commands_cooldown__ = mapping  # type: ignore
+
+        return func
+
+    return decorator
+
+
+class Violation:
+    __slots__ = ("score", "updated")
+
+    def __init__(self, score: float, updated: float):
+        self.score = score
+        self.updated = updated
+
+
+class Violations:
+    """
+    Decaying violation scores per key, least recently seen evicted first.
+
+    A score halves every `half_life` seconds, so an offender who stops
+    is forgiven without anything having to sweep the table.
+    """
+
+    def __init__(
+        self,
+        max_size: int = config.COOLDOWNS.MAX_VIOLATIONS,
+        half_life: float = config.COOLDOWNS.VIOLATION_HALF_LIFE,
+    ):
+        self.max_size = max_size
+        self.half_life = half_life
+        self._scores: OrderedDict[Any, Violation] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def score(self, key: Any, current: Optional[float] = None) -> float:
+        violation = self._scores.get(key)
+        if violation is None:
+            return 0.0
+
+        current = current or time.time()
+        return violation.score * 0.5 ** ((current - violation.updated) / self.half_life)
+
+    def record(self, key: Any, current: Optional[float] = None) -> float:
+        """Count a violation, returning the key's new score."""
+
+        current = current or time.time()
+        score = self.score(key, current) + 1
+        violation = self._scores.get(key)
+        if violation is None:
+            self._scores[key] = Violation(score, current)
+            if len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+        else:
+            violation.score = score
+            violation.updated = current
+            self._scores.move_to_end(key)
+
+        return score
+
+
+class Limit(NamedTuple):
+    mapping: BucketMap
+    shared: bool
+    escalate: bool
+
+
+class Cooldowns:
+    """
+    The bot's own cooldowns: command spam per user, message floods per
+    guild and channel.
+
+    Checks are local token buckets, see `BucketMap`. Limits added with
+    `escalate` record a violation every time they refuse someone; past
+    the threshold each further violation puts the offender's bucket into
+    debt, doubling with every violation and never deeper than
+    `MAX_PENALTY` times the limit, so persistent abusers wait longer
+    while everyone else keeps the plain limit. Only escalate per-user
+    limits, debt on a guild or channel bucket locks out everyone in it.
+    `shared` limits are additionally checked against a Redis sliding
+    window when `COOLDOWNS.SHARED` is on, which makes a user's limit
+    hold across clusters at the cost of a round trip.
+    """
+
+    def __init__(self, bot, settings=config.COOLDOWNS):
+        self.bot = bot
+        self.settings = settings
+        self.violations = Violations(settings.MAX_VIOLATIONS, settings.VIOLATION_HALF_LIFE)
+        self._limits: Dict[str, Limit] = {}
+
+    def __getitem__(self, name: str) -> BucketMap:
+        return self._limits[name].mapping
+
+    def add(
+        self,
+        name: str,
+        rate: int,
+        per: float,
+        type: BucketType,
+        *,
+        shared: bool = False,
+        escalate: bool = False,
+    ) -> BucketMap:
+        mapping = BucketMap(TokenBucket(rate, per), type, name, self.settings.MAX_BUCKETS)
+        self._limits[name] = Limit(mapping, shared, escalate)
+        return mapping
+
+    def check(self, name: str, message: Any) -> Optional[float]:
+        """Take a token from `name`, the retry after if there was none."""
+
+        limit = self._limits[name]
+        current = time.time()
+        bucket = limit.mapping.get_bucket(message, current)
+        if bucket is None:
+            return None
+
+        retry_after = bucket.update_rate_limit(current)
+        if retry_after is None:
+            return None
+
+        COOLDOWN_LIMITED.labels(cooldown=name).inc()
+        if limit.escalate:
+            penalty = self._penalty(limit.mapping._bucket_key(message), current)
+            if penalty:
+                bucket.penalize(
+                    penalty * bucket.rate, -self.settings.MAX_PENALTY * bucket.rate
+                )
+                COOLDOWN_PENALTIES.labels(cooldown=name).inc()
+                retry_after = bucket.get_retry_after(current)
+
+        return retry_after
+
+    def _penalty(self, key: Any, current: float) -> float:
+        excess = self.violations.record(key, current) - self.settings.VIOLATION_THRESHOLD
+        if excess <= 0:
+            return 0.0
+
+        return min(2 ** excess, self.settings.MAX_PENALTY) - 1
+
+    async def hit(self, name: str, message: Any) -> Optional[float]:
+        """`check`, plus the cross-cluster window for shared limits."""
+
+        if (retry_after := self.check(name, message)) is not None:
+            return retry_after
+
+        limit = self._limits[name]
+        if not (limit.shared and self.settings.SHARED):
+            return None
+
+        template = limit.mapping._cooldown
+        key = f"cooldown:{name}:{limit.mapping._bucket_key(message)}"
+        try:
+            if await self.bot.redis.ratelimited(key, template.rate, template.per):
+                COOLDOWN_LIMITED.labels(cooldown=name).inc()
+                return template.per / template.rate
+        except Exception as e:
+            log.debug(f"Shared cooldown {name} unavailable, using the local bucket: {e}")
+
+        return None
@@ -1,8 +1,9 @@
 from typing import Any, List, Optional, Union
 from json import dumps, loads
-from asyncpg import Connection, Pool, Record as DefaultRecord, create_pool
-from opentelemetry import trace
+from asyncpg import Connection, Pool, Record as DefaultRecord
 from utils.logger import log
+from utils.tracing import get_tracer
+from utils.metrics import DB_POOL_WAIT_SECONDS, DB_QUERY_SECONDS, observe, statement_label
 from .settings import Settings
 import config
 
@@ -22,11 +23,39 @@ class Record(DefaultRecord):
     def to_dict(self) -> dict[str, Any]:
         return dict(self)
 
+class MonitoredConnection(Connection):
+    """Connection which times every statement into `db_query_seconds`."""
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        with observe(DB_QUERY_SECONDS, statement=statement_label(query)):
+            return await super().execute(query, *args, **kwargs)
+
+    async def executemany(self, command: str, args: Any, **kwargs: Any) -> None:
+        with observe(DB_QUERY_SECONDS, statement=statement_label(command)):
+            return await super().executemany(command, args, **kwargs)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> List[Record]:
+        with observe(DB_QUERY_SECONDS, statement=statement_label(query)):
+            return await super().fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Optional[Record]:
+        with observe(DB_QUERY_SECONDS, statement=statement_label(query)):
+            return await super().fetchrow(query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        with observe(DB_QUERY_SECONDS, statement=statement_label(query)):
+            return await super().fetchval(query, *args, **kwargs)
+
+
 class Database(Pool):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._statement_cache = {}
-        self.tracer = trace.get_tracer(__name__)
+        self.tracer = get_tracer("database")
+
+    async def _acquire(self, timeout: Optional[float]) -> Connection:
+        # Every public acquire path, including `Pool.fetch` & co., ends up here.
+        with observe(DB_POOL_WAIT_SECONDS):
+            return await super()._acquire(timeout)
 
     async def execute(
         self,
@@ -36,10 +65,7 @@ class Database(Pool):
     ) -> str:
         with self.tracer.start_as_current_span("db_execute") as span:
             span.set_attribute("db.statement", query)
-            if query not in self._statement_cache:
-                self._statement_cache[query] = await self.prepare(query)
-            stmt = self._statement_cache[query]
-            return await stmt.execute(*args, timeout=timeout)
+            return await super().execute(query, *args, timeout=timeout)
 
     async def fetch(
         self,
@@ -49,10 +75,7 @@ class Database(Pool):
     ) -> List[Record]:
         with self.tracer.start_as_current_span("db_fetch") as span:
             span.set_attribute("db.statement", query)
-            if query not in self._statement_cache:
-                self._statement_cache[query] = await self.prepare(query)
-            stmt = self._statement_cache[query]
-            return await stmt.fetch(*args, timeout=timeout)
+            return await super().fetch(query, *args, timeout=timeout)
 
     async def fetchrow(
         self,
@@ -62,10 +85,7 @@ class Database(Pool):
     ) -> Optional[Record]:
         with self.tracer.start_as_current_span("db_fetchrow") as span:
             span.set_attribute("db.statement", query)
-            if query not in self._statement_cache:
-                self._statement_cache[query] = await self.prepare(query)
-            stmt = self._statement_cache[query]
-            return await stmt.fetchrow(*args, timeout=timeout)
+            return await super().fetchrow(query, *args, timeout=timeout)
 
     async def fetchval(
         self,
@@ -75,10 +95,44 @@ class Database(Pool):
     ) -> Optional[str | int]:
         with self.tracer.start_as_current_span("db_fetchval") as span:
             span.set_attribute("db.statement", query)
-            if query not in self._statement_cache:
-                self._statement_cache[query] = await self.prepare(query)
-            stmt = self._statement_cache[query]
-            return await stmt.fetchval(*args, timeout=timeout)
+            return await super().fetchval(query, *args, timeout=timeout)
+
+def database_pool(
+    dsn: str,
+    *,
+    min_size: int = 10,
+    max_size: int = 10,
+    max_queries: int = 50000,
+    max_inactive_connection_lifetime: float = 300.0,
+    setup: Any = None,
+    init: Any = None,
+    record_class: type = DefaultRecord,
+    **connect_kwargs: Any,
+) -> Database:
+    """
+    `asyncpg.create_pool` for the instrumented pool class.
+
+    `create_pool` can't be given a pool class, so this calls the `Pool`
+    constructor, whose signature changes between releases, and `Database`
+    overrides the private `_acquire`; asyncpg is pinned to the exact
+    version both were written against in requirements.txt.
+
+    The result has to be awaited to open the initial connections.
+    """
+
+    return Database(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        max_queries=max_queries,
+        max_inactive_connection_lifetime=max_inactive_connection_lifetime,
+        setup=setup,
+        init=init,
+        loop=None,
+        connection_class=MonitoredConnection,
+        record_class=record_class,
+        **connect_kwargs,
+    )
 
 async def init_connection(conn: Connection) -> None:
     await conn.set_type_codec(
@@ -90,7 +144,7 @@ async def init_connection(conn: Connection) -> None:
 
 async def create_db_pool() -> Database:
     try:
-        pool = await create_pool(
+        pool = await database_pool(
             config.DATABASE.DSN,
             record_class=Record,
             init=init_connection,
@@ -109,4 +163,4 @@ async def create_db_pool() -> Database:
         log.exception(f"Failed to connect to PostgreSQL: {e}")
         raise
 
-__all__ = ("Database", "Settings", "create_db_pool") 
\ No newline at end of file
+__all__ = ("Database", "MonitoredConnection", "Settings", "create_db_pool", "database_pool") 
\ No newline at end of file
@@ -159,6 +159,7 @@ class Settings:
             setattr(self, key, value)
 
         self.fetch.invalidate_containing(self.guild.id)
+        await self.bot.join_pipeline.invalidate(self.guild.id)
 
     @classmethod
     @cache(maxsize=128, strategy=Strategy.lru)
@@ -1,59 +1,453 @@
-import time
+from __future__ import annotations
+
 import asyncio
-from collections import defaultdict
-from discord.http import HTTPClient, Route
-from opentelemetry import trace
-from typing import Any
-
-class MonitoredHTTPClient(HTTPClient):
-    def __init__(self, session, *, bot=None):
-        super().__init__(session)
-        self.bot = bot
-        self._global_over = asyncio.Event()
-        self._global_over.set()
-        self.tracer = trace.get_tracer(__name__)
-        
-        if not hasattr(self.bot, 'api_stats'):
-            self.bot.api_stats = defaultdict(lambda: {
-                'calls': 0,
-                'errors': 0,
-                'total_time': 0,
-                'rate_limits': 0
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from aiohttp import TraceConfig
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from utils.logger import log
+from utils.metrics import RATELIMIT_HITS, REST_REQUEST_SECONDS
+
+API_HOST = "discord.com"
+GLOBAL_LIMIT = 50
+
+_SNOWFLAKE = re.compile(r"^\d{15,21}$")
+_MAJOR = {
+    "channels": "channel_id",
+    "guilds": "guild_id",
+    "webhooks": "webhook_id",
+}
+_OPAQUE = {
+    "reactions": "emoji",
+    "invites": "code",
+    "templates": "code",
+}
+
+
+@lru_cache(maxsize=8192)
+def route_template(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Turn a concrete API path back into its route and major parameter.
+
+    `/api/v10/channels/123/messages/456` -> (`/channels/{channel_id}/messages/{id}`, `123`)
+    """
+
+    parts = path.strip("/").split("/")
+    if parts[:1] == ["api"]:
+        parts = parts[2:] if len(parts) > 1 and parts[1].startswith("v") else parts[1:]
+
+    major: Optional[str] = None
+    template: List[str] = []
+    for index, part in enumerate(parts):
+        previous = parts[index - 1] if index else ""
+        if _SNOWFLAKE.match(part):
+            if previous in _MAJOR:
+                template.append(f"{{{_MAJOR[previous]}}}")
+                major = major or part
+            else:
+                template.append("{id}")
+        elif previous in _OPAQUE:
+            template.append(f"{{{_OPAQUE[previous]}}}")
+        elif index > 1 and parts[index - 2] in ("webhooks", "interactions") and _SNOWFLAKE.match(previous):
+            template.append("{token}")
+        else:
+            template.append(part)
+
+    return "/" + "/".join(template), major
+
+
+class LatencySketch:
+    """
+    Log-bucketed latency histogram with `accuracy` relative error.
+
+    Memory is bounded by the number of buckets between `MIN` and `MAX`
+    (a few hundred at 2%) no matter how many samples are added.
+    """
+
+    MIN = 0.0005
+    MAX = 120.0
+
+    __slots__ = ("gamma", "_log_gamma", "counts", "count")
+
+    def __init__(self, accuracy: float = 0.02):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        value = min(max(value, self.MIN), self.MAX)
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other: LatencySketch) -> LatencySketch:
+        merged = LatencySketch()
+        merged.gamma, merged._log_gamma = self.gamma, self._log_gamma
+        for sketch in (self, other):
+            for index, count in sketch.counts.items():
+                merged.counts[index] = merged.counts.get(index, 0) + count
+            merged.count += sketch.count
+
+        return merged
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        running = 0
+        for index in sorted(self.counts):
+            running += self.counts[index]
+            if running > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+
+        return self.MAX
+
+
+class Window:
+    __slots__ = ("started", "latency", "requests", "errors", "ratelimits")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.latency = LatencySketch()
+        self.requests = 0
+        self.errors = 0
+        self.ratelimits = 0
+
+
+class BucketStats:
+    """Rolling stats and the last known rate limit state of one bucket."""
+
+    __slots__ = ("route", "current", "previous", "limit", "remaining", "reset_at")
+
+    def __init__(self, route: str, now: float):
+        self.route = route
+        self.current = Window(now)
+        self.previous: Optional[Window] = None
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+    def window(self, now: float, length: float) -> Window:
+        if now - self.current.started >= length:
+            # A bucket idle for a whole window has nothing worth keeping.
+            fresh = now - self.current.started < length * 2
+            self.previous = self.current if fresh else None
+            self.current = Window(now)
+
+        return self.current
+
+    def windows(self) -> List[Window]:
+        return [self.current] + ([self.previous] if self.previous else [])
+
+
+class Budget(NamedTuple):
+    limit: Optional[int]
+    remaining: Optional[int]
+    reset_after: float
+    global_remaining: int
+
+    def allows(self, cost: int = 1) -> bool:
+        if self.global_remaining < cost:
+            return False
+
+        return self.remaining is None or self.remaining >= cost
+
+
+class RestStats:
+    """
+    Per rate-limit bucket REST statistics fed from aiohttp request tracing.
+
+    Every response from the API updates the bucket it belongs to with its
+    latency and the rate limit headers, so `forecast` and `pace` can tell
+    bulk operations how much budget a route has left before the next
+    request would be answered with a 429. Stats cover the last one or two
+    `window`s and at most `max_buckets` buckets are kept.
+
+    The global limit is per bot token while every cluster process only
+    sees its own requests, so each of the `clusters` gets an even share.
+    """
+
+    PROBE_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        max_buckets: int = 2048,
+        window: float = 300.0,
+        global_limit: int = GLOBAL_LIMIT,
+        clusters: int = 1,
+    ):
+        self.max_buckets = max_buckets
+        self.window = window
+        self.global_limit = max(global_limit // max(clusters, 1), 1)
+
+        self._buckets: OrderedDict[str, BucketStats] = OrderedDict()
+        self._hashes: OrderedDict[str, str] = OrderedDict()
+        self._recent: Deque[float] = deque()
+        self._probes: Dict[str, float] = {}
+        self.global_reset_at = 0.0
+        self.global_ratelimits = 0
+
+    def trace_config(self) -> TraceConfig:
+        """The TraceConfig to hand to discord.py through `http_trace`."""
+
+        trace_config = TraceConfig()
+
+        async def on_request_start(session, context, params) -> None:
+            context.started = time.perf_counter()
+
+        async def on_request_end(session, context, params) -> None:
+            url = params.url
+            if url.host != API_HOST or not url.path.startswith("/api/"):
+                return
+
+            self.observe(
+                params.method,
+                url.path,
+                params.response.status,
+                params.response.headers,
+                time.perf_counter() - context.started,
+            )
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    def _key(self, method: str, template: str, major: Optional[Any]) -> str:
+        route = f"{method} {template}"
+        return f"{self._hashes.get(route, route)}:{major}"
+
+    def _bucket(self, key: str, route: str, now: float) -> BucketStats:
+        stats = self._buckets.get(key)
+        if stats is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets.popitem(last=False)
+            stats = self._buckets[key] = BucketStats(route, now)
+        else:
+            self._buckets.move_to_end(key)
+
+        return stats
+
+    def _trim(self, now: float) -> None:
+        while self._recent and now - self._recent[0] >= 1:
+            self._recent.popleft()
+
+    def observe(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        headers: Mapping[str, str],
+        elapsed: float,
+    ) -> None:
+        template, major = route_template(path)
+        route = f"{method} {template}"
+        now = time.monotonic()
+
+        self._recent.append(now)
+        self._trim(now)
+        REST_REQUEST_SECONDS.labels(method=method, route=template, status=str(status)).observe(elapsed)
+
+        if bucket_hash := headers.get("X-RateLimit-Bucket"):
+            self._hashes[route] = bucket_hash
+            self._hashes.move_to_end(route)
+            if len(self._hashes) > self.max_buckets:
+                self._hashes.popitem(last=False)
+
+        self._probes.pop(f"{route}:{major}", None)
+        stats = self._bucket(self._key(method, template, major), route, now)
+        window = stats.window(now, self.window)
+        window.requests += 1
+        window.latency.add(elapsed)
+        if status >= 400:
+            window.errors += 1
+
+        if (limit := headers.get("X-RateLimit-Limit")) is not None:
+            stats.limit = int(limit)
+            stats.remaining = int(headers.get("X-RateLimit-Remaining", 0))
+            stats.reset_at = now + float(headers.get("X-RateLimit-Reset-After", 0))
+
+        if status != 429:
+            return
+
+        window.ratelimits += 1
+        retry_after = float(headers.get("Retry-After", 0) or 0)
+        scope = headers.get("X-RateLimit-Scope", "user")
+        RATELIMIT_HITS.labels(route=template, scope=scope).inc()
+
+        if headers.get("X-RateLimit-Global") or scope == "global":
+            self.global_ratelimits += 1
+            self.global_reset_at = max(self.global_reset_at, now + retry_after)
+            log.warning(f"Hit the global rate limit on {route}, retrying in {retry_after:.2f}s")
+        else:
+            stats.remaining = 0
+            stats.reset_at = max(stats.reset_at, now + retry_after)
+
+    def forecast(self, method: str, template: str, major: Optional[Any] = None) -> Budget:
+        """
+        The budget left on a route, e.g. `forecast("PUT", "/guilds/{guild_id}/bans/{id}", guild.id)`.
+
+        `remaining` is None while the route's bucket hasn't been seen yet.
+        """
+
+        now = time.monotonic()
+        self._trim(now)
+        global_remaining = (
+            0 if now < self.global_reset_at else self.global_limit - len(self._recent)
+        )
+
+        stats = self._buckets.get(self._key(method, template, major))
+        if stats is None or stats.limit is None:
+            return Budget(None, None, 0.0, global_remaining)
+
+        if now >= stats.reset_at:
+            return Budget(stats.limit, stats.limit, 0.0, global_remaining)
+
+        return Budget(stats.limit, stats.remaining, stats.reset_at - now, global_remaining)
+
+    async def pace(
+        self,
+        method: str,
+        template: str,
+        major: Optional[Any] = None,
+        cost: int = 1,
+    ) -> float:
+        """
+        Wait until `cost` requests fit in the route's and the global budget.
+
+        The admitted requests are reserved from the bucket so concurrent
+        callers don't all spend the same budget. A bucket which hasn't been
+        seen yet admits a single request, the others wait for its response
+        to learn the limit, or for `PROBE_TIMEOUT` if it never arrives.
+        Returns the time waited.
+        """
+
+        cost = min(cost, self.global_limit)
+        probe = f"{method} {template}:{major}"
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            budget = self.forecast(method, template, major)
+            if budget.remaining is None and budget.global_remaining >= cost:
+                started = self._probes.get(probe)
+                if started is None or now - started >= self.PROBE_TIMEOUT:
+                    self._probes[probe] = now
+                    return waited
+
+                delay = 0.05
+            elif budget.allows(cost):
+                stats = self._buckets.get(self._key(method, template, major))
+                if stats is not None and stats.remaining is not None and now < stats.reset_at:
+                    stats.remaining -= cost
+                return waited
+            elif now < self.global_reset_at:
+                delay = self.global_reset_at - now
+            elif budget.global_remaining < cost:
+                delay = 1 - (now - self._recent[0]) if self._recent else 0.05
+            else:
+                delay = budget.reset_after
+
+            delay = max(delay, 0.05)
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def snapshot(self, limit: int = 25, by: str = "bucket") -> List[Dict[str, Any]]:
+        """
+        The busiest buckets of the current windows, or routes with `by="route"`.
+
+        A route spread over several buckets reports the rate limit state
+        of the one used last.
+        """
+
+        groups: Dict[str, List[BucketStats]] = {}
+        for key, stats in self._buckets.items():
+            groups.setdefault(stats.route if by == "route" else key, []).append(stats)
+
+        now = time.monotonic()
+        rows = []
+        for name, buckets in groups.items():
+            windows = [window for stats in buckets for window in stats.windows()]
+            latency = windows[0].latency
+            for window in windows[1:]:
+                latency = latency.merge(window.latency)
+
+            stats = buckets[-1]
+            rows.append({
+                by: name,
+                "route": stats.route,
+                "requests": sum(window.requests for window in windows),
+                "errors": sum(window.errors for window in windows),
+                "ratelimits": sum(window.ratelimits for window in windows),
+                "p50": latency.quantile(0.5),
+                "p95": latency.quantile(0.95),
+                "p99": latency.quantile(0.99),
+                "limit": stats.limit,
+                "remaining": stats.remaining,
+                "reset_after": max(stats.reset_at - now, 0.0),
             })
-        if not hasattr(self.bot, '_last_stats_cleanup'):
-            self.bot._last_stats_cleanup = time.time()
-
-    async def request(self, route: Route, **kwargs) -> Any:
-        method = route.method
-        path = route.path
-        endpoint = f"{method} {path}"
-        
-        with self.tracer.start_as_current_span(
-            f"discord_api_request",
-            attributes={
-                "http.method": method,
-                "http.route": path
-            }
-        ) as span:
-            start_time = time.time()
-            try:
-                response = await super().request(route, **kwargs)
-                elapsed = time.time() - start_time
-                
-                self.bot.api_stats[endpoint]['calls'] += 1
-                self.bot.api_stats[endpoint]['total_time'] += elapsed
-                
-                if time.time() - self.bot._last_stats_cleanup > 3600:
-                    self.bot.api_stats.clear()
-                    self.bot._last_stats_cleanup = time.time()
-                
-                span.set_attribute("http.status_code", 200)
-                return response
-                
-            except discord.HTTPException as e:
-                self.bot.api_stats[endpoint]['errors'] += 1
-                if e.status == 429:
-                    self.bot.api_stats[endpoint]['rate_limits'] += 1
-                span.set_attribute("http.status_code", e.status)
-                span.record_exception(e)
-                raise 
\ No newline at end of file
+
+        rows.sort(key=lambda row: row["requests"], reverse=True)
+        return rows[:limit]
+
+    def export(self, limit: int = 25) -> RestStatsCollector:
+        """Expose the busiest routes' stats through the process registry."""
+
+        collector = RestStatsCollector(self, limit)
+        REGISTRY.register(collector)
+        return collector
+
+
+class RestStatsCollector:
+    """Gauges of `RestStats.snapshot` by route, computed at scrape time."""
+
+    def __init__(self, stats: RestStats, limit: int):
+        self.stats = stats
+        self.limit = limit
+
+    def collect(self):
+        labels = ["method", "route"]
+        requests = GaugeMetricFamily(
+            "discord_rest_window_requests",
+            "REST requests per route over the current stats windows",
+            labels=labels,
+        )
+        errors = GaugeMetricFamily(
+            "discord_rest_window_errors",
+            "REST error responses per route over the current stats windows",
+            labels=labels,
+        )
+        ratelimits = GaugeMetricFamily(
+            "discord_rest_window_ratelimits",
+            "REST 429 responses per route over the current stats windows",
+            labels=labels,
+        )
+        latency = GaugeMetricFamily(
+            "discord_rest_window_latency_seconds",
+            "REST latency quantiles per route over the current stats windows",
+            labels=labels + ["quantile"],
+        )
+        remaining = GaugeMetricFamily(
+            "discord_rest_bucket_remaining",
+            "Requests left in the rate limit bucket a route used last",
+            labels=labels,
+        )
+
+        for row in self.stats.snapshot(self.limit, by="route"):
+            route = row["route"].split(" ", 1)
+            requests.add_metric(route, row["requests"])
+            errors.add_metric(route, row["errors"])
+            ratelimits.add_metric(route, row["ratelimits"])
+            for quantile, key in ((0.5, "p50"), (0.95, "p95"), (0.99, "p99")):
+                latency.add_metric(route + [str(quantile)], row[key])
+            if row["remaining"] is not None:
+                remaining.add_metric(route, row["remaining"] if row["reset_after"] else row["limit"])
+
+        yield from (requests, errors, ratelimits, latency, remaining)
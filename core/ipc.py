@@ -258,6 +258,25 @@ class ClusterIPC:
             await self.redis.publish(f"cluster_{cluster_id}", message)
             log.info(f"Message sent to cluster {cluster_id}")
 
+    async def publish(self, command: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Fire a message at every other cluster without waiting for responses.
+        Used for cache invalidation where the sender already applied the change.
+        """
+        with self.tracer.start_as_current_span("ipc_publish") as span:
+            span.set_attribute("ipc.command", command)
+
+            message = json.dumps({
+                "command": command,
+                "data": data or {},
+                "timestamp": datetime.utcnow().isoformat(),
+                "source_cluster": self.cluster_id
+            })
+
+            for cluster_id in range(self.bot.cluster_count):
+                if cluster_id != self.cluster_id:
+                    await self.redis.publish(f"cluster_{cluster_id}", message)
+
     async def get_cluster_status(self) -> List[Dict[str, Any]]:
         """Get status of all clusters."""
         with self.tracer.start_as_current_span("ipc_status"):
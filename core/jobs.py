@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import multiprocessing
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+import config
+from utils.logger import log
+
+_context = multiprocessing.get_context("spawn")
+
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth",
+    "Jobs waiting for a worker",
+    ["priority"],
+)
+JOB_RESULTS = Counter(
+    "job_results_total",
+    "Finished jobs by outcome",
+    ["outcome"],
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Time a job spent running on a worker",
+)
+JOB_WAIT = Histogram(
+    "job_wait_seconds",
+    "Time a job spent queued before a worker picked it up",
+    ["priority"],
+)
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class JobError(Exception):
+    """Base class for job queue failures."""
+
+
+class JobTimeout(JobError):
+    pass
+
+
+class ResultTooLarge(JobError):
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"Job result is {size} bytes, the limit is {limit}")
+        self.size = size
+        self.limit = limit
+
+
+def _worker_main(conn: Connection) -> None:
+    """Worker process loop: run each job and send back its pickled result."""
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        if message is None:
+            return
+
+        func, args, kwargs, limit = message
+        try:
+            payload = pickle.dumps(func(*args, **kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException as exc:
+            try:
+                conn.send(("error", exc))
+            except Exception:
+                conn.send(("error", JobError(repr(exc))))
+            continue
+
+        if limit and len(payload) > limit:
+            conn.send(("too_large", len(payload)))
+        else:
+            conn.send(("ok", payload))
+
+
+class Job:
+    __slots__ = (
+        "func", "args", "kwargs", "priority", "timeout",
+        "max_result_size", "future", "submitted_at",
+    )
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        priority: Priority,
+        timeout: Optional[float],
+        max_result_size: Optional[int],
+    ):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.timeout = timeout
+        self.max_result_size = max_result_size
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.submitted_at = time.monotonic()
+
+
+class JobHandle:
+    """Awaitable handle to a submitted job which can be cancelled."""
+
+    __slots__ = ("_job",)
+
+    def __init__(self, job: Job):
+        self._job = job
+
+    def __await__(self):
+        return asyncio.shield(self._job.future).__await__()
+
+    def done(self) -> bool:
+        return self._job.future.done()
+
+    def cancel(self) -> bool:
+        """Cancel the job, killing its worker if it already started."""
+        return self._job.future.cancel()
+
+
+class Worker:
+    __slots__ = ("process", "conn")
+
+    process: BaseProcess
+    conn: Connection
+
+    def __init__(self) -> None:
+        self.conn, child = _context.Pipe()
+        self.process = _context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class JobQueue:
+    """
+    Priority queue of CPU-bound jobs run on local worker processes.
+
+    Jobs are plain picklable callables; higher priority classes are always
+    dispatched first and FIFO within a class. A job that runs past its
+    timeout or is cancelled while running takes its worker with it and a
+    fresh worker is spawned. With `inline=True` jobs run in this process
+    on a thread instead, which keeps tests free of worker processes.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.JOBS.WORKERS,
+        timeout: Optional[float] = config.JOBS.TIMEOUT,
+        max_result_size: Optional[int] = config.JOBS.MAX_RESULT_SIZE,
+        inline: bool = config.JOBS.INLINE,
+    ):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_result_size = max_result_size
+        self.inline = inline
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._counter = itertools.count()
+        self._depth = {priority: 0 for priority in Priority}
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Dict[int, asyncio.Task] = {}
+
+    @property
+    def started(self) -> bool:
+        return self._dispatcher is not None
+
+    @property
+    def depth(self) -> Dict[str, int]:
+        return {priority.name.lower(): count for priority, count in self._depth.items()}
+
+    async def start(self) -> None:
+        if self.started:
+            return
+
+        self._queue = asyncio.PriorityQueue()
+        self._idle = asyncio.Queue()
+        self._threads = ThreadPoolExecutor(
+            max_workers=self.workers * 2,
+            thread_name_prefix="jobs",
+        )
+
+        if not self.inline:
+            workers = await asyncio.gather(
+                *(asyncio.to_thread(Worker) for _ in range(self.workers))
+            )
+            for worker in workers:
+                self._idle.put_nowait(worker)
+        else:
+            for _ in range(self.workers):
+                self._idle.put_nowait(None)
+
+        self._dispatcher = asyncio.create_task(self._dispatch(), name="job_dispatcher")
+        log.info(
+            f"Job queue started with {self.workers} "
+            f"{'inline' if self.inline else 'process'} workers"
+        )
+
+    async def stop(self) -> None:
+        if not self._dispatcher:
+            return
+
+        self._dispatcher.cancel()
+        for task in list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(self._dispatcher, *self._running.values(), return_exceptions=True)
+        self._dispatcher = None
+
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None:
+                try:
+                    worker.conn.send(None)
+                except Exception:
+                    pass
+                worker.kill()
+
+        while not self._queue.empty():
+            *_, job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.cancel()
+
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        priority: Priority = Priority.NORMAL,
+        timeout: Optional[float] = None,
+        max_result_size: Optional[int] = None,
+        **kwargs: Any,
+    ) -> JobHandle:
+        """Queue a job and return a handle to await or cancel it."""
+
+        if inspect.iscoroutinefunction(func):
+            raise TypeError(f"{func.__qualname__} is a coroutine function, jobs must be synchronous")
+
+        if not self.started:
+            raise JobError("Job queue is not running")
+
+        job = Job(
+            func,
+            args,
+            kwargs,
+            priority,
+            timeout if timeout is not None else self.timeout,
+            max_result_size if max_result_size is not None else self.max_result_size,
+        )
+        self._queue.put_nowait((int(priority), next(self._counter), job))
+        self._depth[priority] += 1
+        JOB_QUEUE_DEPTH.labels(priority=priority.name.lower()).set(self._depth[priority])
+        return JobHandle(job)
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Submit a job and wait for its result, cancelling it if the caller is cancelled."""
+
+        handle = self.submit(func, *args, **kwargs)
+        try:
+            return await handle
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+
+    async def _dispatch(self) -> None:
+        while True:
+            *_, job = await self._queue.get()
+            self._depth[job.priority] -= 1
+            JOB_QUEUE_DEPTH.labels(priority=job.priority.name.lower()).set(self._depth[job.priority])
+
+            if job.future.done():
+                JOB_RESULTS.labels(outcome="cancelled").inc()
+                continue
+
+            worker = await self._idle.get()
+            JOB_WAIT.labels(priority=job.priority.name.lower()).observe(
+                time.monotonic() - job.submitted_at
+            )
+
+            key = next(self._counter)
+            task = asyncio.create_task(self._execute(worker, job))
+            self._running[key] = task
+            task.add_done_callback(lambda _, key=key: self._running.pop(key, None))
+
+    def _call(self, worker: Worker, job: Job) -> Tuple[str, Any]:
+        worker.conn.send((job.func, job.args, job.kwargs, job.max_result_size))
+        return worker.conn.recv()
+
+    def _call_inline(self, job: Job) -> Tuple[str, Any]:
+        result = job.func(*job.args, **job.kwargs)
+        if job.max_result_size:
+            size = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            if size > job.max_result_size:
+                return "too_large", size
+
+        return "ok", result
+
+    async def _execute(self, worker: Optional[Worker], job: Job) -> None:
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        broken = False
+
+        if worker is None:
+            call = loop.run_in_executor(self._threads, self._call_inline, job)
+        else:
+            call = loop.run_in_executor(self._threads, self._call, worker, job)
+
+        waiter = asyncio.ensure_future(call)
+        job.future.add_done_callback(lambda _: waiter.cancel() if not waiter.done() else None)
+
+        try:
+            status, value = await asyncio.wait_for(waiter, job.timeout)
+        except asyncio.TimeoutError:
+            broken = True
+            JOB_RESULTS.labels(outcome="timeout").inc()
+            if not job.future.done():
+                job.future.set_exception(
+                    JobTimeout(f"{job.func.__qualname__} ran longer than {job.timeout}s")
+                )
+        except asyncio.CancelledError:
+            broken = True
+            JOB_RESULTS.labels(outcome="cancelled").inc()
+            if not job.future.done():
+                job.future.cancel()
+        except (EOFError, OSError) as exc:
+            broken = True
+            JOB_RESULTS.labels(outcome="crashed").inc()
+            if not job.future.done():
+                job.future.set_exception(JobError(f"Worker died while running job: {exc}"))
+        except Exception as exc:
+            # Only reachable inline, the job itself raised.
+            JOB_RESULTS.labels(outcome="error").inc()
+            if not job.future.done():
+                job.future.set_exception(exc)
+        else:
+            JOB_DURATION.observe(time.monotonic() - started)
+            if job.future.done():
+                JOB_RESULTS.labels(outcome="cancelled").inc()
+            elif status == "ok":
+                JOB_RESULTS.labels(outcome="ok").inc()
+                job.future.set_result(pickle.loads(value) if worker is not None else value)
+            elif status == "too_large":
+                JOB_RESULTS.labels(outcome="too_large").inc()
+                job.future.set_exception(ResultTooLarge(value, job.max_result_size))
+            else:
+                JOB_RESULTS.labels(outcome="error").inc()
+                job.future.set_exception(value)
+        finally:
+            if worker is not None and broken:
+                # The worker may still be busy with the abandoned job.
+                worker.kill()
+                try:
+                    worker = await asyncio.to_thread(Worker)
+                except Exception as exc:
+                    log.error(f"Failed to replace job worker: {exc}")
+                    worker = None
+                    self.workers -= 1
+
+            if worker is not None or self.inline:
+                self._idle.put_nowait(worker)
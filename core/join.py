@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from discord import Forbidden, HTTPException, Member, NotFound, Role
+
+from utils.logger import log
+from utils.metrics import CacheCounter
+
+JOIN_FEATURES_IPC = "join_features_invalidate"
+
+
+class AutoRole(NamedTuple):
+    role_id: int
+    action: str
+    delay: int
+
+
+class AntiRaidConfig(NamedTuple):
+    locked: bool
+    joins: Optional[dict]
+    avatar: Optional[dict]
+    browser: Optional[dict]
+
+
+class GuildFeatures(NamedTuple):
+    """Everything the join pipeline needs to know about a guild."""
+
+    reassign_roles: bool
+    reassign_ignore_ids: frozenset
+    whitelist: bool
+    whitelist_action: str
+    auto_roles: Tuple[AutoRole, ...]
+    antiraid: Optional[AntiRaidConfig]
+
+
+class JoinContext:
+    """State shared by the stages handling a single join."""
+
+    __slots__ = ("member", "features", "add", "reasons", "stopped")
+
+    def __init__(self, member: Member, features: GuildFeatures):
+        self.member = member
+        self.features = features
+        self.add: Dict[int, Role] = {}
+        self.reasons: List[str] = []
+        self.stopped = False
+
+    def add_roles(self, roles: List[Role], reason: str) -> None:
+        for role in roles:
+            self.add[role.id] = role
+
+        if roles:
+            self.reasons.append(reason)
+
+    def stop(self) -> None:
+        """Skip the remaining stages and the role edit, e.g. after a ban."""
+
+        self.stopped = True
+
+
+Stage = Callable[[JoinContext], Awaitable[None]]
+
+
+class JoinPipeline:
+    """
+    Handles `on_member_join` for hard bans, antiraid, the whitelist,
+    role restoration and auto roles from one cached feature snapshot
+    and the in-memory hard ban index.
+
+    A guild's snapshot is loaded with a single query on its first join
+    and dropped whenever one of those features is reconfigured, here and
+    on every other cluster through IPC. Stages run in order and collect
+    the roles to add on a shared context, which are added in one go once
+    every stage has run. Cogs owning a stage, like antiraid, register it
+    with `add_stage` when they load.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._guilds: Dict[int, GuildFeatures] = {}
+        self._pending: Dict[int, asyncio.Task] = {}
+        self._stale: Set[int] = set()
+        self._counter = CacheCounter("join_features")
+        self.stages: List[Tuple[str, Stage]] = [
+            ("hardban", self.hardban),
+            ("whitelist", self.whitelist),
+            ("restore", self.restore_roles),
+            ("autorole", self.auto_roles),
+        ]
+
+    def add_stage(self, name: str, stage: Stage, *, after: Optional[str] = None) -> None:
+        """Insert a stage after `after`, or first, replacing one of the same name."""
+
+        self.remove_stage(name)
+        index = 0
+        if after is not None:
+            index = next(
+                (i + 1 for i, (other, _) in enumerate(self.stages) if other == after),
+                len(self.stages),
+            )
+
+        self.stages.insert(index, (name, stage))
+
+    def remove_stage(self, name: str) -> None:
+        self.stages = [(other, stage) for other, stage in self.stages if other != name]
+
+    async def _load(self, guild_id: int) -> GuildFeatures:
+        record = await self.bot.db.fetchrow(
+            """
+            SELECT
+                COALESCE(settings.reassign_roles, FALSE) AS reassign_roles,
+                COALESCE(settings.reassign_ignore_ids, '{}') AS reassign_ignore_ids,
+                COALESCE(whitelist.status, FALSE) AS whitelist,
+                COALESCE(whitelist.action, 'kick') AS whitelist_action,
+                (
+                    SELECT json_agg(json_build_array(role_id, action, COALESCE(delay, 0)))
+                    FROM auto_role
+                    WHERE guild_id = $1
+                ) AS auto_roles,
+                antiraid.guild_id IS NOT NULL AS antiraid,
+                COALESCE(antiraid.locked, FALSE) AS antiraid_locked,
+                antiraid.joins AS antiraid_joins,
+                antiraid.avatar AS antiraid_avatar,
+                antiraid.browser AS antiraid_browser
+            FROM (SELECT $1::BIGINT AS guild_id) AS guild
+            LEFT JOIN settings ON settings.guild_id = guild.guild_id
+            LEFT JOIN whitelist ON whitelist.guild_id = guild.guild_id
+            LEFT JOIN antiraid ON antiraid.guild_id = guild.guild_id
+            """,
+            guild_id,
+        )
+
+        return GuildFeatures(
+            reassign_roles=record["reassign_roles"],
+            reassign_ignore_ids=frozenset(record["reassign_ignore_ids"]),
+            whitelist=record["whitelist"],
+            whitelist_action=record["whitelist_action"],
+            auto_roles=tuple(
+                AutoRole(*auto_role)
+                for auto_role in json.loads(record["auto_roles"] or "[]")
+            ),
+            antiraid=(
+                AntiRaidConfig(
+                    locked=record["antiraid_locked"],
+                    joins=record["antiraid_joins"],
+                    avatar=record["antiraid_avatar"],
+                    browser=record["antiraid_browser"],
+                )
+                if record["antiraid"]
+                else None
+            ),
+        )
+
+    async def get(self, guild_id: int) -> GuildFeatures:
+        if (features := self._guilds.get(guild_id)) is not None:
+            self._counter.hit.inc()
+            return features
+
+        self._counter.miss.inc()
+
+        task = self._pending.get(guild_id)
+        if task is None:
+            self._stale.discard(guild_id)
+            task = self._pending[guild_id] = asyncio.create_task(self._load(guild_id))
+
+        try:
+            features = await asyncio.shield(task)
+        finally:
+            if self._pending.get(guild_id) is task and task.done():
+                self._pending.pop(guild_id, None)
+
+        # Only keep the result if nothing changed while it was loading.
+        if guild_id not in self._stale:
+            self._guilds[guild_id] = features
+
+        return features
+
+    def discard(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
+        if guild_id in self._pending:
+            self._stale.add(guild_id)
+
+    async def invalidate(self, guild_id: int) -> None:
+        """Drop a guild's snapshot here and on every other cluster."""
+
+        self.discard(guild_id)
+        if not self.bot.ipc:
+            return
+
+        try:
+            await self.bot.ipc.publish(JOIN_FEATURES_IPC, {"guild_id": guild_id})
+        except Exception as e:
+            log.error(f"Failed to propagate join feature invalidation: {e}")
+
+    async def handle_ipc(self, data: dict) -> None:
+        self.discard(data["guild_id"])
+
+    async def run(self, member: Member) -> JoinContext:
+        ctx = JoinContext(member, await self.get(member.guild.id))
+        for name, stage in self.stages:
+            try:
+                await stage(ctx)
+            except Exception as e:
+                log.error(
+                    f"Join stage {name} failed for {member.id} in {member.guild.id}: {e}"
+                )
+
+            if ctx.stopped:
+                return ctx
+
+        await self.apply(ctx)
+        return ctx
+
+    async def apply(self, ctx: JoinContext) -> None:
+        """
+        Add every collected role. Each role is added on its own rather
+        than by replacing the member's roles, so roles other bots add
+        right as the member joins aren't overwritten.
+        """
+
+        member = ctx.member
+        if not ctx.add:
+            return
+
+        guild = member.guild
+        if not guild.me.guild_permissions.manage_roles:
+            return
+
+        roles = [
+            role
+            for role in ctx.add.values()
+            if role.is_assignable() and member.get_role(role.id) is None
+        ]
+        if not roles:
+            return
+
+        try:
+            await member.add_roles(*roles, reason=", ".join(ctx.reasons))
+        except (Forbidden, NotFound):
+            pass
+        except HTTPException as e:
+            log.warning(f"Failed to apply join roles for {member.id} in {guild.id}: {e}")
+
+    async def hardban(self, ctx: JoinContext) -> None:
+        member = ctx.member
+        if not await self.bot.hardbans.contains(member.guild.id, member.id):
+            return
+
+        ctx.stop()
+        try:
+            await member.ban(reason="User is hard banned")
+        except HTTPException:
+            pass
+
+    async def whitelist(self, ctx: JoinContext) -> None:
+        member = ctx.member
+        if not ctx.features.whitelist or member.bot:
+            return
+
+        action = ctx.features.whitelist_action
+        if action not in ("kick", "ban"):
+            return
+
+        if await self.bot.redis.get(f"whitelist:{member.guild.id}:{member.id}"):
+            return
+
+        ctx.stop()
+        try:
+            if action == "ban":
+                await member.ban(reason="Not permitted. (WHITELIST SYSTEM)")
+            else:
+                await member.kick(reason="Not permitted. (WHITELIST SYSTEM)")
+        except HTTPException:
+            pass
+
+    async def restore_roles(self, ctx: JoinContext) -> None:
+        if not ctx.features.reassign_roles:
+            return
+
+        member = ctx.member
+        snapshots = self.bot.role_snapshots
+        if not (role_ids := await snapshots.get(member.guild.id, member.id)):
+            return
+
+        roles = [
+            role
+            for role_id in role_ids
+            if role_id not in ctx.features.reassign_ignore_ids
+            and (role := member.guild.get_role(role_id)) is not None
+            and role.is_assignable()
+        ]
+        if not roles:
+            return
+
+        await snapshots.delete(member.guild.id, member.id)
+        ctx.add_roles(roles, "Restoration of previous roles")
+
+    async def auto_roles(self, ctx: JoinContext) -> None:
+        guild = ctx.member.guild
+        missing: List[int] = []
+        immediate: List[Role] = []
+        for auto_role in ctx.features.auto_roles:
+            role = guild.get_role(auto_role.role_id)
+            if role is None:
+                missing.append(auto_role.role_id)
+            elif auto_role.delay:
+                asyncio.create_task(self._delayed_role(ctx.member, role, auto_role))
+            elif auto_role.action == "add":
+                immediate.append(role)
+
+        ctx.add_roles(immediate, "Auto role")
+
+        if missing:
+            await self.bot.db.execute(
+                """
+                DELETE FROM auto_role
+                WHERE guild_id = $1
+                AND role_id = ANY($2::BIGINT[])
+                """,
+                guild.id,
+                missing,
+            )
+            await self.invalidate(guild.id)
+
+    async def _delayed_role(self, member: Member, role: Role, auto_role: AutoRole) -> None:
+        await asyncio.sleep(auto_role.delay)
+
+        guild = member.guild
+        member = guild.get_member(member.id)
+        if (
+            member is None
+            or not guild.me.guild_permissions.manage_roles
+            or not role.is_assignable()
+        ):
+            return
+
+        try:
+            if auto_role.action == "add" and role not in member.roles:
+                await member.add_roles(role, reason="Auto role")
+
+            elif auto_role.action == "remove" and role in member.roles:
+                await member.remove_roles(role, reason="Auto role")
+
+        except HTTPException:
+            log.debug(
+                f"Failed to {auto_role.action} auto role {role.id} in {guild.id}"
+            )
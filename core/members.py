@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Collection, Dict, List, NamedTuple, Optional, Tuple
+
+from discord import Guild, Member
+from prometheus_client import Counter, Gauge
+
+import config
+from utils.logger import log
+
+MEMBERS_CACHED = Gauge(
+    "member_cache_members",
+    "Full member objects held in the cache after the last sweep",
+)
+MEMBER_SLOTS = Gauge(
+    "member_cache_slots",
+    "Compact member slots held for members of indexed guilds",
+)
+MEMBERS_EVICTED = Counter(
+    "member_cache_evictions_total",
+    "Members dropped from the cache by the member cache policy",
+)
+
+BOT = 1
+BOOSTER = 2
+
+
+def member_flags(member: Any) -> int:
+    """`BOT`/`BOOSTER` bits of a member, or of a user which only has `bot`."""
+
+    flags = BOT if member.bot else 0
+    if getattr(member, "premium_since", None) is not None:
+        flags |= BOOSTER
+
+    return flags
+
+
+class MemberCounts(NamedTuple):
+    total: int
+    humans: int
+    bots: int
+    boosters: int
+
+
+class MemberSlot:
+    """
+    What is left of a member dropped from the cache.
+
+    `seen` stays 0, a shared small int, until the member does something,
+    so the bulk of a large guild costs one slot object and its id key.
+    """
+
+    __slots__ = ("flags", "seen")
+
+    def __init__(self, flags: int, seen: int = 0):
+        self.flags = flags
+        self.seen = seen
+
+
+class GuildMembers:
+    """Maintained counts of a guild, plus a slot per member when trimming."""
+
+    __slots__ = ("bots", "boosters", "slots")
+
+    def __init__(self, slots: Optional[Dict[int, MemberSlot]] = None):
+        self.bots = 0
+        self.boosters = 0
+        self.slots = slots
+
+    def count(self, flags: int, delta: int) -> None:
+        if flags & BOT:
+            self.bots += delta
+        if flags & BOOSTER:
+            self.boosters += delta
+
+
+class MemberCachePolicy:
+    """
+    Which members stay cached, parsed from `all` or a comma separated mix
+    of `recent`, `roles` and `voice`.
+    """
+
+    __slots__ = ("recent", "roles", "voice")
+
+    def __init__(self, recent: bool = False, roles: bool = False, voice: bool = False):
+        self.recent = recent
+        self.roles = roles
+        self.voice = voice
+
+    @classmethod
+    def from_string(cls, value: str) -> MemberCachePolicy:
+        names = {name.strip().lower() for name in value.split(",") if name.strip()}
+        if not names or "all" in names:
+            return cls()
+
+        unknown = names - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"Unknown member cache policy: {', '.join(sorted(unknown))}")
+
+        return cls(**{name: True for name in names})
+
+    @property
+    def trims(self) -> bool:
+        return self.recent or self.roles or self.voice
+
+    def __str__(self) -> str:
+        return ",".join(name for name in self.__slots__ if getattr(self, name)) or "all"
+
+    def keeps(self, member: Member, slot: MemberSlot, cutoff: int, pinned: Collection[int] = ()) -> bool:
+        if member.id in pinned:
+            return True
+
+        if self.recent and slot.seen >= cutoff:
+            return True
+
+        if self.roles and member._roles:
+            return True
+
+        return self.voice and member.id in member.guild._voice_states
+
+
+class MemberCache:
+    """
+    Keeps the member cache to what the policy asks for.
+
+    discord.py can only cache everyone or voice members, so joined members
+    are still cached and a sweeper drops those the policy doesn't keep
+    every `SWEEP_INTERVAL`. Members of a trimmed guild keep a compact
+    `MemberSlot`, which carries what the counters need when they leave and
+    when they were last seen; a member seen again is put back into the
+    cache. Counts come from counters maintained off gateway events, built
+    with a single scan when a guild becomes available.
+
+    Members of a trimmed guild the policy dropped get no `member_update`,
+    so member update logging only covers kept members, and `guild.members`
+    only holds the kept ones; commands needing everyone already chunk the
+    guild when it isn't chunked. Forcenick targets are always kept, the
+    nickname can't be enforced without their updates.
+    """
+
+    def __init__(self, bot, settings=config.MEMBER_CACHE):
+        self.bot = bot
+        self.settings = settings
+        self.policy = MemberCachePolicy.from_string(settings.POLICY)
+        self._guilds: Dict[int, GuildMembers] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._handlers: Dict[str, Callable[..., None]] = {
+            "message": self._on_message,
+            "member_join": self._on_member_join,
+            "member_update": self._on_member_update,
+            "raw_member_remove": self._on_raw_member_remove,
+            "voice_state_update": self._on_voice_state_update,
+            "raw_reaction_add": self._on_raw_reaction_add,
+            "guild_available": self.index,
+            "guild_join": self.index,
+            "guild_remove": self._on_guild_remove,
+        }
+
+    def observe(self, event_name: str, args: Tuple[Any, ...]) -> None:
+        """Update counters and recency from a dispatched event."""
+
+        handler = self._handlers.get(event_name)
+        if handler is None:
+            return
+
+        try:
+            handler(*args)
+        except Exception as e:
+            log.warning(f"Member cache failed to handle {event_name}: {e}")
+
+    def index(self, guild: Guild) -> GuildMembers:
+        """Count a guild's cached members from scratch."""
+
+        previous = self._guilds.get(guild.id)
+        members = GuildMembers({} if self.policy.trims else None)
+        for member in guild._members.values():
+            flags = member_flags(member)
+            members.count(flags, 1)
+            if members.slots is not None:
+                members.slots[member.id] = MemberSlot(flags)
+
+        if previous is not None and previous.slots and members.slots is not None:
+            # Re-chunked after a reconnect, members only seen before stay seen.
+            for member_id, slot in previous.slots.items():
+                if slot.seen and member_id in members.slots:
+                    members.slots[member_id].seen = slot.seen
+
+        self._guilds[guild.id] = members
+        return members
+
+    def _members(self, guild: Guild) -> GuildMembers:
+        try:
+            return self._guilds[guild.id]
+        except KeyError:
+            return self.index(guild)
+
+    def counts(self, guild: Guild) -> MemberCounts:
+        members = self._members(guild)
+        total = guild.member_count or len(guild._members)
+        return MemberCounts(
+            total=total,
+            humans=max(total - members.bots, 0),
+            bots=members.bots,
+            boosters=members.boosters,
+        )
+
+    def has_member(self, guild: Guild, user_id: int) -> bool:
+        if user_id in guild._members:
+            return True
+
+        members = self._guilds.get(guild.id)
+        return members is not None and members.slots is not None and user_id in members.slots
+
+    def mutual_guilds(self, user_id: int) -> List[Guild]:
+        return [guild for guild in self.bot.guilds if self.has_member(guild, user_id)]
+
+    def seen(self, member: Member) -> None:
+        if not self.policy.trims:
+            return
+
+        guild = member.guild
+        self._refresh(self._members(guild), member).seen = int(time.time())
+        if member.id not in guild._members:
+            guild._add_member(member)
+
+    def _refresh(self, members: GuildMembers, member: Member) -> MemberSlot:
+        flags = member_flags(member)
+        slot = members.slots.get(member.id)  # type: ignore
+        if slot is None:
+            members.count(flags, 1)
+            slot = members.slots[member.id] = MemberSlot(flags)  # type: ignore
+        elif slot.flags != flags:
+            members.count(slot.flags, -1)
+            members.count(flags, 1)
+            slot.flags = flags
+
+        return slot
+
+    def _on_message(self, message: Any) -> None:
+        if message.guild is not None and isinstance(message.author, Member):
+            self.seen(message.author)
+
+    def _on_member_join(self, member: Member) -> None:
+        members = self._members(member.guild)
+        if members.slots is None:
+            members.count(member_flags(member), 1)
+        else:
+            self.seen(member)
+
+    def _on_member_update(self, before: Member, after: Member) -> None:
+        members = self._members(after.guild)
+        if members.slots is None:
+            members.count(member_flags(before), -1)
+            members.count(member_flags(after), 1)
+        else:
+            self.seen(after)
+
+    def _on_raw_member_remove(self, payload: Any) -> None:
+        members = self._guilds.get(payload.guild_id)
+        if members is None:
+            return
+
+        if members.slots is None:
+            members.count(member_flags(payload.user), -1)
+            return
+
+        slot = members.slots.pop(payload.user.id, None)
+        if slot is not None:
+            members.count(slot.flags, -1)
+
+    def _on_voice_state_update(self, member: Member, before: Any, after: Any) -> None:
+        if after.channel is not None:
+            self.seen(member)
+
+    def _on_raw_reaction_add(self, payload: Any) -> None:
+        if payload.member is not None:
+            self.seen(payload.member)
+
+    def _on_guild_remove(self, guild: Guild) -> None:
+        self._guilds.pop(guild.id, None)
+
+    def start(self) -> None:
+        if self.policy.trims and self._sweeper is None:
+            log.info(f"Trimming the member cache to {self.policy} members")
+            self._sweeper = asyncio.create_task(self._sweep_loop(), name="member_cache")
+
+    def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.SWEEP_INTERVAL)
+            try:
+                await self.sweep()
+            except Exception as e:
+                log.error(f"Member cache sweep failed: {e}")
+
+    async def sweep(self) -> int:
+        """Drop every cached member the policy doesn't keep."""
+
+        if not self.policy.trims:
+            return 0
+
+        cutoff = int(time.time() - self.settings.RECENT)
+        self_id = self.bot.user.id if self.bot.user else None
+        visited = evicted = cached = slots = 0
+        for guild in list(self.bot.guilds):
+            members = self._members(guild)
+            try:
+                pinned = set(await self.bot.forcenicks.get(guild.id))
+            except Exception as e:
+                log.warning(f"Member cache skipped {guild.id}, forcenicks unavailable: {e}")
+                continue
+
+            for member in list(guild._members.values()):
+                visited += 1
+                if visited % self.settings.SWEEP_BATCH == 0:
+                    await asyncio.sleep(0)
+
+                # A member updated while dropped is cached again without
+                # an event, so flags are reconciled here.
+                slot = self._refresh(members, member)
+                if member.id == self_id or self.policy.keeps(member, slot, cutoff, pinned):
+                    continue
+
+                guild._remove_member(member)
+                evicted += 1
+
+            cached += len(guild._members)
+            slots += len(members.slots)
+
+        MEMBERS_CACHED.set(cached)
+        MEMBER_SLOTS.set(slots)
+        MEMBERS_EVICTED.inc(evicted)
+        if evicted:
+            log.debug(f"Member cache sweep dropped {evicted} members, {cached} remain cached")
+
+        return evicted
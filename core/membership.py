@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from array import array
+from bisect import bisect_left
+from typing import Dict, Set
+
+from utils.logger import log
+from utils.metrics import CacheCounter
+
+
+class MembershipIndex:
+    """
+    Which users of a guild have a row in `table`, e.g. `forcenick` or `hardban`.
+
+    Each guild's user ids are held as a sorted array of int64 (8 bytes
+    a user) loaded with one query on first use, so the common case of a
+    user without an entry is answered without touching the database.
+    A guild is dropped whenever one of its rows is written, here and on
+    every other cluster through IPC, and reloaded on its next lookup.
+    """
+
+    def __init__(self, bot, table: str):
+        self.bot = bot
+        self.table = table
+        self.ipc_command = f"{table}_index_invalidate"
+        self._guilds: Dict[int, array] = {}
+        self._pending: Dict[int, asyncio.Task] = {}
+        self._stale: Set[int] = set()
+        self._counter = CacheCounter(f"{table}_index")
+
+    async def _load(self, guild_id: int) -> array:
+        records = await self.bot.db.fetch(
+            f"""
+            SELECT DISTINCT user_id
+            FROM {self.table}
+            WHERE guild_id = $1
+            AND user_id IS NOT NULL
+            ORDER BY user_id
+            """,
+            guild_id,
+        )
+
+        return array("q", (record["user_id"] for record in records))
+
+    async def get(self, guild_id: int) -> array:
+        if (users := self._guilds.get(guild_id)) is not None:
+            self._counter.hit.inc()
+            return users
+
+        self._counter.miss.inc()
+
+        task = self._pending.get(guild_id)
+        if task is None:
+            self._stale.discard(guild_id)
+            task = self._pending[guild_id] = asyncio.create_task(self._load(guild_id))
+
+        try:
+            users = await asyncio.shield(task)
+        finally:
+            if self._pending.get(guild_id) is task and task.done():
+                self._pending.pop(guild_id, None)
+
+        # Only keep the result if nothing changed while it was loading.
+        if guild_id not in self._stale:
+            self._guilds[guild_id] = users
+
+        return users
+
+    async def contains(self, guild_id: int, user_id: int) -> bool:
+        users = await self.get(guild_id)
+        index = bisect_left(users, user_id)
+        return index < len(users) and users[index] == user_id
+
+    def discard(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
+        if guild_id in self._pending:
+            self._stale.add(guild_id)
+
+    async def invalidate(self, guild_id: int) -> None:
+        """Drop a guild's index here and on every other cluster."""
+
+        self.discard(guild_id)
+        if not self.bot.ipc:
+            return
+
+        try:
+            await self.bot.ipc.publish(self.ipc_command, {"guild_id": guild_id})
+        except Exception as e:
+            log.error(f"Failed to propagate {self.table} index invalidation: {e}")
+
+    async def handle_ipc(self, data: dict) -> None:
+        self.discard(data["guild_id"])
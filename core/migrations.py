@@ -48,6 +48,15 @@ async def run_migrations(pool: asyncpg.Pool) -> None:
                     method text DEFAULT 'bulk'::text NOT NULL
                 );
             """)
+
+            log.info("Creating backup_assets table...")
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS public.backup_assets (
+                    digest text PRIMARY KEY,
+                    refs integer DEFAULT 0 NOT NULL,
+                    updated_at timestamp with time zone DEFAULT now() NOT NULL
+                );
+            """)
             
         log.info("Database migrations completed successfully")
         
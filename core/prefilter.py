@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, Literal, Optional, Set, Tuple
+
+from prometheus_client import Counter
+
+from utils.logger import log
+
+FEATURES_IPC = "feature_index_invalidate"
+REFRESH_INTERVAL = 300
+
+LISTENERS_FILTERED = Counter(
+    "listener_prefiltered_total",
+    "Listener invocations skipped by a dispatch prefilter, before a task was created",
+    ["event"],
+)
+
+Predicate = Callable[..., bool]
+
+# Feature name -> (what the ids are, query selecting them as `id`).
+FEATURES: Dict[str, Tuple[Literal["guild", "channel"], str]] = {
+    "gallery": ("channel", "SELECT DISTINCT channel_id AS id FROM gallery"),
+    "sticky": ("channel", "SELECT DISTINCT channel_id AS id FROM sticky_message"),
+    "publisher": ("channel", "SELECT DISTINCT channel_id AS id FROM publisher"),
+    "reaction_trigger": ("guild", "SELECT DISTINCT guild_id AS id FROM reaction_trigger"),
+    "response_trigger": ("guild", "SELECT DISTINCT guild_id AS id FROM response_trigger"),
+    "level": ("guild", "SELECT guild_id AS id FROM level.config WHERE status = TRUE"),
+    "logging": ("guild", "SELECT DISTINCT guild_id AS id FROM logging"),
+}
+
+
+def accepts(*predicates: Predicate) -> Callable:
+    """
+    Only schedule the decorated listener for events all `predicates` accept.
+
+    Predicates are plain functions called as `predicate(bot, *event_args)`
+    right when the event is dispatched, so they must be cheap and
+    synchronous: attribute checks or set lookups, never I/O. Stacks with
+    `Cog.listener` in either order.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func.__listener_filters__ = (
+            *getattr(func, "__listener_filters__", ()),
+            *predicates,
+        )
+        return func
+
+    return decorator
+
+
+def in_guild(bot, obj: Any, *_: Any) -> bool:
+    return getattr(obj, "guild", None) is not None
+
+
+def from_human(bot, obj: Any, *_: Any) -> bool:
+    author = getattr(obj, "author", None)
+    return author is not None and not author.bot
+
+
+def authored_by(*user_ids: int) -> Predicate:
+    def predicate(bot, obj: Any, *_: Any) -> bool:
+        author = getattr(obj, "author", None)
+        return author is not None and author.id in user_ids
+
+    return predicate
+
+
+def channel_types(*types: Any) -> Predicate:
+    def predicate(bot, obj: Any, *_: Any) -> bool:
+        channel = getattr(obj, "channel", None)
+        return channel is not None and channel.type in types
+
+    return predicate
+
+
+def message_types(*types: Any) -> Predicate:
+    def predicate(bot, message: Any, *_: Any) -> bool:
+        return message.type in types
+
+    return predicate
+
+
+def feature(name: str) -> Predicate:
+    """Only events from a guild or channel which has `name` configured."""
+
+    def predicate(bot, obj: Any, *_: Any) -> bool:
+        index = bot.features[name]
+        if index.ids is None:
+            # Not loaded yet, let the listener check for itself.
+            return True
+
+        target = getattr(obj, index.scope, None)
+        return target is not None and target.id in index.ids
+
+    return predicate
+
+
+class FeatureIndex:
+    """Every guild or channel id with feature `name` configured."""
+
+    def __init__(self, bot, name: str):
+        self.bot = bot
+        self.name = name
+        self.scope, self.query = FEATURES[name]
+        self.ids: Optional[Set[int]] = None
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        # Serialized so the last load always started after the last write.
+        async with self._lock:
+            records = await self.bot.db.fetch(self.query)
+            self.ids = {record["id"] for record in records}
+
+
+class Features:
+    """
+    In-memory feature indexes for dispatch prefilters.
+
+    Each index is loaded once at startup and reloaded whenever its table
+    is written, here and on every other cluster through IPC, plus every
+    few minutes to pick up writes made outside the bot. Until an index
+    has loaded its prefilter lets every event through.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._indexes = {name: FeatureIndex(bot, name) for name in FEATURES}
+        self._refresh: Optional[asyncio.Task] = None
+
+    def __getitem__(self, name: str) -> FeatureIndex:
+        return self._indexes[name]
+
+    async def load(self, name: str) -> None:
+        try:
+            await self._indexes[name].load()
+        except Exception as e:
+            log.error(f"Failed to load the {name} feature index: {e}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self.load(name) for name in self._indexes))
+            await asyncio.sleep(REFRESH_INTERVAL)
+
+    def start(self) -> None:
+        if self._refresh is None:
+            self._refresh = asyncio.create_task(self._refresh_loop(), name="feature_indexes")
+
+    def stop(self) -> None:
+        if self._refresh is not None:
+            self._refresh.cancel()
+            self._refresh = None
+
+    async def invalidate(self, name: str) -> None:
+        """Reload an index here and on every other cluster."""
+
+        await self.load(name)
+        if not self.bot.ipc:
+            return
+
+        try:
+            await self.bot.ipc.publish(FEATURES_IPC, {"feature": name})
+        except Exception as e:
+            log.error(f"Failed to propagate {name} feature index invalidation: {e}")
+
+    async def handle_ipc(self, data: dict) -> None:
+        await self.load(data["feature"])
+
+
+class Prefilter:
+    """Checks listeners' `accepts` predicates before their task is created."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._filtered: Dict[str, Any] = {}
+
+    def __call__(self, listener: Callable, event_name: str, args: Tuple[Any, ...]) -> bool:
+        predicates = getattr(listener, "__listener_filters__", None)
+        if not predicates:
+            return True
+
+        try:
+            if all(predicate(self.bot, *args) for predicate in predicates):
+                return True
+        except Exception as e:
+            log.warning(f"Prefilter of {listener.__qualname__} failed on {event_name}: {e}")
+            return True
+
+        try:
+            child = self._filtered[event_name]
+        except KeyError:
+            child = self._filtered[event_name] = LISTENERS_FILTERED.labels(event=event_name)
+
+        child.inc()
+        return False
@@ -1,41 +1,264 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from contextlib import suppress
-from datetime import timedelta
-from hashlib import sha1
 from json import JSONDecodeError, dumps, loads
-from typing import Any, List, Literal, Optional, Union, Type
+from typing import Any, Optional, Union, Type
 from types import TracebackType
 
+import msgpack
 from redis.asyncio import Redis as DefaultRedis
+from redis.asyncio.client import Pipeline as DefaultPipeline
 from redis.asyncio.connection import BlockingConnectionPool
-from redis.asyncio.lock import Lock
 from redis.backoff import EqualJitterBackoff
 from redis.retry import Retry
 from redis.typing import AbsExpiryT, EncodableT, ExpiryT, KeyT
-from opentelemetry import trace
 
 from utils.logger import log
+from utils.metrics import REDIS_COMMAND_SECONDS, observe
+from utils.tracing import get_tracer
 from config import REDIS
 
 REDIS_URL = REDIS.DSN
 
-INCREMENT_SCRIPT = b"""
-    local current
-    current = tonumber(redis.call("incrby", KEYS[1], ARGV[2]))
-    if current == tonumber(ARGV[2]) then
-        redis.call("expire", KEYS[1], ARGV[1])
+# 0xC1 is never used by msgpack and can't start UTF-8 text, so values
+# written by either codec can always be told apart when read back.
+MSGPACK_MARK = b"\xc1"
+
+# Sliding window log: one sorted set entry per admitted hit, scored by
+# the server's clock so every cluster shares the same window.
+RATELIMIT_SCRIPT = b"""
+local now = redis.call("TIME")
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local window = tonumber(ARGV[2])
+
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+if redis.call("ZCARD", KEYS[1]) >= tonumber(ARGV[1]) then
+    return 1
+end
+
+redis.call("ZADD", KEYS[1], now, now .. ":" .. ARGV[3])
+redis.call("PEXPIRE", KEYS[1], window)
+return 0
+"""
+
+# KEYS: lock, waiter queue, waiter heartbeats, fencing counter
+# ARGV: token (empty on the first attempt), lock ttl ms, heartbeat ttl ms,
+#       fencing counter ttl ms
+# Returns {acquired, token}. An expired fencing counter restarts from the
+# server's clock in ms, above any token it handed out before.
+ACQUIRE_SCRIPT = b"""
+local now = redis.call("TIME")
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local token = ARGV[1]
+if token == "" then
+    if redis.call("EXISTS", KEYS[4]) == 0 then
+        redis.call("SET", KEYS[4], string.format("%d", now))
     end
-    return current
+    token = tostring(redis.call("INCR", KEYS[4]))
+    redis.call("PEXPIRE", KEYS[4], ARGV[4])
+end
+
+local stale = redis.call("ZRANGEBYSCORE", KEYS[3], "-inf", now)
+if #stale > 0 then
+    redis.call("ZREM", KEYS[3], unpack(stale))
+    redis.call("ZREM", KEYS[2], unpack(stale))
+end
+
+redis.call("ZADD", KEYS[2], "NX", tonumber(token), token)
+redis.call("ZADD", KEYS[3], now + tonumber(ARGV[3]), token)
+
+if redis.call("EXISTS", KEYS[1]) == 0 and redis.call("ZRANGE", KEYS[2], 0, 0)[1] == token then
+    redis.call("SET", KEYS[1], token, "PX", ARGV[2])
+    redis.call("ZREM", KEYS[2], token)
+    redis.call("ZREM", KEYS[3], token)
+    return {1, token}
+end
+
+redis.call("PEXPIRE", KEYS[2], ARGV[3])
+redis.call("PEXPIRE", KEYS[3], ARGV[3])
+return {0, token}
 """
 
+RELEASE_SCRIPT = b"""
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# KEYS: lock, waiter queue, waiter heartbeats
+# ARGV: token
+# Drops a waiter giving up, and the lock should it have been granted to
+# the attempt whose reply never arrived.
+LEAVE_SCRIPT = b"""
+redis.call("ZREM", KEYS[2], ARGV[1])
+redis.call("ZREM", KEYS[3], ARGV[1])
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+EXTEND_SCRIPT = b"""
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class LockNotAcquired(Exception):
+    pass
+
+
+def encode(value: Any, codec: str = REDIS.CODEC) -> EncodableT:
+    if not isinstance(value, (dict, list)):
+        return value
+
+    if codec == "msgpack":
+        return MSGPACK_MARK + msgpack.packb(value)
+
+    return dumps(value, separators=(",", ":"))
+
+
+def decode(value: bytes) -> Any:
+    if value[:1] == MSGPACK_MARK:
+        return msgpack.unpackb(value[1:])
+
+    try:
+        text = value.decode()
+    except UnicodeDecodeError:
+        return value
+
+    with suppress(JSONDecodeError):
+        return loads(text)
+
+    return text
+
+
+class FairLock:
+    """
+    A distributed lock handed out in request order, with fencing tokens.
+
+    Every acquisition draws an increasing `token` from Redis; anything
+    guarded by the lock can reject writes carrying a token older than
+    the last one it saw, which keeps a holder whose lock expired while
+    it was paused from clobbering its successor. Waiters queue by token
+    and one which stops polling is dropped after a few missed polls, one
+    which gives up leaves the queue right away. The fencing counter
+    expires after `FENCE_TTL` without acquisitions.
+    """
+
+    FENCE_TTL = 86400.0
+
+    def __init__(
+        self,
+        redis: Redis,
+        name: str,
+        timeout: float = 10.0,
+        sleep: float = 0.1,
+        blocking_timeout: Optional[float] = None,
+    ):
+        self.redis = redis
+        self.name = name
+        self.timeout = timeout
+        self.sleep = sleep
+        self.blocking_timeout = blocking_timeout
+        self.token: Optional[int] = None
+
+    def _keys(self) -> list:
+        return [
+            self.name,
+            f"{self.name}:queue",
+            f"{self.name}:waiters",
+            f"{self.name}:fence",
+        ]
+
+    async def acquire(self, blocking: bool = True) -> bool:
+        deadline = (
+            time.monotonic() + self.blocking_timeout
+            if self.blocking_timeout is not None
+            else None
+        )
+        acquired, token = 0, ""
+        heartbeat = int(max(self.sleep * 5, 1) * 1000)
+        try:
+            while True:
+                acquired, token = await self.redis._acquire(
+                    keys=self._keys(),
+                    args=[token, int(self.timeout * 1000), heartbeat, int(self.FENCE_TTL * 1000)],
+                )
+                token = token.decode() if isinstance(token, bytes) else str(token)
+                if acquired:
+                    self.token = int(token)
+                    return True
+
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    return False
+
+                await asyncio.sleep(self.sleep)
+        finally:
+            if not acquired and token:
+                await self.redis._leave(keys=self._keys()[:3], args=[token])
+
+    async def release(self) -> None:
+        if self.token is None:
+            return
+
+        token, self.token = self.token, None
+        await self.redis._release(keys=[self.name], args=[token])
+
+    async def extend(self, timeout: Optional[float] = None) -> bool:
+        if self.token is None:
+            return False
+
+        return bool(
+            await self.redis._extend(
+                keys=[self.name],
+                args=[self.token, int((timeout or self.timeout) * 1000)],
+            )
+        )
+
+    async def __aenter__(self) -> FairLock:
+        if not await self.acquire():
+            raise LockNotAcquired(self.name)
+
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.release()
+
+
+class Pipeline(DefaultPipeline):
+    """Pipeline which times each round trip as the `pipeline` command."""
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        with observe(REDIS_COMMAND_SECONDS, command="pipeline"):
+            return await super().execute(raise_on_error)
+
+
 class Redis(DefaultRedis):
-    INCREMENT_SCRIPT_HASH = sha1(INCREMENT_SCRIPT).hexdigest()
+    """
+    The bot's Redis client.
+
+    Every command is timed into `redis_command_seconds`, pipelines as a
+    single `pipeline` command. Dicts and lists passed to `set` go through
+    the configured codec (REDIS_CODEC, json or msgpack) and `get` decodes
+    either. Responses are otherwise left as bytes so packed binary values
+    survive. Rate limits and locks run as Lua scripts, one round trip per
+    check or attempt.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.tracer = trace.get_tracer(__name__)
+        self.tracer = get_tracer("redis")
+        self._ratelimit = self.register_script(RATELIMIT_SCRIPT)
+        self._acquire = self.register_script(ACQUIRE_SCRIPT)
+        self._release = self.register_script(RELEASE_SCRIPT)
+        self._leave = self.register_script(LEAVE_SCRIPT)
+        self._extend = self.register_script(EXTEND_SCRIPT)
 
     async def __aenter__(self) -> Redis:
         return self
@@ -60,11 +283,10 @@ class Redis(DefaultRedis):
     ) -> Redis:
         retry = Retry(backoff=EqualJitterBackoff(3, 1), retries=attempts)
         connection_pool = BlockingConnectionPool.from_url(
-            url, 
-            timeout=timeout, 
-            max_connections=100,
+            url,
+            timeout=timeout,
+            max_connections=REDIS.MAX_CONNECTIONS,
             retry=retry,
-            decode_responses=True, 
             **kwargs
         )
 
@@ -92,25 +314,28 @@ class Redis(DefaultRedis):
 
         return client
 
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        with observe(REDIS_COMMAND_SECONDS, command=str(args[0]).lower()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return Pipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
     async def get(
         self,
-        name: str,
+        name: KeyT,
         validate: bool = True,
-    ) -> Optional[str | int | dict | list]:
+    ) -> Optional[Any]:
         with self.tracer.start_as_current_span("redis_get") as span:
-            span.set_attribute("redis.key", name)
+            span.set_attribute("redis.key", str(name))
             output = await super().get(name)
-            
+
             if not validate or output is None:
                 return output
 
-            if output.isnumeric():
-                return int(output)
-
-            with suppress(JSONDecodeError):
-                return loads(output)
-
-            return output
+            return decode(output)
 
     async def set(
         self,
@@ -126,28 +351,29 @@ class Redis(DefaultRedis):
         pxat: Union[AbsExpiryT, None] = None,
     ) -> bool | Any:
         with self.tracer.start_as_current_span("redis_set") as span:
-            span.set_attribute("redis.key", name)
-            if isinstance(value, (dict, list)):
-                value = dumps(value, separators=(',', ':'))
-            return await super().set(name, value, ex, px, nx, xx, keepttl, get, exat, pxat)
-
-    async def delete(self, key: str) -> int:
-        with self.tracer.start_as_current_span("redis_delete") as span:
-            span.set_attribute("redis.key", key)
-            return await self.pool.delete(key)
-
-    async def exists(self, key: str) -> bool:
-        with self.tracer.start_as_current_span("redis_exists") as span:
-            span.set_attribute("redis.key", key)
-            return await self.pool.exists(key)
-
-    async def close(self) -> None:
-        if self.pool:
-            await self.pool.close()
-            await self.pool.wait_closed()
-            log.info("Redis connection closed")
-
-async def create_redis() -> Redis:
-    redis = Redis()
-    await redis.connect()
-    return redis 
\ No newline at end of file
+            span.set_attribute("redis.key", str(name))
+            return await super().set(
+                name, encode(value), ex, px, nx, xx, keepttl, get, exat, pxat
+            )
+
+    async def ratelimited(self, key: str, limit: int, timespan: float) -> bool:
+        """
+        Count a hit against `key`, True if `limit` hits already happened
+        within the last `timespan` seconds. Limited hits aren't counted.
+        """
+
+        return bool(
+            await self._ratelimit(
+                keys=[f"ratelimit:{key}"],
+                args=[limit, int(timespan * 1000), time.perf_counter_ns()],
+            )
+        )
+
+    def get_lock(
+        self,
+        name: str,
+        timeout: float = 10.0,
+        sleep: float = 0.1,
+        blocking_timeout: Optional[float] = None,
+    ) -> FairLock:
+        return FairLock(self, f"lock:{name}", timeout, sleep, blocking_timeout)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import log
+
+BUCKETS = 4
+
+
+def pack(role_ids: Iterable[int]) -> bytes:
+    return array("q", role_ids).tobytes()
+
+
+def unpack(value: Optional[bytes]) -> List[int]:
+    if not value:
+        return []
+
+    role_ids = array("q")
+    role_ids.frombytes(value)
+    return role_ids.tolist()
+
+
+class RoleSnapshots:
+    """
+    Members' role ids kept in Redis for `ttl` seconds, e.g. after they leave.
+
+    Snapshots live in one hash per guild and time bucket, keyed by
+    member id with the role ids packed as int64, so a member costs a
+    hash field instead of a key with its own expiry. Each bucket covers
+    a quarter of `ttl` and gets a single EXPIREAT covering its last
+    entry, reads look at every bucket that can still hold a live entry.
+
+    Writes are buffered for `flush_interval` seconds and sent in one
+    pipeline, so a prune or raid leaving thousands of members costs a
+    handful of round trips instead of one per member.
+    """
+
+    def __init__(
+        self,
+        bot,
+        namespace: str = "restore",
+        ttl: int = 3600,
+        flush_interval: float = 1.0,
+        max_pending: int = 512,
+    ):
+        self.bot = bot
+        self.namespace = namespace
+        self.ttl = ttl
+        self.width = max(ttl // BUCKETS, 1)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[int, int], Dict[int, bytes]] = defaultdict(dict)
+        self._size = 0
+        self._flush: Optional[asyncio.Task] = None
+
+    def _key(self, guild_id: int, bucket: int) -> str:
+        return f"{self.namespace}:{guild_id}:{bucket}"
+
+    def _buckets(self) -> range:
+        current = int(time.time()) // self.width
+        return range(current, current - BUCKETS - 1, -1)
+
+    def save(self, guild_id: int, member_id: int, role_ids: Iterable[int]) -> None:
+        """Queue a member's snapshot, replacing any earlier one once flushed."""
+
+        bucket = int(time.time()) // self.width
+        entries = self._pending[(guild_id, bucket)]
+        if member_id not in entries:
+            self._size += 1
+        entries[member_id] = pack(role_ids)
+
+        if self._size >= self.max_pending:
+            asyncio.create_task(self.flush())
+        elif self._flush is None or self._flush.done():
+            self._flush = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+
+        pending, self._pending, self._size = self._pending, defaultdict(dict), 0
+        try:
+            async with self.bot.redis.pipeline(transaction=False) as pipe:
+                for (guild_id, bucket), entries in pending.items():
+                    key = self._key(guild_id, bucket)
+                    pipe.hset(key, mapping=entries)
+                    pipe.expireat(key, (bucket + 1) * self.width + self.ttl)
+
+                await pipe.execute()
+        except Exception as e:
+            log.error(f"Failed to flush {sum(map(len, pending.values()))} role snapshots: {e}")
+
+    def _buffered(self, guild_id: int, member_id: int) -> Optional[bytes]:
+        for bucket in self._buckets():
+            entries = self._pending.get((guild_id, bucket))
+            if entries and member_id in entries:
+                return entries[member_id]
+
+        return None
+
+    async def get(self, guild_id: int, member_id: int) -> List[int]:
+        if (value := self._buffered(guild_id, member_id)) is not None:
+            return unpack(value)
+
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for bucket in self._buckets():
+                pipe.hget(self._key(guild_id, bucket), str(member_id))
+
+            values = await pipe.execute()
+
+        return unpack(next((value for value in values if value), None))
+
+    async def pop(self, guild_id: int, member_id: int) -> List[int]:
+        """A member's snapshot, removed so it can only be restored once."""
+
+        role_ids = await self.get(guild_id, member_id)
+        if role_ids:
+            await self.delete(guild_id, member_id)
+
+        return role_ids
+
+    async def delete(self, guild_id: int, member_id: int) -> None:
+        for bucket in self._buckets():
+            if (entries := self._pending.get((guild_id, bucket))) and entries.pop(member_id, None):
+                self._size -= 1
+
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for bucket in self._buckets():
+                pipe.hdel(self._key(guild_id, bucket), str(member_id))
+
+            await pipe.execute()
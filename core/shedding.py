@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+import config
+from utils.logger import log
+
+LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "Smoothed event loop scheduling lag",
+)
+LISTENERS_INFLIGHT = Gauge(
+    "listeners_inflight",
+    "Event listeners currently running",
+)
+SHED_STATE = Gauge(
+    "listener_shed_state",
+    "Shedding state per listener class, 0 running, 1 deferring, 2 dropping",
+    ["priority"],
+)
+SHED_SECONDS = Counter(
+    "listener_shed_seconds_total",
+    "Time each listener class spent deferred or dropped",
+    ["priority"],
+)
+SHED_EVENTS = Counter(
+    "listener_shed_events_total",
+    "Listener invocations deferred or dropped by class",
+    ["priority", "outcome"],
+)
+
+
+class ListenerPriority(IntEnum):
+    CRITICAL = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class ShedState(IntEnum):
+    RUNNING = 0
+    DEFERRING = 1
+    DROPPING = 2
+
+
+# Longest matching prefix wins, matched against `module.qualname`.
+LISTENER_PRIORITIES: Dict[str, ListenerPriority] = {
+    "core.": ListenerPriority.CRITICAL,
+    "moderation.": ListenerPriority.CRITICAL,
+    "cogs.moderation.": ListenerPriority.CRITICAL,
+    "cogs.config.extended.security.": ListenerPriority.CRITICAL,
+    "cogs.config.extended.whitelist.": ListenerPriority.CRITICAL,
+    "cogs.config.extended.verification.": ListenerPriority.CRITICAL,
+    "core.bot.Pride.on_command": ListenerPriority.LOW,
+    "cogs.config.extended.level.": ListenerPriority.LOW,
+    "cogs.information.": ListenerPriority.LOW,
+}
+
+# (state of NORMAL, state of LOW) for each pressure level.
+LEVELS: Tuple[Tuple[ShedState, ShedState], ...] = (
+    (ShedState.RUNNING, ShedState.RUNNING),
+    (ShedState.DEFERRING, ShedState.DROPPING),
+    (ShedState.DROPPING, ShedState.DROPPING),
+)
+
+Deferred = Tuple[Callable[..., Any], str, Tuple[Any, ...], Dict[str, Any]]
+
+
+def classify(listener: Callable[..., Any]) -> ListenerPriority:
+    func = getattr(listener, "__func__", listener)
+    name = f"{func.__module__}.{func.__qualname__}"
+    match = max(
+        (prefix for prefix in LISTENER_PRIORITIES if name.startswith(prefix)),
+        key=len,
+        default=None,
+    )
+    return LISTENER_PRIORITIES[match] if match else ListenerPriority.NORMAL
+
+
+class LoadShedder:
+    """
+    Keeps moderation and security listeners responsive under gateway storms.
+
+    Loop lag is sampled every `INTERVAL` and, together with the number of
+    listeners still running, mapped onto a pressure level. While pressure
+    is up low priority listeners (XP, stats, name history) are dropped
+    and normal ones are deferred until it clears, or dropped as well if
+    it gets severe. Critical listeners always run. Levels rise at once
+    and only fall after `COOLDOWN` seconds without pressure, so a storm
+    doesn't flap the controller on every sample.
+    """
+
+    def __init__(self, bot, settings=config.SHEDDING):
+        self.bot = bot
+        self.settings = settings
+        self.lag = 0.0
+        self.inflight = 0
+        self.level = 0
+        self._calm_since = 0.0
+        self._since: Dict[ListenerPriority, float] = {}
+        self._priorities: Dict[Callable[..., Any], ListenerPriority] = {}
+        self._deferred: Deque[Deferred] = deque()
+        self._monitor: Optional[asyncio.Task] = None
+
+    def state(self, priority: ListenerPriority) -> ShedState:
+        if priority is ListenerPriority.CRITICAL:
+            return ShedState.RUNNING
+
+        return LEVELS[self.level][priority - 1]
+
+    @property
+    def shedding(self) -> Dict[str, float]:
+        """Shedding classes and how long they have been shed for."""
+
+        now = time.monotonic()
+        return {priority.name.lower(): now - since for priority, since in self._since.items()}
+
+    def priority(self, listener: Callable[..., Any]) -> ListenerPriority:
+        func = getattr(listener, "__func__", listener)
+        try:
+            return self._priorities[func]
+        except KeyError:
+            priority = self._priorities[func] = classify(func)
+            return priority
+
+    def admit(
+        self,
+        listener: Callable[..., Any],
+        event_name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> bool:
+        """Whether `listener` may run now, deferring it when it may later."""
+
+        if not self.level:
+            return True
+
+        priority = self.priority(listener)
+        state = self.state(priority)
+        if state is ShedState.RUNNING:
+            return True
+
+        label = priority.name.lower()
+        if state is ShedState.DEFERRING and len(self._deferred) < self.settings.MAX_DEFERRED:
+            self._deferred.append((listener, event_name, args, kwargs))
+            SHED_EVENTS.labels(priority=label, outcome="deferred").inc()
+        else:
+            SHED_EVENTS.labels(priority=label, outcome="dropped").inc()
+
+        return False
+
+    def track(self, task: asyncio.Task) -> None:
+        self.inflight += 1
+        task.add_done_callback(self._finished)
+
+    def _finished(self, _: asyncio.Task) -> None:
+        self.inflight -= 1
+
+    def start(self) -> None:
+        if self.settings.ENABLED and self._monitor is None:
+            for priority in (ListenerPriority.NORMAL, ListenerPriority.LOW):
+                SHED_STATE.labels(priority=priority.name.lower()).set(0)
+            self._monitor = asyncio.create_task(self._sample(), name="load_shedder")
+
+    def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+    def _pressure(self) -> int:
+        if self.lag >= self.settings.SEVERE_LAG:
+            return 2
+
+        if self.lag >= self.settings.LAG or self.inflight >= self.settings.MAX_INFLIGHT:
+            return 1
+
+        return 0
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.settings.INTERVAL
+        last = loop.time()
+        while True:
+            await asyncio.sleep(interval)
+            now = loop.time()
+            sample = max(now - last - interval, 0.0)
+            last = now
+
+            # Rise with the first slow tick, decay over a few calm ones.
+            self.lag = sample if sample > self.lag else self.lag * 0.7 + sample * 0.3
+            LOOP_LAG.set(self.lag)
+            LISTENERS_INFLIGHT.set(self.inflight)
+            self._update(time.monotonic(), interval + sample)
+
+            if not self.level and self._deferred:
+                self._drain()
+
+    def _update(self, now: float, elapsed: float) -> None:
+        pressure = self._pressure()
+        if pressure >= self.level:
+            self._calm_since = now
+            level = pressure
+        elif now - self._calm_since >= self.settings.COOLDOWN:
+            level = pressure
+        else:
+            level = self.level
+
+        for priority in self._since:
+            SHED_SECONDS.labels(priority=priority.name.lower()).inc(elapsed)
+
+        if level != self.level:
+            self._transition(level, now)
+
+    def _transition(self, level: int, now: float) -> None:
+        previous, self.level = self.level, level
+        log.warning(
+            "Listener shedding level %s -> %s (lag %.3fs, %s in flight, %s deferred)",
+            previous,
+            level,
+            self.lag,
+            self.inflight,
+            len(self._deferred),
+        )
+
+        for priority in (ListenerPriority.NORMAL, ListenerPriority.LOW):
+            state = self.state(priority)
+            SHED_STATE.labels(priority=priority.name.lower()).set(int(state))
+            if state is ShedState.RUNNING and priority in self._since:
+                log.info(
+                    "Stopped shedding %s listeners after %.1fs",
+                    priority.name.lower(),
+                    now - self._since.pop(priority),
+                )
+            elif state is not ShedState.RUNNING:
+                self._since.setdefault(priority, now)
+
+    def _drain(self) -> None:
+        """Run a batch of deferred listeners, one batch per calm sample."""
+
+        for _ in range(min(self.settings.DRAIN_BATCH, len(self._deferred))):
+            listener, event_name, args, kwargs = self._deferred.popleft()
+            self.bot._schedule_event(listener, event_name, *args, **kwargs)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from prometheus_client import Gauge
+
+from utils.logger import log
+
+STARTUP_SECONDS = Gauge(
+    "bot_startup_phase_seconds",
+    "Time spent in each startup phase or lazy subsystem start",
+    ["cluster", "phase"],
+)
+
+
+class Subsystem:
+    """A heavy dependency which is only started once something needs it."""
+
+    __slots__ = ("name", "factory", "state", "error", "task")
+
+    name: str
+    factory: Callable[[], Awaitable[object]]
+    state: str
+    error: Optional[BaseException]
+    task: Optional[asyncio.Task]
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable[object]]):
+        self.name = name
+        self.factory = factory
+        self.state = "pending"
+        self.error = None
+        self.task = None
+
+
+class StartupRegistry:
+    """
+    Readiness registry for a cluster's startup.
+
+    Phases of `setup_hook` are timed through `phase`, subsystems are
+    registered with an async factory and started on the first `require`.
+    Every duration lands in `timings` and the `bot_startup_phase_seconds` gauge.
+    """
+
+    def __init__(self, cluster_id: int = 0, lazy: bool = True):
+        self.cluster_id = cluster_id
+        self.lazy = lazy
+        self.subsystems: Dict[str, Subsystem] = {}
+        self.timings: Dict[str, float] = {}
+
+    def record(self, name: str, elapsed: float) -> None:
+        self.timings[name] = elapsed
+        STARTUP_SECONDS.labels(cluster=str(self.cluster_id), phase=name).set(elapsed)
+        log.info(f"Startup phase {name} took {elapsed:.2f}s")
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def phase(self, name: str) -> AsyncIterator[None]:
+        with self.measure(name):
+            yield
+
+    def register(self, name: str, factory: Callable[[], Awaitable[object]]) -> None:
+        self.subsystems[name] = Subsystem(name, factory)
+
+    def ready(self, name: str) -> bool:
+        subsystem = self.subsystems.get(name)
+        return subsystem is not None and subsystem.state == "ready"
+
+    async def _start(self, subsystem: Subsystem) -> None:
+        subsystem.state = "starting"
+        try:
+            with self.measure(f"subsystem:{subsystem.name}"):
+                await subsystem.factory()
+        except Exception as e:
+            subsystem.state = "failed"
+            subsystem.error = e
+            log.error(f"Failed to start subsystem {subsystem.name}: {e}")
+            raise
+
+        subsystem.state = "ready"
+
+    async def require(self, *names: str) -> None:
+        """Start the named subsystems if they aren't running yet and wait for them."""
+
+        tasks = []
+        for name in names:
+            subsystem = self.subsystems.get(name)
+            if subsystem is None:
+                raise KeyError(f"Unknown subsystem {name}")
+
+            if subsystem.state == "ready":
+                continue
+
+            # A failed start is retried by the next caller.
+            if subsystem.task is None or subsystem.state == "failed":
+                subsystem.task = asyncio.create_task(self._start(subsystem))
+
+            tasks.append(subsystem.task)
+
+        if tasks:
+            await asyncio.gather(*(asyncio.shield(task) for task in tasks))
+
+    async def start_all(self) -> None:
+        """Start every registered subsystem, used when lazy startup is disabled."""
+
+        await asyncio.gather(
+            *(self.require(name) for name in self.subsystems),
+            return_exceptions=True,
+        )
+
+    def export(self) -> Dict[str, object]:
+        return {
+            "timings": dict(self.timings),
+            "subsystems": {
+                name: subsystem.state for name, subsystem in self.subsystems.items()
+            },
+        }
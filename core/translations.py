@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from string import Formatter
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+from core.cache import LRU
+from utils.metrics import CacheCounter
+from utils.logger import log
+
+if TYPE_CHECKING:
+    from main import Pride
+
+
+DEFAULT_LOCALE = "en-US"
+METADATA_KEYS = ("language", "language_code", "language_local")
+IPC_COMMAND = "language_invalidate"
+
+_formatter = Formatter()
+
+
+class CompiledString:
+    """
+    A translation string with its format plan parsed ahead of time.
+
+    Simple `{name}` / `{name:spec}` / `{name!r}` fields are rendered
+    straight from the keyword arguments, anything more elaborate
+    falls back to `str.format` so the output never changes.
+    """
+
+    __slots__ = ("raw", "plan", "simple")
+
+    raw: str
+    plan: Tuple[Tuple[str, Optional[str], str, Optional[str]], ...]
+    simple: bool
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        try:
+            self.plan = tuple(_formatter.parse(raw))
+        except ValueError:
+            self.plan = ()
+            self.simple = False
+            return
+
+        self.simple = all(
+            field is None or (field.isidentifier() and "{" not in spec)
+            for _, field, spec, _ in self.plan
+        )
+
+    def render(self, kwargs: Mapping[str, Any]) -> str:
+        if not kwargs:
+            return self.raw
+
+        if not self.simple:
+            return self.raw.format(**kwargs)
+
+        parts: List[str] = []
+        for literal, field, spec, conversion in self.plan:
+            if literal:
+                parts.append(literal)
+
+            if field is None:
+                continue
+
+            value = kwargs[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+
+            parts.append(format(value, spec))
+
+        return "".join(parts)
+
+
+class TranslationCatalog:
+    """
+    Flat, interned lookup tables for every locale under `langs/`.
+
+    Nested keys are flattened into dotted paths at load time so a lookup
+    is a single dictionary access per locale in the fallback chain.
+    """
+
+    tables: Dict[str, Dict[str, CompiledString]]
+    languages: Dict[str, Dict[str, str]]
+
+    def __init__(self) -> None:
+        self.tables = {}
+        self.languages = {}
+        self._chains: Dict[str, Tuple[str, ...]] = {}
+
+    @classmethod
+    def from_directory(cls, langs_dir: Path) -> TranslationCatalog:
+        catalog = cls()
+        if not langs_dir.exists():
+            return catalog
+
+        for lang_file in sorted(langs_dir.rglob("*.json")):
+            locale = lang_file.stem
+            try:
+                with lang_file.open(encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                log.error(f"Error loading translation file {lang_file}: {e}")
+                continue
+
+            category = lang_file.relative_to(langs_dir).parts[0]
+            if category == "system":
+                if all(key in data for key in METADATA_KEYS):
+                    catalog.languages.setdefault(
+                        data["language_local"],
+                        {key: data[key] for key in METADATA_KEYS},
+                    )
+
+                # System files already nest their keys under `system`.
+                data = {"system": data.get("system", {})}
+            else:
+                data = {category: data}
+
+            catalog._flatten(catalog.tables.setdefault(locale, {}), data, "")
+
+        log.info(
+            f"Compiled {sum(len(table) for table in catalog.tables.values())} "
+            f"translations for {len(catalog.tables)} locales"
+        )
+        return catalog
+
+    def _flatten(
+        self,
+        table: Dict[str, CompiledString],
+        node: Mapping[str, Any],
+        prefix: str,
+    ) -> None:
+        for key, value in node.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, str):
+                table[sys.intern(path)] = CompiledString(value)
+
+            elif isinstance(value, dict):
+                if isinstance(description := value.get("description"), str):
+                    table[sys.intern(path)] = CompiledString(description)
+
+                self._flatten(table, value, f"{path}.")
+
+    def fallback_chain(self, locale: str) -> Tuple[str, ...]:
+        """
+        The locales searched for a given user locale, in order:
+        the locale itself, siblings sharing its language, then the default.
+        """
+
+        if (chain := self._chains.get(locale)) is not None:
+            return chain
+
+        language = locale.split("-", 1)[0]
+        chain = tuple(
+            dict.fromkeys(
+                [
+                    locale,
+                    *(
+                        other
+                        for other in sorted(self.tables)
+                        if other != locale and other.split("-", 1)[0] == language
+                    ),
+                    DEFAULT_LOCALE,
+                ]
+            )
+        )
+        self._chains[locale] = chain
+        return chain
+
+    def lookup(self, path: str, locale: str = DEFAULT_LOCALE) -> Optional[CompiledString]:
+        for candidate in self.fallback_chain(locale):
+            table = self.tables.get(candidate)
+            if table is not None and (compiled := table.get(path)) is not None:
+                return compiled
+
+        # Allow explicit locale prefixes such as `en-US.system.errors...`.
+        head, _, rest = path.partition(".")
+        if rest and (table := self.tables.get(head)) is not None:
+            return table.get(rest)
+
+        return None
+
+    def render(self, path: str, locale: str = DEFAULT_LOCALE, **kwargs: Any) -> str:
+        """
+        Render a translation, raising `KeyError` when neither
+        the locale nor any of its fallbacks define the path.
+        """
+
+        compiled = self.lookup(path, locale)
+        if compiled is None:
+            raise KeyError(path)
+
+        return compiled.render(kwargs)
+
+
+class LanguageCache:
+    """
+    Bounded cache of `user_settings.language` so `get_text`
+    only touches the database once per user.
+    """
+
+    def __init__(self, bot: "Pride", maxsize: int = 50_000) -> None:
+        self.bot = bot
+        self._cache: LRU = LRU(maxsize)
+        self._counter = CacheCounter("languages")
+
+    async def get(self, user_id: int) -> str:
+        try:
+            language = self._cache[user_id]
+        except KeyError:
+            self._counter.miss.inc()
+        else:
+            self._counter.hit.inc()
+            return language
+
+        try:
+            language = await self.bot.db.fetchval(
+                "SELECT language FROM user_settings WHERE user_id = $1",
+                user_id,
+            )
+        except Exception as e:
+            log.error(f"Error fetching user language: {e}")
+            return DEFAULT_LOCALE
+
+        language = language or DEFAULT_LOCALE
+        self._cache[user_id] = language
+        return language
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.pop(user_id, None)
+
+    async def set(self, user_id: int, language: str) -> None:
+        """Record a new preference and drop it from every cluster's cache."""
+
+        self._cache[user_id] = language
+        if not self.bot.ipc:
+            return
+
+        try:
+            await self.bot.ipc.publish(IPC_COMMAND, {"user_id": user_id})
+        except Exception as e:
+            log.error(f"Failed to propagate language invalidation: {e}")
+
+    async def handle_ipc(self, data: dict) -> None:
+        self.invalidate(data["user_id"])
@@ -1,6 +1,8 @@
+import asyncio
 import discord
 import json
 from datetime import datetime
+from typing import Dict, Iterable, Set
 
 from discord.ext import commands
 from discord.ext.commands import (
@@ -12,6 +14,113 @@ from discord.ext.commands import (
 )
 
 from core.context import Context
+from utils.logger import log
+from utils.metrics import CacheCounter
+
+FAKE_PERMISSIONS_IPC = "fake_permissions_invalidate"
+ADMINISTRATOR = discord.Permissions.VALID_FLAGS["administrator"]
+
+
+def permission_mask(names: Iterable[str]) -> int:
+    """OR the flag values of permission names together, ignoring unknown names."""
+
+    mask = 0
+    for name in names:
+        mask |= discord.Permissions.VALID_FLAGS.get(name, 0)
+
+    return mask
+
+
+class FakePermissions:
+    """
+    Per-guild fake permissions held in memory as role id → permission bitset.
+
+    A guild's table is loaded on first use with a single prepared query
+    and dropped whenever its fake permissions are changed, on this
+    cluster directly and on every other cluster through IPC.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._guilds: Dict[int, Dict[int, int]] = {}
+        self._pending: Dict[int, asyncio.Task] = {}
+        self._stale: Set[int] = set()
+        self._counter = CacheCounter("fake_permissions")
+
+    async def _load(self, guild_id: int) -> Dict[int, int]:
+        records = await self.bot.db.fetch(
+            "SELECT role_id, permission FROM fake_permissions WHERE guild_id = $1",
+            guild_id,
+        )
+
+        table: Dict[int, int] = {}
+        for record in records:
+            try:
+                names = json.loads(record["permission"])
+            except (TypeError, ValueError):
+                continue
+
+            if mask := permission_mask(names):
+                table[record["role_id"]] = table.get(record["role_id"], 0) | mask
+
+        return table
+
+    async def get(self, guild_id: int) -> Dict[int, int]:
+        if (table := self._guilds.get(guild_id)) is not None:
+            self._counter.hit.inc()
+            return table
+
+        self._counter.miss.inc()
+
+        task = self._pending.get(guild_id)
+        if task is None:
+            self._stale.discard(guild_id)
+            task = self._pending[guild_id] = asyncio.create_task(self._load(guild_id))
+
+        try:
+            table = await asyncio.shield(task)
+        finally:
+            if self._pending.get(guild_id) is task and task.done():
+                self._pending.pop(guild_id, None)
+
+        # Only keep the result if nothing changed while it was loading.
+        if guild_id not in self._stale:
+            self._guilds[guild_id] = table
+
+        return table
+
+    async def resolve(self, guild_id: int, role_ids: Iterable[int]) -> int:
+        """The combined fake permission bitset of a set of roles."""
+
+        table = await self.get(guild_id)
+        if not table:
+            return 0
+
+        value = 0
+        for role_id in role_ids:
+            value |= table.get(role_id, 0)
+
+        return value
+
+    def discard(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
+        if guild_id in self._pending:
+            self._stale.add(guild_id)
+
+    async def invalidate(self, guild_id: int) -> None:
+        """Drop a guild's table here and on every other cluster."""
+
+        self.discard(guild_id)
+        if not self.bot.ipc:
+            return
+
+        try:
+            await self.bot.ipc.publish(FAKE_PERMISSIONS_IPC, {"guild_id": guild_id})
+        except Exception as e:
+            log.error(f"Failed to propagate fake permission invalidation: {e}")
+
+    async def handle_ipc(self, data: dict) -> None:
+        self.discard(data["guild_id"])
 
 
 class ValidPermission(Converter):
@@ -29,6 +138,8 @@ class ValidPermission(Converter):
 def has_permissions(**permissions):
     """Check if the user has permissions to execute the command (fake permissions included)"""
 
+    required = permission_mask(permissions)
+
     async def predicate(ctx: Context):
 
         if ctx.author.id in ctx.bot.owner_ids:
@@ -43,26 +154,17 @@ def has_permissions(**permissions):
 
             return True
 
-        author_permissions = [p[0] for p in ctx.author.guild_permissions if p[1]]
-        if not any(p in author_permissions for p in permissions):
-
-            roles = ", ".join(list(map(lambda r: str(r.id), ctx.author.roles)))
-            results = await ctx.bot.db.fetch(
-                f"SELECT permission FROM fake_permissions WHERE guild_id = $1 AND role_id IN ({roles})",
-                ctx.guild.id,
-            )
-
-            for result in results:
-                fake_perms = json.loads(result[0])
-
-                if "administrator" in fake_perms:
-                    return True
+        if ctx.author.guild_permissions.value & required:
+            return True
 
-                if any(p in fake_perms for p in permissions):
-                    return True
+        fake = await ctx.bot.fake_permissions.resolve(
+            ctx.guild.id,
+            (ctx.guild.id, *ctx.author._roles),
+        )
+        if fake & (required | ADMINISTRATOR):
+            return True
 
-            raise MissingPermissions([p for p in permissions])
-        return True
+        raise MissingPermissions([p for p in permissions])
 
     return commands.check(predicate)
 
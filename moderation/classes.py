@@ -1,5 +1,4 @@
-from main import Pride
-from typing import Union, Optional
+from typing import TYPE_CHECKING, Dict, List, Sequence, Union, Optional
 from core.context import Context
 from discord.ext import commands
 from discord.ext.commands.core import has_permissions
@@ -17,9 +16,19 @@ from processors.moderation import process_mod_action, process_dm_script
 import psutil
 import asyncio
 
+from logging import getLogger
 from opentelemetry import trace
 from prometheus_client import Counter, Histogram, REGISTRY
 
+from utils.metrics import budgeted
+
+if TYPE_CHECKING:
+    from core.bot import Pride
+
+log = getLogger("evict/mod")
+
+BULK_BAN_LIMIT = 200
+
 _mod_actions: Optional[Counter] = None
 _mod_action_duration: Optional[Histogram] = None
 _dm_attempts: Optional[Counter] = None
@@ -98,7 +107,7 @@ def get_dm_attempts() -> Counter:
     return _dm_attempts
 
 # Replace direct assignments with getter functions
-MOD_ACTIONS = get_mod_actions()
+MOD_ACTIONS = budgeted(get_mod_actions())
 MOD_ACTION_DURATION = get_mod_action_duration()
 DM_ATTEMPTS = get_dm_attempts()
 
@@ -149,7 +158,7 @@ class Mod:
 class ModConfig:
     @staticmethod
     async def sendlogs(
-        bot: Pride,
+        bot: "Pride",
         action: str,
         author: Member,
         victim: Union[Member, User],
@@ -171,12 +180,7 @@ class ModConfig:
                     ).inc()
 
                     action_data = {'action': action, 'duration': duration}
-                    processed_action = await bot.loop.run_in_executor(
-                        None,
-                        bot.process_pool.apply,
-                        process_mod_action,
-                        (action_data,)
-                    )
+                    processed_action = await bot.run_job(process_mod_action, action_data)
 
                     settings = await bot.db.fetchrow(
                         "SELECT * FROM mod WHERE guild_id = $1",
@@ -257,7 +261,7 @@ class ModConfig:
 
                     if processed_action['should_dm'] and settings.get('dm_enabled'):
                         try:
-                            mutual_guilds = [g for g in bot.guilds if victim in g.members]
+                            mutual_guilds = bot.member_cache.mutual_guilds(victim.id)
                             if not mutual_guilds and action not in ['ban', 'kick', 'hardban']:
                                 return
 
@@ -387,6 +391,89 @@ class ModConfig:
                     span.set_status(trace.Status(trace.StatusCode.ERROR))
                     raise
 
+    @staticmethod
+    async def sendbulklogs(
+        bot: "Pride",
+        action: str,
+        author: Member,
+        victims: Sequence[Union[Member, User]],
+        reason: str,
+    ):
+        """
+        Log one action taken against many users as a single case.
+
+        Every victim gets a history row under the shared case number,
+        written in one batch, and the modlog receives one embed.
+        """
+
+        if not victims:
+            return
+
+        with bot.tracer.start_span("mod_action") as span:
+            span.set_attribute("action", action)
+            span.set_attribute("guild_id", str(author.guild.id))
+            span.set_attribute("moderator_id", str(author.id))
+            span.set_attribute("target_count", len(victims))
+
+            with MOD_ACTION_DURATION.labels(action=action).time():
+                MOD_ACTIONS.labels(action=action, guild_id=str(author.guild.id)).inc(len(victims))
+
+                settings = await bot.db.fetchrow(
+                    "SELECT * FROM mod WHERE guild_id = $1",
+                    author.guild.id
+                )
+                if not settings:
+                    return
+
+                async with bot.db.acquire() as conn, conn.transaction():
+                    res = await conn.fetchrow(
+                        "SELECT count FROM cases WHERE guild_id = $1 FOR UPDATE", author.guild.id
+                    )
+                    if not res:
+                        await conn.execute(
+                            "INSERT INTO cases (guild_id, count) VALUES ($1, $2)",
+                            author.guild.id, 1
+                        )
+                        case = 1
+                    else:
+                        case = int(res["count"]) + 1
+                        await conn.execute(
+                            "UPDATE cases SET count = $1 WHERE guild_id = $2", case, author.guild.id
+                        )
+
+                    await conn.executemany(
+                        """
+                        INSERT INTO history.moderation
+                        (guild_id, case_id, user_id, moderator_id, action, reason)
+                        VALUES ($1, $2, $3, $4, $5, $6)
+                        """,
+                        [
+                            (author.guild.id, case, victim.id, author.id, action, reason)
+                            for victim in victims
+                        ],
+                    )
+
+                if not settings.get("channel_id"):
+                    return
+
+                listed = "\n".join(f"{victim} (`{victim.id}`)" for victim in victims[:15])
+                if len(victims) > 15:
+                    listed += f"\n*and {len(victims) - 15} more*"
+
+                embed = Embed(timestamp=datetime.datetime.now(), color=discord.Color.red())
+                embed.set_author(name="Modlog Entry", icon_url=author.display_avatar)
+                embed.add_field(
+                    name="Information",
+                    value=f"**Case #{case}** | {action}\n**Users**: {len(victims)}\n**Moderator**: {author} (`{author.id}`)\n**Reason**: {reason}",
+                    inline=False,
+                )
+                embed.add_field(name="Users", value=listed[:1024], inline=False)
+
+                try:
+                    await author.guild.get_channel(int(settings["channel_id"])).send(embed=embed)
+                except:
+                    pass
+
 async def send_non_critical_dm(bot, settings, action, author, victim, reason, duration, role, processed_action):
     """Handles sending DMs for non-critical moderation actions"""
     try:
@@ -466,6 +553,82 @@ async def send_non_critical_dm(bot, settings, action, author, victim, reason, du
     except Exception as e:
         pass
 
+class BulkBan:
+    """
+    Bans a batch of users through Discord's bulk-ban endpoint.
+
+    Users go out in chunks of 200, each paced against the route's
+    remaining budget. When the endpoint can't be used, because the bot
+    lacks Manage Server or a chunk is rejected, the remaining users are
+    banned one by one with the same pacing. `results` maps every user id
+    to `None` when banned, otherwise to the reason it failed.
+    """
+
+    def __init__(self, bot: "Pride", guild: discord.Guild, reason: str, delete_message_days: int = 0):
+        self.bot = bot
+        self.guild = guild
+        self.reason = reason
+        self.delete_message_seconds = delete_message_days * 86400
+        self.results: Dict[int, Optional[str]] = {}
+
+    @property
+    def banned(self) -> List[int]:
+        return [user_id for user_id, error in self.results.items() if error is None]
+
+    @property
+    def failed(self) -> Dict[int, str]:
+        return {user_id: error for user_id, error in self.results.items() if error is not None}
+
+    async def _bulk(self, users: Sequence[discord.abc.Snowflake]) -> bool:
+        await self.bot.rest.pace("POST", "/guilds/{guild_id}/bulk-ban", self.guild.id)
+        try:
+            result = await self.guild.bulk_ban(
+                users,
+                reason=self.reason,
+                delete_message_seconds=self.delete_message_seconds,
+            )
+        except discord.HTTPException as e:
+            log.warning(f"Bulk ban of {len(users)} users in {self.guild.id} failed, banning individually: {e}")
+            return False
+
+        for user in result.banned:
+            self.results[user.id] = None
+        for user in result.failed:
+            self.results[user.id] = "Already banned or can't be banned"
+
+        return True
+
+    async def _single(self, user: discord.abc.Snowflake) -> None:
+        await self.bot.rest.pace("PUT", "/guilds/{guild_id}/bans/{id}", self.guild.id)
+        try:
+            await self.guild.ban(
+                user,
+                reason=self.reason,
+                delete_message_seconds=self.delete_message_seconds,
+            )
+        except discord.NotFound:
+            self.results[user.id] = "Unknown user"
+        except discord.Forbidden:
+            self.results[user.id] = "Missing permissions"
+        except discord.HTTPException as e:
+            self.results[user.id] = e.text or f"HTTP {e.status}"
+        else:
+            self.results[user.id] = None
+
+    async def run(self, users: Sequence[discord.abc.Snowflake]) -> Dict[int, Optional[str]]:
+        bulk = self.guild.me.guild_permissions.manage_guild
+        for start in range(0, len(users), BULK_BAN_LIMIT):
+            chunk = users[start:start + BULK_BAN_LIMIT]
+            if bulk and await self._bulk(chunk):
+                continue
+
+            bulk = False
+            for user in chunk:
+                await self._single(user)
+
+        return self.results
+
+
 class ClearMod(discord.ui.View):
     def __init__(self, ctx: Context):
         super().__init__()
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from logging import getLogger
+from typing import Any, Dict, List, Optional, Sequence
+
+import discord
+from discord import Embed, Guild, PermissionOverwrite, Permissions, Role, TextChannel
+
+import config
+from core.redis import FairLock
+
+log = getLogger("evict/mod")
+
+OVERWRITE_ROUTE = "/channels/{channel_id}/permissions/{id}"
+TEXT = {
+    "lock": "moderation.lockdown.all",
+    "unlock": "moderation.unlockdown.all",
+}
+PROGRESS_INTERVAL = 2.0
+CONCURRENCY = 4
+LOCK_TIMEOUT = 30.0
+
+
+def snapshot_key(guild_id: int, role_id: int) -> str:
+    return f"lockdown:{guild_id}:{role_id}"
+
+
+def job_key(guild_id: int) -> str:
+    return f"lockdown:job:{guild_id}"
+
+
+class Lockdown:
+    """
+    Locks or unlocks a set of channels for one role at the REST budget.
+
+    Before a channel is locked its current overwrite for the role is
+    snapshotted to Redis, unlocking puts that exact overwrite back (or
+    removes it when there was none) and leaves channels without a
+    snapshot alone. Edits are paced against the overwrite route and the
+    global limit by a few workers, progress is patched into `message`
+    every couple of seconds and the job itself is kept in Redis until it
+    finishes, so `resume` can pick it up after a restart. A guild runs
+    one job at a time under a lock on its job key, and both directions
+    skip channels which are already done, which is what makes resuming
+    safe.
+    """
+
+    def __init__(
+        self,
+        bot,
+        guild: Guild,
+        role: Role,
+        action: str,
+        reason: str,
+        author_id: int,
+        message: Optional[discord.Message | discord.PartialMessage] = None,
+        ctx=None,
+    ):
+        self.bot = bot
+        self.guild = guild
+        self.role = role
+        self.action = action
+        self.reason = reason
+        self.author_id = author_id
+        self.message = message
+        self.ctx = ctx
+        self.done = 0
+        self.changed = 0
+        self.failed = 0
+        self.total = 0
+
+    async def snapshot(self, channel: TextChannel) -> None:
+        overwrite = channel.overwrites.get(self.role)
+        value = [permissions.value for permissions in overwrite.pair()] if overwrite else None
+        await self.bot.redis.hsetnx(
+            snapshot_key(self.guild.id, self.role.id), str(channel.id), json.dumps(value)
+        )
+
+    async def lock_channel(self, channel: TextChannel) -> bool:
+        """Lock a single channel, False if it already was."""
+
+        overwrite = channel.overwrites_for(self.role)
+        if overwrite.send_messages is False:
+            return False
+
+        await self.snapshot(channel)
+        overwrite.send_messages = False
+        await self.bot.rest.pace("PUT", OVERWRITE_ROUTE, channel.id)
+        await channel.set_permissions(self.role, overwrite=overwrite, reason=self.reason)
+        return True
+
+    async def unlock_channel(self, channel: TextChannel, force: bool = False) -> bool:
+        """
+        Put a channel's snapshotted overwrite back, False if it has none.
+
+        With `force` a channel locked without a snapshot, e.g. by hand,
+        gets Send Messages allowed again instead.
+        """
+
+        key = snapshot_key(self.guild.id, self.role.id)
+        stored = await self.bot.redis.hget(key, str(channel.id))
+        if stored is None:
+            overwrite = channel.overwrites_for(self.role)
+            if not force or overwrite.send_messages is not False:
+                return False
+
+            overwrite.send_messages = True
+            await self.bot.rest.pace("PUT", OVERWRITE_ROUTE, channel.id)
+            await channel.set_permissions(self.role, overwrite=overwrite, reason=self.reason)
+            return True
+
+        pair = json.loads(stored)
+        if pair is None:
+            await self.bot.rest.pace("DELETE", OVERWRITE_ROUTE, channel.id)
+            await channel.set_permissions(self.role, overwrite=None, reason=self.reason)
+        else:
+            await self.bot.rest.pace("PUT", OVERWRITE_ROUTE, channel.id)
+            await channel.set_permissions(
+                self.role,
+                overwrite=PermissionOverwrite.from_pair(Permissions(pair[0]), Permissions(pair[1])),
+                reason=self.reason,
+            )
+
+        await self.bot.redis.hdel(key, str(channel.id))
+        return True
+
+    async def snapshotted(self) -> List[int]:
+        """Ids of the channels with a stored overwrite for the role."""
+
+        stored = await self.bot.redis.hkeys(snapshot_key(self.guild.id, self.role.id))
+        return [int(channel_id) for channel_id in stored]
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        apply = self.lock_channel if self.action == "lock" else self.unlock_channel
+        while (channel := await queue.get()) is not None:
+            try:
+                if await apply(channel):
+                    self.changed += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                log.warning(f"Failed to {self.action} {channel.id} in {self.guild.id}: {e}")
+                self.failed += 1
+
+            self.done += 1
+
+    async def _text(self, path: str, **kwargs: Any) -> str:
+        return await self.bot.get_text(path, self.ctx, **kwargs)
+
+    async def _report(self) -> None:
+        if self.message is None:
+            return
+
+        text = await self._text(
+            f"{TEXT[self.action]}.RUNNING", done=self.done, total=self.total
+        )
+        try:
+            await self.message.edit(
+                embed=Embed(
+                    color=config.COLORS.NEUTRAL,
+                    description=f"<@{self.author_id}>: {text}",
+                )
+            )
+        except discord.HTTPException:
+            self.message = None
+
+    async def _progress(self, lock: FairLock) -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            if not await lock.extend():
+                log.warning(f"Lost the {self.action} job lock of {self.guild.id}")
+            await self._report()
+
+    def _state(self, channel_ids: Sequence[int]) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "role_id": self.role.id,
+            "reason": self.reason,
+            "author_id": self.author_id,
+            "channel_ids": list(channel_ids),
+            "message": (
+                [self.message.channel.id, self.message.id] if self.message else None
+            ),
+            "started": time.time(),
+        }
+
+    async def run(self, channels: Sequence[TextChannel]) -> int:
+        """Lock or unlock every channel, returning how many were changed."""
+
+        lock = self.bot.redis.get_lock(job_key(self.guild.id), timeout=LOCK_TIMEOUT, sleep=1)
+        async with lock:
+            return await self._run(channels, lock)
+
+    async def _run(self, channels: Sequence[TextChannel], lock: FairLock) -> int:
+        self.total = len(channels)
+        await self.bot.redis.set(job_key(self.guild.id), self._state([c.id for c in channels]))
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for channel in channels:
+            queue.put_nowait(channel)
+        for _ in range(CONCURRENCY):
+            queue.put_nowait(None)
+
+        progress = asyncio.create_task(self._progress(lock))
+        try:
+            await asyncio.gather(*(self._worker(queue) for _ in range(CONCURRENCY)))
+        finally:
+            progress.cancel()
+
+        await self.bot.redis.delete(job_key(self.guild.id))
+        return self.changed
+
+    @classmethod
+    async def resume(cls, bot) -> None:
+        """Finish every lockdown job this cluster's guilds left behind."""
+
+        async for key in bot.redis.scan_iter(match="lockdown:job:*"):
+            guild = bot.get_guild(int(key.rsplit(b":", 1)[-1]))
+            if guild is None:
+                continue
+
+            lock = bot.redis.get_lock(job_key(guild.id), timeout=LOCK_TIMEOUT)
+            if not await lock.acquire(blocking=False):
+                # Another process is already running it.
+                continue
+
+            try:
+                await cls._resume(bot, guild, key, lock)
+            finally:
+                await lock.release()
+
+    @classmethod
+    async def _resume(cls, bot, guild: Guild, key: bytes, lock: FairLock) -> None:
+        state = await bot.redis.get(key)
+        role = state and guild.get_role(state["role_id"])
+        if not role:
+            await bot.redis.delete(key)
+            return
+
+        message = None
+        if state["message"] and (channel := guild.get_channel(state["message"][0])):
+            message = channel.get_partial_message(state["message"][1])  # type: ignore
+
+        channels: List[TextChannel] = [
+            channel
+            for channel_id in state["channel_ids"]
+            if isinstance(channel := guild.get_channel(channel_id), TextChannel)
+        ]
+        lockdown = cls(
+            bot,
+            guild,
+            role,
+            state["action"],
+            state["reason"],
+            state["author_id"],
+            message,
+        )
+        log.info(f"Resuming {lockdown.action} of {len(channels)} channels in {guild.id}")
+        try:
+            count = await lockdown._run(channels, lock)
+        except Exception as e:
+            log.error(f"Failed to resume lockdown in {guild.id}: {e}")
+            return
+
+        if message is not None:
+            text = await lockdown._text(
+                f"{TEXT[lockdown.action]}.SUCCESS",
+                count=count,
+                duration=time.time() - state["started"],
+            )
+            try:
+                await message.edit(
+                    embed=Embed(
+                        color=config.COLORS.APPROVE,
+                        description=f"{config.EMOJIS.CONTEXT.APPROVE} <@{lockdown.author_id}>: {text}",
+                    )
+                )
+            except discord.HTTPException:
+                pass
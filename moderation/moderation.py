@@ -9,7 +9,7 @@ from io import BytesIO
 from logging import getLogger
 from textwrap import wrap
 from time import perf_counter
-from typing import Annotated, Callable, List, Literal, Optional, cast, Union
+from typing import TYPE_CHECKING, Annotated, Callable, List, Literal, Optional, cast, Union
 from zipfile import ZipFile
 import humanize
 from discord.ui import Button, View, button
@@ -19,8 +19,8 @@ import random
 from datetime import datetime, timedelta, timezone
 import secrets
 
-from main import Pride
 from core.context import Context
+from core.cooldowns import cooldown
 from utils.conversions import (
     Duration,
     PartialAttachment,
@@ -32,7 +32,10 @@ from utils.conversions import (
 )
 
 from core import FlagConverter
-from .classes import ModConfig, Mod, ClearMod
+from .classes import BulkBan, ModConfig, Mod, ClearMod
+from . import purge as filters
+from .purge import Purge
+from .lockdown import Lockdown
 from discord import (
     AuditLogAction, AuditLogEntry, Color, Embed, Emoji, File, Guild,
     HTTPException, Member, Message, NotFound, NotificationLevel,
@@ -43,7 +46,7 @@ from discord.abc import GuildChannel
 from discord.ext.commands import (
     hybrid_command, hybrid_group, BadArgument, BucketType,
     Cog, CommandError, Greedy, MaxConcurrency, Range,
-    check, command, cooldown, group, has_permissions,
+    check, command, group, has_permissions,
     max_concurrency, parameter, flag
 )
 from discord.utils import MISSING, format_dt, get, utcnow
@@ -53,6 +56,7 @@ from xxhash import xxh64_hexdigest
 
 from opentelemetry import trace
 from prometheus_client import Counter, Histogram, REGISTRY
+from utils.metrics import budgeted
 
 from utils.formatter import codeblock, human_join, plural
 from managers.paginator import Paginator
@@ -60,10 +64,14 @@ from utils.conversions.script import Script
 from managers.paginator import Paginator
 from managers.patches.permissions import donator
 
-_mod_actions: Optional[Counter] = None
-_mod_action_duration: Optional[Histogram] = None
+if TYPE_CHECKING:
+    from core.bot import Pride
+
+
 _channel_metrics: Optional[Counter] = None
 _role_metrics: Optional[Counter] = None
+_command_duration: Optional[Histogram] = None
+_purge_metrics: Optional[Counter] = None
 
 def unregister_if_exists(*metric_names):
     for name in metric_names:
@@ -88,32 +96,6 @@ def unregister_if_exists(*metric_names):
                 except:
                     pass
 
-def get_mod_actions() -> Counter:
-    global _mod_actions
-    if _mod_actions is None:
-        unregister_if_exists(
-            'moderation_actions',
-            'moderation_actions_total',
-            'moderation_actions_created'
-        )
-        _mod_actions = Counter(
-            'moderation_actions_total',
-            'Number of moderation actions performed',
-            ['action', 'guild_id']
-        )
-    return _mod_actions
-
-def get_mod_action_duration() -> Histogram:
-    global _mod_action_duration
-    if _mod_action_duration is None:
-        unregister_if_exists('moderation_action_duration_seconds')
-        _mod_action_duration = Histogram(
-            'moderation_action_duration_seconds',
-            'Time spent processing moderation actions',
-            ['action']
-        )
-    return _mod_action_duration
-
 def get_channel_metrics() -> Counter:
     global _channel_metrics
     if _channel_metrics is None:
@@ -144,16 +126,43 @@ def get_role_metrics() -> Counter:
         )
     return _role_metrics
 
-MOD_ACTIONS = get_mod_actions()
-MOD_ACTION_DURATION = get_mod_action_duration()
-CHANNEL_METRICS = get_channel_metrics()
-ROLE_METRICS = get_role_metrics()
+def get_command_duration() -> Histogram:
+    global _command_duration
+    if _command_duration is None:
+        unregister_if_exists('moderation_command_duration_seconds')
+        _command_duration = Histogram(
+            'moderation_command_duration_seconds',
+            'Time spent running moderation commands',
+            ['command']
+        )
+    return _command_duration
+
+def get_purge_metrics() -> Counter:
+    global _purge_metrics
+    if _purge_metrics is None:
+        unregister_if_exists(
+            'moderation_purged_messages',
+            'moderation_purged_messages_total',
+            'moderation_purged_messages_created'
+        )
+        _purge_metrics = Counter(
+            'moderation_purged_messages_total',
+            'Number of messages removed by purge commands',
+            ['purge_type', 'guild_id']
+        )
+    return _purge_metrics
+
+CHANNEL_METRICS = budgeted(get_channel_metrics())
+ROLE_METRICS = budgeted(get_role_metrics())
+COMMAND_DURATION = get_command_duration()
+PURGE_METRICS = budgeted(get_purge_metrics())
 
 from utils.formatter import codeblock, human_join, plural
 from managers.paginator import Paginator
 from utils.conversions.script import Script
 from managers.paginator import Paginator
 from managers.patches.permissions import donator
+from utils.tools import quietly_delete
 
 log = getLogger("evict/mod")
 MASS_ROLE_CONCURRENCY = MaxConcurrency(1, per=BucketType.guild, wait=False)
@@ -222,10 +231,19 @@ class ModStatsView(View):
             await interaction.response.send_message(embed=details_embed)
 
 class Moderation(Cog):
-    def __init__(self, bot: Pride):
+    def __init__(self, bot: "Pride"):
         self.bot = bot
         self.description = "Moderation commands to make things easier."
 
+    async def cog_load(self) -> None:
+        self.bot.loop.create_task(self.resume_lockdowns())
+        return await super().cog_load()
+
+    async def resume_lockdowns(self) -> None:
+        """Finish server lockdowns interrupted by a restart."""
+        await self.bot.wait_until_ready()
+        await Lockdown.resume(self.bot)
+
     @property
     def actions(self) -> dict[str, str]:
         return {
@@ -329,6 +347,12 @@ class Moderation(Cog):
                 await guild.edit(**{attr: new_channel})  # type: ignore
                 reconfigured.append(name)
 
+        features = {
+            "logging": "logging",
+            "gallery": "gallery",
+            "sticky_message": "sticky",
+            "level.notification": "level",
+        }
         for table in (
             "logging",
             "gallery",
@@ -372,26 +396,21 @@ class Moderation(Cog):
                     .replace("Feeds Twitter", "Twitter Notifications")
                 )
                 reconfigured.append(pretty_name)
+                if feature := features.get(table_name):
+                    await self.bot.features.invalidate(feature)
 
-        return reconfigured
+                if table_name == "commands.disabled" and (
+                    config := self.bot.get_cog("Config")
+                ):
+                    await config.restrictions.reload(guild.id)  # type: ignore
 
-    def restore_key(self, guild: Guild, member: Member) -> str:
-        """
-        Generate a Redis key for role restoration.
-        """
-        return xxh64_hexdigest(f"roles:{guild.id}:{member.id}")
+        return reconfigured
 
     def forcenick_key(self, guild: Guild, member: Member) -> str:
         """
         Generate a Redis key for forced nicknames.
         """
         return xxh64_hexdigest(f"forcenick:{guild.id}:{member.id}")
-    
-    def restore_key(self, guild: Guild, member: Member) -> str:
-        """
-        Generate a Redis key for role restoration.
-        """
-        return f"restore:{guild.id}:{member.id}"
 
     @Cog.listener()
     async def on_member_remove(self, member: Member):
@@ -403,98 +422,18 @@ class Moderation(Cog):
 
         role_ids = [r.id for r in member.roles if r.is_assignable()]
         if role_ids:
-            key = self.restore_key(member.guild, member)
-            await self.bot.redis.set(key, role_ids, ex=3600)
-
-    @Cog.listener("on_member_join")
-    async def restore_roles(self, member: Member):
-        """
-        Restore a member's previous roles.
-        """
-        key = self.restore_key(member.guild, member)
-        role_ids = cast(
-            Optional[List[int]],
-            await self.bot.redis.get(key),
-        )
-        if not role_ids:
-            return
-
-        roles = [
-            role
-            for role_id in role_ids
-            if (role := member.guild.get_role(role_id)) is not None
-            and role.is_assignable()
-            and role not in member.roles
-        ]
-        if not roles:
-            return
-
-        record = await self.bot.db.fetchrow(
-            """
-            SELECT
-                reassign_roles,
-                reassign_ignore_ids
-            FROM settings
-            WHERE guild_id = $1
-            """,
-            member.guild.id,
-        )
-        if not record or not record["reassign_roles"]:
-            return
-
-        roles = [role for role in roles if role.id not in record["reassign_ignore_ids"]]
-        if not roles:
-            return
+            self.bot.role_snapshots.save(member.guild.id, member.id, role_ids)
 
-        await self.bot.redis.delete(key)
-        with suppress(HTTPException):
-            await member.add_roles(*roles, reason="Restoration of previous roles")
-            log.info(
-                "Restored %s for %s (%s) in %s (%s).",
-                format(plural(len(roles)), "role"),
-                member,
-                member.id,
-                member.guild,
-                member.guild.id,
-            )
-
-    @Cog.listener("on_member_join")
-    async def hardban_event(self, member: Member):
-        """
-        Check if a member is hard banned and ban them if they are.
-        """
-        hardban = await self.bot.db.fetchrow(
-            """
-            SELECT * 
-            FROM hardban 
-            WHERE guild_id = $1 
-            AND user_id = $2
-            """,
-            member.guild.id,
-            member.id,
-        )
-        if not hardban:
-            return
-
-        with suppress(HTTPException):
-            await member.ban(reason="User is hard banned")
+    @Cog.listener("on_guild_remove")
+    async def fake_permissions_guild_remove(self, guild: Guild) -> None:
+        self.bot.fake_permissions.discard(guild.id)
 
     @Cog.listener()
     async def on_member_unban(self, guild: Guild, user: User):
         """
         Check if a member is hard banned and ban them if they are.
         """
-        hardban = await self.bot.db.fetchrow(
-            """
-            SELECT * 
-            FROM hardban 
-            WHERE guild_id = $1 
-            AND user_id = $2
-            """,
-            guild.id,
-            user.id,
-        )
-        if not hardban:
+        if not await self.bot.hardbans.contains(guild.id, user.id):
             return
 
         with suppress(HTTPException):
@@ -505,9 +444,10 @@ class Moderation(Cog):
         """
         Force a user to have a specific nickname.
         """
-        key = self.forcenick_key(before.guild, before)
-        log.debug("key gen: %s", key)
+        if not await self.bot.forcenicks.contains(before.guild.id, before.id):
+            return
 
+        key = self.forcenick_key(before.guild, before)
         nickname = await self.bot.db.fetchval(
             """
             SELECT nickname FROM forcenick 
@@ -534,6 +474,7 @@ class Moderation(Cog):
                 before.guild.id,
                 before.id,
             )
+            await self.bot.forcenicks.invalidate(before.guild.id)
             return
 
         with suppress(HTTPException):
@@ -562,8 +503,11 @@ class Moderation(Cog):
         elif not isinstance(entry.target, Member):
             return
 
+        if not await self.bot.forcenicks.contains(entry.guild.id, entry.target.id):
+            return
+
         if hasattr(entry.after, "nick"):
-            removed = await self.bot.db.execute(
+            await self.bot.db.execute(
                 """
                 DELETE FROM forcenick 
                 WHERE guild_id = $1 
@@ -572,17 +516,17 @@ class Moderation(Cog):
                 entry.guild.id,
                 entry.target.id,
             )
+            await self.bot.forcenicks.invalidate(entry.guild.id)
 
     async def do_removal(
         self,
         ctx: Context,
         amount: int,
-        predicate: Callable[[Message], bool] = lambda _: True,
-        *,
+        *predicates: Callable[[Message], bool],
         before: Optional[Message] = None,
         after: Optional[Message] = None,
     ) -> List[Message]:
-        """A helper function to do bulk message removal."""
+        """Remove the messages among the last `amount` matching every predicate."""
         with self.bot.tracer.start_span("do_removal") as span:
             span.set_attribute("amount", amount)
             span.set_attribute("channel_id", str(ctx.channel.id))
@@ -590,77 +534,33 @@ class Moderation(Cog):
             span.set_attribute("has_before", bool(before))
             span.set_attribute("has_after", bool(after))
 
-            try:
-                if not ctx.channel.permissions_for(ctx.guild.me).manage_messages:
-                    span.set_attribute("error", "missing_permissions")
-                    raise CommandError("I don't have permission to delete messages!")
-
-                if not before:
-                    before = ctx.message
+            if not ctx.channel.permissions_for(ctx.guild.me).manage_messages:
+                span.set_attribute("error", "missing_permissions")
+                raise CommandError("I don't have permission to delete messages!")
 
-                def check_message(message: Message) -> bool:
-                    if message.created_at < (utcnow() - timedelta(weeks=2)):
-                        return False
-                    elif message.pinned:
-                        return False
-                    return predicate(message)
+            with COMMAND_DURATION.labels(command="message_removal").time():
+                await quietly_delete(ctx.message)
 
-                with COMMAND_DURATION.labels(command="message_removal").time():
-                    await quietly_delete(ctx.message)
-                    
-                    BATCH_SIZE = 100
-                    all_messages = []
-                    remaining = amount
-                    
-                    while remaining > 0:
-                        batch_amount = min(remaining, BATCH_SIZE)
-                        messages = await ctx.channel.history(
-                            limit=batch_amount,
-                            before=before,
-                            after=after
-                        ).flatten()
-                        
-                        if not messages:
-                            break
-                            
-                        valid_messages = await self.bot.loop.run_in_executor(
-                            None,
-                            self.bot.process_pool.apply,
-                            lambda msgs: [msg for msg in msgs if check_message(msg)],
-                            (messages,)
-                        )
-                        
-                        all_messages.extend(valid_messages)
-                        remaining -= len(messages)
-                        before = messages[-1]
-
-                    if not all_messages:
-                        span.set_attribute("error", "no_messages_found")
-                        raise CommandError("No messages were found, try a larger search?")
-
-                    deleted = 0
-                    for i in range(0, len(all_messages), 100):
-                        batch = all_messages[i:i + 100]
-                        try:
-                            await ctx.channel.delete_messages(batch)
-                            deleted += len(batch)
-                        except discord.HTTPException as e:
-                            span.set_attribute("error", str(e))
-                            span.record_exception(e)
-                            continue
-
-                    PURGE_METRICS.labels(
-                        purge_type="bulk_delete",
-                        guild_id=str(ctx.guild.id)
-                    ).inc(deleted)
-                    
-                    span.set_attribute("messages_deleted", deleted)
-                    return all_messages
+                result = await Purge(
+                    self.bot,
+                    ctx.channel,
+                    amount,
+                    *predicates,
+                    before=before or ctx.message,
+                    after=after,
+                ).run()
+
+            span.set_attribute("messages_scanned", result.scanned)
+            span.set_attribute("messages_deleted", len(result.deleted))
+            if not result.deleted and not result.failed:
+                span.set_attribute("error", "no_messages_found")
+                raise CommandError("No messages were found, try a larger search?")
 
-            except Exception as e:
-                span.record_exception(e)
-                span.set_status(trace.Status(trace.StatusCode.ERROR))
-                raise
+            PURGE_METRICS.labels(
+                purge_type="bulk_delete",
+                guild_id=str(ctx.guild.id)
+            ).inc(len(result.deleted))
+            return result.deleted
 
     @hybrid_command(aliases=["bc"], examples="100")
     @has_permissions(manage_messages=True)
@@ -720,8 +620,7 @@ class Moderation(Cog):
             span.set_attribute("channel_id", str(ctx.channel.id))
             
             with COMMAND_DURATION.labels(command="purge").time():
-                await self.do_removal(ctx, amount, 
-                    lambda message: message.author == user if user else True)
+                await self.do_removal(ctx, amount, *([filters.author(user)] if user else []))
                 PURGE_METRICS.labels(
                     purge_type="user", 
                     guild_id=str(ctx.guild.id)
@@ -747,7 +646,7 @@ class Moderation(Cog):
         with self.bot.tracer.start_span("purge_embeds") as span:
             span.set_attribute("amount", amount)
             with COMMAND_DURATION.labels(command="purge_embeds").time():
-                await self.do_removal(ctx, amount, lambda message: bool(message.embeds))
+                await self.do_removal(ctx, amount, filters.embeds())
                 PURGE_METRICS.labels(
                     purge_type="embeds",
                     guild_id=str(ctx.guild.id)
@@ -773,7 +672,7 @@ class Moderation(Cog):
         with self.bot.tracer.start_span("purge_files") as span:
             span.set_attribute("amount", amount)
             with COMMAND_DURATION.labels(command="purge_files").time():
-                await self.do_removal(ctx, amount, lambda message: bool(message.attachments))
+                await self.do_removal(ctx, amount, filters.attachments())
                 PURGE_METRICS.labels(
                     purge_type="files",
                     guild_id=str(ctx.guild.id)
@@ -921,12 +820,7 @@ class Moderation(Cog):
 
         custom_emoji = re.compile(r"<a?:[a-zA-Z0-9\_]+:([0-9]+)>")
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: bool(message.content)
-            and bool(custom_emoji.search(message.content)),
-        )
+        await self.do_removal(ctx, amount, filters.matches(custom_emoji))
 
     @purge.command(
         name="invites",
@@ -953,12 +847,7 @@ class Moderation(Cog):
             r"(?:https?://)?discord(?:\.gg|app\.com/invite)/[a-zA-Z0-9]+/?"
         )
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: bool(message.content)
-            and bool(invite_link.search(message.content)),
-        )
+        await self.do_removal(ctx, amount, filters.matches(invite_link))
 
     EMOJI_PATTERN = re.compile(r"<a?:[a-zA-Z0-9\_]+:([0-9]+)>")
     INVITE_PATTERN = re.compile(r"(?:https?://)?discord(?:\.gg|app\.com/invite)/[a-zA-Z0-9]+/?")
@@ -975,10 +864,7 @@ class Moderation(Cog):
         with self.bot.tracer.start_span("purge_links") as span:
             span.set_attribute("amount", amount)
             with COMMAND_DURATION.labels(command="purge_links").time():
-                await self.do_removal(
-                    ctx, amount,
-                    lambda message: bool(message.content) and bool(self.URL_PATTERN.search(message.content))
-                )
+                await self.do_removal(ctx, amount, filters.matches(self.URL_PATTERN))
                 PURGE_METRICS.labels(
                     purge_type="links",
                     guild_id=str(ctx.guild.id)
@@ -998,13 +884,8 @@ class Moderation(Cog):
             span.set_attribute("amount", amount)
             span.set_attribute("substring_length", len(substring))
             
-            pattern = re.compile(re.escape(substring.lower()))
-            
             with COMMAND_DURATION.labels(command="purge_contains").time():
-                await self.do_removal(
-                    ctx, amount,
-                    lambda message: bool(message.content) and bool(pattern.search(message.content.lower()))
-                )
+                await self.do_removal(ctx, amount, filters.contains(substring))
                 PURGE_METRICS.labels(
                     purge_type="contains",
                     guild_id=str(ctx.guild.id)
@@ -1038,12 +919,7 @@ class Moderation(Cog):
         The substring must be at least 3 characters long.
         """
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: bool(message.content)
-            and message.content.lower().startswith(substring.lower()),
-        )
+        await self.do_removal(ctx, amount, filters.startswith(substring))
 
     @purge.command(
         name="endswith",
@@ -1073,12 +949,7 @@ class Moderation(Cog):
         The substring must be at least 3 characters long.
         """
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: bool(message.content)
-            and message.content.lower().endswith(substring.lower()),
-        )
+        await self.do_removal(ctx, amount, filters.endswith(substring))
 
     @purge.command(
         name="humans",
@@ -1098,11 +969,7 @@ class Moderation(Cog):
         Remove messages which are not from a bot.
         """
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: not message.author.bot,
-        )
+        await self.do_removal(ctx, amount, filters.humans())
 
     @purge.command(
         name="bots",
@@ -1122,11 +989,7 @@ class Moderation(Cog):
         Remove messages which are from a bot.
         """
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: message.author.bot,
-        )
+        await self.do_removal(ctx, amount, filters.bots())
 
     @purge.command(
         name="webhooks",
@@ -1146,11 +1009,7 @@ class Moderation(Cog):
         Remove messages which are from a webhook.
         """
 
-        await self.do_removal(
-            ctx,
-            amount,
-            lambda message: bool(message.webhook_id),
-        )
+        await self.do_removal(ctx, amount, filters.webhooks())
 
     @purge.command(name="before", example="1320937696968970281")
     @has_permissions(manage_messages=True)
@@ -1248,7 +1107,7 @@ class Moderation(Cog):
         Remove messages not sent by a member.
         """
 
-        await self.do_removal(ctx, amount, lambda message: message.author != member)
+        await self.do_removal(ctx, amount, filters.not_author(member))
 
     @purge.command(
         name="reactions",
@@ -1330,11 +1189,8 @@ class Moderation(Cog):
                         for member in ctx.guild.members
                     }
                     
-                    filtered_members = await self.bot.loop.run_in_executor(
-                        None,
-                        self.bot.process_pool.apply,
-                        filter_members,
-                        (ctx.guild.members, [member_role_map[m.id] for m in ctx.guild.members])
+                    filtered_members = filter_members(
+                        ctx.guild.members, [member_role_map[m.id] for m in ctx.guild.members]
                     )
 
                     members = []
@@ -1366,6 +1222,25 @@ class Moderation(Cog):
                         ),
                     )
 
+                    async def apply_role(member: Member) -> None:
+                        await ctx.bot.rest.pace(
+                            "PUT" if action == "add" else "DELETE",
+                            "/guilds/{guild_id}/members/{id}/roles/{id}",
+                            ctx.guild.id,
+                        )
+                        if action == "add":
+                            await member.add_roles(
+                                role,
+                                reason=f"Mass role {action} by {ctx.author}",
+                                atomic=True
+                            )
+                        else:
+                            await member.remove_roles(
+                                role,
+                                reason=f"Mass role {action} by {ctx.author}",
+                                atomic=True
+                            )
+
                     failed: List[Member] = []
                     try:
                         async with ctx.typing():
@@ -1375,18 +1250,7 @@ class Moderation(Cog):
                                 tasks = []
                                 
                                 for member in batch:
-                                    if action == "add":
-                                        tasks.append(member.add_roles(
-                                            role,
-                                            reason=f"Mass role {action} by {ctx.author}",
-                                            atomic=True
-                                        ))
-                                    else:
-                                        tasks.append(member.remove_roles(
-                                            role,
-                                            reason=f"Mass role {action} by {ctx.author}",
-                                            atomic=True
-                                        ))
+                                    tasks.append(apply_role(member))
 
                                 results = await asyncio.gather(*tasks, return_exceptions=True)
                                 
@@ -1554,8 +1418,10 @@ class Moderation(Cog):
             
             try:
                 with ROLE_ACTION_DURATION.labels(action="restore").time():
-                    key = self.restore_key(ctx.guild, member)
-                    role_ids = cast(Optional[List[int]], await self.bot.redis.getdel(key))
+                    role_ids = (
+                        await self.bot.role_snapshots.pop(ctx.guild.id, member.id)
+                        or await self.bot.stripped_roles.pop(ctx.guild.id, member.id)
+                    )
                     
                     if not role_ids:
                         return await ctx.warn(
@@ -1577,12 +1443,7 @@ class Moderation(Cog):
                     guild_roles = {r.id: r for r in ctx.guild.roles}
                     member_roles = {r.id for r in member.roles}
                     
-                    valid_role_ids = await self.bot.loop.run_in_executor(
-                        None,
-                        self.bot.process_pool.apply,
-                        validate_roles,
-                        (role_ids, guild_roles, member_roles)
-                    )
+                    valid_role_ids = validate_roles(role_ids, guild_roles, member_roles)
 
                     roles = [guild_roles[role_id] for role_id in valid_role_ids]
                     roles = [r for r in roles if await StrictRole().check(ctx, r)]
@@ -2151,13 +2012,9 @@ class Moderation(Cog):
                 reason=f"{ctx.author.name} / {reason}",
             )
         else:
-            overwrite = channel.overwrites_for(lock_role)
-            overwrite.send_messages = False
-            await channel.set_permissions(
-                lock_role,
-                overwrite=overwrite,
-                reason=f"{ctx.author.name} / {reason}",
-            )
+            await Lockdown(
+                self.bot, ctx.guild, lock_role, "lock", f"{ctx.author.name} / {reason}", ctx.author.id
+            ).lock_channel(channel)
 
         return await ctx.approve(
             await ctx.bot.get_text(
@@ -2190,37 +2047,34 @@ class Moderation(Cog):
                     if channel.overwrites_for(ctx.settings.lock_role).send_messages is not False
                     and channel not in ctx.settings.lock_ignore
                 ]
-                
-                batch_size = 10
-                for i in range(0, len(channels_to_lock), batch_size):
-                    batch = channels_to_lock[i:i + batch_size]
-                    tasks = []
-                    
-                    for channel in batch:
-                        overwrite = channel.overwrites_for(ctx.settings.lock_role)
-                        overwrite.send_messages = False
-                        tasks.append(channel.set_permissions(
-                            ctx.settings.lock_role,
-                            overwrite=overwrite,
-                            reason=f"{ctx.author.name} / {reason} (SERVER LOCKDOWN)",
-                        ))
-                    
-                    await asyncio.gather(*tasks, return_exceptions=True)
+
+                start = perf_counter()
+                lockdown = Lockdown(
+                    self.bot,
+                    ctx.guild,
+                    ctx.settings.lock_role,
+                    "lock",
+                    f"{ctx.author.name} / {reason} (SERVER LOCKDOWN)",
+                    ctx.author.id,
+                    initial_message,
+                    ctx,
+                )
+                locked = await lockdown.run(channels_to_lock)
 
                 duration = perf_counter() - start
                 CHANNEL_METRICS.labels(
                     action="lockdown_all",
                     guild_id=str(ctx.guild.id)
-                ).inc(len(channels_to_lock))
+                ).inc(locked)
                 
-                span.set_attribute("channels_locked", len(channels_to_lock))
+                span.set_attribute("channels_locked", locked)
                 span.set_attribute("duration_seconds", duration)
                 
                 return await ctx.approve(
                     await ctx.bot.get_text(
                         "moderation.lockdown.all.SUCCESS",
                         ctx,
-                        count=len(channels_to_lock),
+                        count=locked,
                         duration=duration
                     ),
                     patch=initial_message,
@@ -2239,7 +2093,7 @@ class Moderation(Cog):
             span.set_attribute("role_id", str(role.id))
             
             try:
-                with CHANNEL_METRICS.labels(action="lockdown_role_set").time():
+                with COMMAND_DURATION.labels(command="lockdown_role_set").time():
                     await ctx.settings.update(lock_role_id=role.id)
                     return await ctx.approve(
                         await ctx.bot.get_text(
@@ -2270,7 +2124,7 @@ class Moderation(Cog):
                         )
                     )
 
-                with CHANNEL_METRICS.labels(action="lockdown_ignore_add").time():
+                with COMMAND_DURATION.labels(command="lockdown_ignore_add").time():
                     ctx.settings.lock_ignore_ids.append(channel.id)
                     await ctx.settings.update()
                     return await ctx.approve(
@@ -2362,12 +2216,7 @@ class Moderation(Cog):
                 await ctx.bot.get_text("moderation.unlockdown.CHANNEL_TYPE", ctx)
             )
 
-        if (
-            isinstance(channel, Thread)
-            and not channel.locked
-            or isinstance(channel, TextChannel)
-            and channel.overwrites_for(ctx.settings.lock_role).send_messages is True
-        ):
+        if isinstance(channel, Thread) and not channel.locked:
             return await ctx.warn(
                 await ctx.bot.get_text(
                     "moderation.unlockdown.ALREADY_UNLOCKED",
@@ -2381,13 +2230,20 @@ class Moderation(Cog):
                 locked=False,
                 reason=f"{ctx.author.name} / {reason}",
             )
-        else:
-            overwrite = channel.overwrites_for(ctx.settings.lock_role)
-            overwrite.send_messages = True
-            await channel.set_permissions(
-                ctx.settings.lock_role,
-                overwrite=overwrite,
-                reason=f"{ctx.author.name} / {reason}",
+        elif not await Lockdown(
+            self.bot,
+            ctx.guild,
+            ctx.settings.lock_role,
+            "unlock",
+            f"{ctx.author.name} / {reason}",
+            ctx.author.id,
+        ).unlock_channel(channel, force=True):
+            return await ctx.warn(
+                await ctx.bot.get_text(
+                    "moderation.unlockdown.ALREADY_UNLOCKED",
+                    ctx,
+                    channel=channel.mention
+                )
             )
 
         return await ctx.approve(
@@ -2416,42 +2272,39 @@ class Moderation(Cog):
                     await ctx.bot.get_text("moderation.unlockdown.all.PROGRESS", ctx)
                 )
 
+                start = perf_counter()
+                lockdown = Lockdown(
+                    self.bot,
+                    ctx.guild,
+                    ctx.settings.lock_role,
+                    "unlock",
+                    f"{ctx.author.name} / {reason} (SERVER UNLOCKDOWN)",
+                    ctx.author.id,
+                    initial_message,
+                    ctx,
+                )
+                snapshotted = set(await lockdown.snapshotted())
                 channels_to_unlock = [
                     channel for channel in ctx.guild.text_channels
-                    if channel.overwrites_for(ctx.settings.lock_role).send_messages is not True
+                    if channel.id in snapshotted
                     and channel not in ctx.settings.lock_ignore
                 ]
-                
-                batch_size = 10
-                for i in range(0, len(channels_to_unlock), batch_size):
-                    batch = channels_to_unlock[i:i + batch_size]
-                    tasks = []
-                    
-                    for channel in batch:
-                        overwrite = channel.overwrites_for(ctx.settings.lock_role)
-                        overwrite.send_messages = True
-                        tasks.append(channel.set_permissions(
-                            ctx.settings.lock_role,
-                            overwrite=overwrite,
-                            reason=f"{ctx.author.name} / {reason} (SERVER UNLOCKDOWN)",
-                        ))
-                    
-                    await asyncio.gather(*tasks, return_exceptions=True)
+                unlocked = await lockdown.run(channels_to_unlock)
 
                 duration = perf_counter() - start
                 CHANNEL_METRICS.labels(
                     action="unlockdown_all",
                     guild_id=str(ctx.guild.id)
-                ).inc(len(channels_to_unlock))
+                ).inc(unlocked)
                 
-                span.set_attribute("channels_unlocked", len(channels_to_unlock))
+                span.set_attribute("channels_unlocked", unlocked)
                 span.set_attribute("duration_seconds", duration)
                 
                 return await ctx.approve(
                     await ctx.bot.get_text(
                         "moderation.unlockdown.all.SUCCESS",
                         ctx,
-                        count=len(channels_to_unlock),
+                        count=unlocked,
                         duration=duration
                     ),
                     patch=initial_message,
@@ -2477,7 +2330,7 @@ class Moderation(Cog):
                 span.set_attribute("channel_id", str(channel.id))
                 span.set_attribute("target_id", str(target.id))
 
-                with CHANNEL_METRICS.labels(action="hide").time():
+                with COMMAND_DURATION.labels(command="hide").time():
                     if channel.overwrites_for(target).read_messages is False:
                         return await ctx.warn(
                             f"{channel.mention} is already hidden for {target.mention}!"
@@ -2568,7 +2421,7 @@ class Moderation(Cog):
                 span.set_attribute("channel_id", str(channel.id))
                 span.set_attribute("delay_seconds", delay.seconds)
 
-                with CHANNEL_METRICS.labels(action="slowmode_set").time():
+                with COMMAND_DURATION.labels(command="slowmode_set").time():
                     if channel.slowmode_delay == delay.seconds:
                         return await ctx.warn(
                             f"{channel.mention} already has a slowmode of **{precisedelta(delay)}**!"
@@ -2894,12 +2747,7 @@ class Moderation(Cog):
                     for member in ctx.guild.members
                 ]
 
-                sorted_members = await self.bot.loop.run_in_executor(
-                    None,
-                    self.bot.process_pool.apply,
-                    sort_members,
-                    (members_data,)
-                )
+                sorted_members = sort_members(members_data)
 
                 members = [ctx.guild.get_member(member_id) for member_id, _, _ in sorted_members]
                 
@@ -3070,6 +2918,7 @@ class Moderation(Cog):
                 ctx.guild.id,
                 user.id,
             )
+            await self.bot.hardbans.invalidate(ctx.guild.id)
             with suppress(NotFound):
                 await ctx.guild.unban(user, reason=f"Hard ban removed by {ctx.author} ({ctx.author.id})")
 
@@ -3087,6 +2936,7 @@ class Moderation(Cog):
             ctx.guild.id,
             user.id,
         )
+        await self.bot.hardbans.invalidate(ctx.guild.id)
         await ModConfig.sendlogs(self.bot, "hardban", ctx.author, user, reason)
         await ctx.guild.ban(user, delete_message_days=history, reason=f"{ctx.author} / {reason}")
 
@@ -3166,27 +3016,57 @@ class Moderation(Cog):
         elif len(users) > 5:
             await ctx.prompt(f"Are you sure you want to **ban** `{len(users)}` users?")
 
+        for user in users:
+            if isinstance(user, Member):
+                await TouchableMember().check(ctx, user)
+
+        users = list({user.id: user for user in users}.values())
         if "--hardban" in reason:
             reason = reason.replace("--hardban", "").strip()
-            key = self.hardban_key(ctx.guild)
-            await self.bot.redis.sadd(key, *[str(user.id) for user in users])
+            await self.bot.db.executemany(
+                """
+                INSERT INTO hardban (guild_id, user_id)
+                SELECT $1, $2
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM hardban
+                    WHERE guild_id = $1 AND user_id = $2
+                )
+                """,
+                [(ctx.guild.id, user.id) for user in users],
+            )
+            await self.bot.hardbans.invalidate(ctx.guild.id)
 
         async with ctx.typing():
-            for user in users:
-                if isinstance(user, Member):
-                    await TouchableMember().check(ctx, user)
-
-                await ctx.guild.ban(
-                    user,
-                    delete_message_days=history or 0,
-                    reason=f"{ctx.author} / {reason} (MASS BAN)",
-                )
+            engine = BulkBan(
+                self.bot,
+                ctx.guild,
+                reason=f"{ctx.author} / {reason} (MASS BAN)",
+                delete_message_days=history or 0,
+            )
+            await engine.run(users)
 
+        banned = set(engine.banned)
         try:
-            await ModConfig.sendlogs(self.bot, "massban", ctx.author, users, reason)  # type: ignore
-        except:
-            pass
-        return await ctx.check()
+            await ModConfig.sendbulklogs(
+                self.bot,
+                "massban",
+                ctx.author,
+                [user for user in users if user.id in banned],
+                reason,
+            )
+        except Exception as e:
+            log.error(f"Failed to log massban in {ctx.guild.id}: {e}")
+
+        if not (failed := engine.failed):
+            return await ctx.check()
+
+        names = {user.id: str(user) for user in users}
+        lines = [f"**{names[user_id]}** (`{user_id}`): {error}" for user_id, error in failed.items()]
+        return await ctx.warn(
+            f"Banned `{len(banned)}` of `{len(users)}` users, failed to ban:\n"
+            + "\n".join(lines[:10])
+            + (f"\n*and {len(lines) - 10} more*" if len(lines) > 10 else "")
+        )
 
     @command(
         example="@x bot owner",
@@ -3214,6 +3094,7 @@ class Moderation(Cog):
             "ON CONFLICT (guild_id, user_id) DO UPDATE SET nickname = $3",
             ctx.guild.id, member.id, nickname,
         )
+        await self.bot.forcenicks.invalidate(ctx.guild.id)
 
         await member.edit(nick=nickname, reason=f"{ctx.author} ({ctx.author.id})")
         try:
@@ -3430,17 +3311,10 @@ class Moderation(Cog):
                     
                     hardban_ids = {record['user_id'] for record in hardban_records}
                     
-                    def filter_users(entries, hardban_set):
-                        import dask.bag as db
-                        entries_bag = db.from_sequence(entries)
-                        return entries_bag.filter(lambda e: e.user.id not in hardban_set).compute()
-                    
-                    users = await self.bot.loop.run_in_executor(
-                        None,
-                        filter_users,
-                        ban_entries,
-                        hardban_ids
-                    )
+                    users = [
+                        entry for entry in ban_entries
+                        if entry.user.id not in hardban_ids
+                    ]
 
                     if not users:
                         return await ctx.warn(
@@ -3539,18 +3413,7 @@ class Moderation(Cog):
         if await self.is_immune(ctx, member):
             return
         
-        forcenick = await self.bot.db.fetchval(
-            """
-            SELECT EXISTS(
-                SELECT 1 FROM forcenick 
-                WHERE guild_id = $1 
-                AND user_id = $2
-            )
-            """,
-            ctx.guild.id,
-            member.id,
-        )
-        if forcenick:
+        if await self.bot.forcenicks.contains(ctx.guild.id, member.id):
             return await ctx.warn(
                 f"{member.mention} has a forced nickname!",
                 f"Use `{ctx.prefix}nickname remove {member}` to reset it",
@@ -3590,6 +3453,7 @@ class Moderation(Cog):
             "DELETE FROM forcenick WHERE guild_id = $1 AND user_id = $2",
             ctx.guild.id, member.id
         )
+        await self.bot.forcenicks.invalidate(ctx.guild.id)
 
         await member.edit(nick=None, reason=f"{ctx.author} ({ctx.author.id})")
         try:
@@ -3626,6 +3490,7 @@ class Moderation(Cog):
             "ON CONFLICT (guild_id, user_id) DO UPDATE SET nickname = $3",
             ctx.guild.id, member.id, nickname
         )
+        await self.bot.forcenicks.invalidate(ctx.guild.id)
 
         await member.edit(nick=nickname, reason=f"{ctx.author} ({ctx.author.id})")
         try:
@@ -3655,6 +3520,7 @@ class Moderation(Cog):
             "DELETE FROM forcenick WHERE guild_id = $1 AND user_id = $2",
             ctx.guild.id, member.id
         )
+        await self.bot.forcenicks.invalidate(ctx.guild.id)
 
         await member.edit(nick=None, reason=f"{ctx.author} ({ctx.author.id})")
         try:
@@ -3825,26 +3691,11 @@ class Moderation(Cog):
         """Lift all timeouts."""
         with self.bot.tracer.start_span("untimeout_all") as span:
             try:
-                def filter_timed_out(members_data):
-                    import dask.bag as db
-                    members_bag = db.from_sequence(members_data)
-                    return members_bag.filter(lambda m: m[1]).compute()
-
-                members_data = [
-                    (member.id, member.is_timed_out())
-                    for member in ctx.guild.members
+                members = [
+                    member for member in ctx.guild.members
+                    if member.is_timed_out()
                 ]
 
-                filtered_data = await self.bot.loop.run_in_executor(
-                    None,
-                    filter_timed_out,
-                    members_data
-                )
-
-                members = [ctx.guild.get_member(member_id) 
-                          for member_id, _ in filtered_data 
-                          if ctx.guild.get_member(member_id)]
-
                 if not members:
                     return await ctx.warn("No members are currently timed out!")
 
@@ -5295,9 +5146,8 @@ class Moderation(Cog):
         if not roles_to_remove:
             return await ctx.warn(f"{user.mention} has no dangerous permissions to strip!")
 
-        key = self.restore_key(ctx.guild, user)
         role_ids = [r.id for r in roles_to_remove if r.is_assignable()]
-        await self.bot.redis.set(key, role_ids, ex=86400)
+        self.bot.stripped_roles.save(ctx.guild.id, user.id, role_ids)
 
         try:
             await user.remove_roles(*roles_to_remove, reason=f"Stripped by {ctx.author} ({ctx.author.id}): {reason}")
@@ -5803,6 +5653,7 @@ class Moderation(Cog):
                 json.dumps(permissions_list),
             )
 
+        await self.bot.fake_permissions.invalidate(ctx.guild.id)
         added_permissions_str = ", ".join(f"`{perm}`" for perm in permissions_list)
         return await ctx.approve(
             await ctx.bot.get_text(
@@ -5904,6 +5755,7 @@ class Moderation(Cog):
                 role.id,
             )
 
+        await self.bot.fake_permissions.invalidate(ctx.guild.id)
         removed_permissions_str = ", ".join(f"`{perm}`" for perm in removed_permissions)
         return await ctx.approve(
             await ctx.bot.get_text(
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from datetime import timedelta
+from logging import getLogger
+from typing import Any, Callable, List, Optional, Pattern, Sequence, Union
+
+import discord
+from discord import Message, TextChannel, Thread, VoiceChannel
+from discord.abc import Snowflake
+from discord.utils import utcnow
+
+log = getLogger("evict/mod")
+
+Predicate = Callable[[Message], bool]
+Purgeable = Union[TextChannel, Thread, VoiceChannel]
+
+BULK_DELETE_LIMIT = 100
+# Bulk delete rejects anything older than two weeks, keep a margin
+# for the time between fetching a page and deleting it.
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+
+
+def author(user: Snowflake) -> Predicate:
+    return lambda message: message.author.id == user.id
+
+
+def not_author(user: Snowflake) -> Predicate:
+    return lambda message: message.author.id != user.id
+
+
+def bots() -> Predicate:
+    return lambda message: message.author.bot
+
+
+def humans() -> Predicate:
+    return lambda message: not message.author.bot
+
+
+def webhooks() -> Predicate:
+    return lambda message: bool(message.webhook_id)
+
+
+def attachments() -> Predicate:
+    return lambda message: bool(message.attachments)
+
+
+def embeds() -> Predicate:
+    return lambda message: bool(message.embeds)
+
+
+def contains(substring: str) -> Predicate:
+    substring = substring.lower()
+    return lambda message: bool(message.content) and substring in message.content.lower()
+
+
+def startswith(substring: str) -> Predicate:
+    substring = substring.lower()
+    return lambda message: bool(message.content) and message.content.lower().startswith(substring)
+
+
+def endswith(substring: str) -> Predicate:
+    substring = substring.lower()
+    return lambda message: bool(message.content) and message.content.lower().endswith(substring)
+
+
+def matches(pattern: Union[str, Pattern[str]]) -> Predicate:
+    pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+    return lambda message: bool(message.content) and pattern.search(message.content) is not None
+
+
+class PurgeResult:
+    __slots__ = ("scanned", "deleted", "failed")
+
+    def __init__(self) -> None:
+        self.scanned = 0
+        self.deleted: List[Message] = []
+        self.failed = 0
+
+
+class Purge:
+    """
+    Streams a channel's history and deletes every message matching all predicates.
+
+    History is read page by page while the previous matches are being
+    deleted: matches are handed to a bulk-delete worker in batches of
+    100 through a short queue, so fetching and deleting overlap instead
+    of alternating. Messages too old for bulk delete go to a second
+    worker which deletes them one at a time, paced against the route's
+    rate limit budget. Pinned messages are never touched.
+    """
+
+    def __init__(
+        self,
+        bot,
+        channel: Purgeable,
+        limit: int,
+        *predicates: Predicate,
+        before: Optional[Snowflake] = None,
+        after: Optional[Snowflake] = None,
+        slow_path: bool = True,
+    ):
+        self.bot = bot
+        self.channel = channel
+        self.limit = limit
+        self.predicates = predicates
+        self.before = before
+        self.after = after
+        self.slow_path = slow_path
+        self.result = PurgeResult()
+
+    def where(self, *predicates: Predicate) -> Purge:
+        self.predicates += predicates
+        return self
+
+    def matches(self, message: Message) -> bool:
+        if message.pinned:
+            return False
+
+        return all(predicate(message) for predicate in self.predicates)
+
+    async def _bulk_worker(self, queue: asyncio.Queue) -> None:
+        while (batch := await queue.get()) is not None:
+            if len(batch) == 1:
+                # A lone message goes through the single delete route.
+                await self._delete_each(batch)
+                continue
+
+            await self.bot.rest.pace(
+                "POST", "/channels/{channel_id}/messages/bulk-delete", self.channel.id
+            )
+            try:
+                await self.channel.delete_messages(batch)
+            except discord.NotFound:
+                # Someone else removed part of the batch, retry the rest singly.
+                await self._delete_each(batch)
+            except discord.HTTPException as e:
+                log.warning(f"Bulk delete of {len(batch)} messages in {self.channel.id} failed: {e}")
+                self.result.failed += len(batch)
+            else:
+                self.result.deleted.extend(batch)
+
+    async def _delete_each(self, messages: Sequence[Message]) -> None:
+        for message in messages:
+            await self.bot.rest.pace(
+                "DELETE", "/channels/{channel_id}/messages/{id}", self.channel.id
+            )
+            try:
+                await message.delete()
+            except discord.NotFound:
+                continue
+            except discord.HTTPException:
+                self.result.failed += 1
+            else:
+                self.result.deleted.append(message)
+
+    async def _slow_worker(self, queue: asyncio.Queue) -> None:
+        while (message := await queue.get()) is not None:
+            await self._delete_each((message,))
+
+    async def _put(
+        self,
+        queue: asyncio.Queue,
+        item: Any,
+        consumer: asyncio.Task,
+        workers: List[asyncio.Task],
+    ) -> None:
+        """
+        Queue `item` for `consumer`, raising a worker's failure
+        or the consumer's early exit rather than waiting on it forever.
+        """
+
+        for worker in workers:
+            if worker.done():
+                worker.result()
+
+        if consumer.done():
+            raise RuntimeError("Purge worker exited before its queue was drained")
+
+        if not queue.full():
+            queue.put_nowait(item)
+            return
+
+        put = asyncio.ensure_future(queue.put(item))
+        waiting = {put, *(worker for worker in workers if not worker.done())}
+        try:
+            while True:
+                done, waiting = await asyncio.wait(
+                    waiting, return_when=asyncio.FIRST_COMPLETED
+                )
+                if put in done:
+                    return
+
+                for worker in done:
+                    worker.result()
+
+                if consumer in done:
+                    raise RuntimeError("Purge worker exited before its queue was drained")
+        finally:
+            put.cancel()
+
+    async def run(self) -> PurgeResult:
+        bulk: asyncio.Queue = asyncio.Queue(maxsize=2)
+        slow: asyncio.Queue = asyncio.Queue()
+        bulk_worker = asyncio.create_task(self._bulk_worker(bulk))
+        slow_worker = asyncio.create_task(self._slow_worker(slow))
+        workers = [bulk_worker, slow_worker]
+
+        cutoff = utcnow() - BULK_DELETE_MAX_AGE
+        batch: List[Message] = []
+        try:
+            async for message in self.channel.history(
+                limit=self.limit,
+                before=self.before,
+                after=self.after,
+            ):
+                self.result.scanned += 1
+                if not self.matches(message):
+                    continue
+
+                if message.created_at < cutoff:
+                    if self.slow_path:
+                        await self._put(slow, message, slow_worker, workers)
+                    continue
+
+                batch.append(message)
+                if len(batch) >= BULK_DELETE_LIMIT:
+                    await self._put(bulk, batch, bulk_worker, workers)
+                    batch = []
+
+            if batch:
+                await self._put(bulk, batch, bulk_worker, workers)
+
+            await self._put(bulk, None, bulk_worker, workers)
+            await self._put(slow, None, slow_worker, workers)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        return self.result
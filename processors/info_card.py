@@ -0,0 +1,378 @@
+from io import BytesIO
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_PATH = "assets/fonts/Montserrat-Bold.ttf"
+BACKGROUND_COLOR = "#09090B"
+CARD_COLOR = "#111113"
+TEXT_COLOR = "#FFFFFF"
+ACCENT_COLOR = "#5C7CFA"
+MUTED_COLOR = "#71717A"
+
+Rect = Tuple[int, int, int, int]
+
+INFO_CARDS: Tuple[Rect, ...] = (
+    (40, 20, 400, 100),
+    (460, 20, 340, 100),
+    (820, 20, 340, 100),
+    (40, 135, 540, 160),
+    (600, 135, 560, 160),
+    (60, 195, 150, 80),
+    (240, 195, 150, 80),
+    (420, 195, 150, 80),
+    (620, 195, 150, 80),
+    (800, 195, 150, 80),
+    (980, 195, 150, 80),
+    (40, 310, 540, 300),
+    (600, 310, 560, 300),
+    (40, 625, 1120, 260),
+)
+LAYOUTS: Dict[str, Tuple[Tuple[int, int], Tuple[Rect, ...]]] = {
+    "server": (
+        (1200, 940),
+        INFO_CARDS
+        + tuple((60, 370 + i * 80, 500, 70) for i in range(3))
+        + tuple((620, 370 + i * 80, 520, 70) for i in range(3)),
+    ),
+    "user": (
+        (1200, 940),
+        INFO_CARDS
+        + tuple((60, 370 + i * 57, 500, 55) for i in range(3))
+        + tuple((620, 370 + i * 57, 520, 55) for i in range(3)),
+    ),
+    "chart": (
+        (1200, 650),
+        (
+            (40, 20, 400, 100),
+            (460, 20, 340, 100),
+            (820, 20, 340, 100),
+            (40, 140, 1120, 460),
+            (860, 155, 180, 35),
+            (1050, 155, 90, 35),
+        ),
+    ),
+}
+
+
+@lru_cache(maxsize=16)
+def get_font(size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(FONT_PATH, size)
+
+
+def draw_card(draw: ImageDraw.ImageDraw, x: int, y: int, width: int, height: int, radius: int = 12) -> None:
+    """Draw a rounded rectangle card"""
+    draw.pieslice([x, y, x + radius * 2, y + radius * 2], 180, 270, fill=CARD_COLOR)
+    draw.pieslice([x + width - radius * 2, y, x + width, y + radius * 2], 270, 0, fill=CARD_COLOR)
+    draw.pieslice([x, y + height - radius * 2, x + radius * 2, y + height], 90, 180, fill=CARD_COLOR)
+    draw.pieslice([x + width - radius * 2, y + height - radius * 2, x + width, y + height], 0, 90, fill=CARD_COLOR)
+
+    draw.rectangle([x + radius, y, x + width - radius, y + height], fill=CARD_COLOR)
+    draw.rectangle([x, y + radius, x + width, y + height - radius], fill=CARD_COLOR)
+
+
+@lru_cache(maxsize=len(LAYOUTS))
+def base_layer(layout: str) -> Image.Image:
+    """The background and every static card of a layout, drawn once per worker."""
+    size, cards = LAYOUTS[layout]
+    image = Image.new("RGB", size, BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    for card in cards:
+        draw_card(draw, *card)
+
+    return image
+
+
+def truncate_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: int) -> str:
+    width = draw.textlength(text, font=font)
+    if width <= max_width:
+        return text
+
+    while width > max_width and len(text) > 0:
+        text = text[:-1]
+        width = draw.textlength(text + "...", font=font)
+    return text + "..."
+
+
+def paste_avatar(image: Image.Image, data: Optional[bytes]) -> None:
+    if not data:
+        return
+
+    avatar = Image.open(BytesIO(data)).resize((80, 80))
+    mask = Image.new("L", avatar.size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, 80, 80), fill=255)
+    image.paste(avatar, (60, 30), mask)
+
+
+def paste_footer(image: Image.Image, draw: ImageDraw.ImageDraw, logo_data: Optional[bytes], y: int) -> None:
+    if not logo_data:
+        return
+
+    powered_font = get_font(18)
+    powered_text = "Powered by Pride"
+    text_width = int(draw.textlength(powered_text, font=powered_font))
+
+    logo = Image.open(BytesIO(logo_data)).resize((24, 24))
+    image.paste(logo, (int(1160 - text_width - 30), y - 2), logo if logo.mode == "RGBA" else None)
+    draw.text((1160 - text_width, y), powered_text, MUTED_COLOR, font=powered_font)
+
+
+def to_png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def smooth(x, data: Sequence[float]):
+    import numpy as np
+    from scipy.interpolate import make_interp_spline
+
+    x_smooth = np.linspace(x.min(), x.max(), 200)
+    return x_smooth, np.maximum(make_interp_spline(x, data, k=2)(x_smooth), 0)
+
+
+def render_figure(fig) -> Image.Image:
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", transparent=True, dpi=100, bbox_inches="tight", pad_inches=0.1)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def activity_chart(messages: List[float], voice: List[float], days: List[str], width: int = 1060, height: int = 180) -> Image.Image:
+    import numpy as np
+    from matplotlib import style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    max_messages = max(messages) if max(messages) > 0 else 1
+    voice = [v * (max_messages / max(voice) if max(voice) > 0 else 1) * 0.8 for v in voice]
+    x = np.array(range(len(days)))
+    x_smooth, messages_smooth = smooth(x, messages)
+    _, voice_smooth = smooth(x, voice)
+
+    with style.context("dark_background"):
+        fig = Figure(figsize=(width / 80, height / 80))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+
+        ax.set_xlim(-0.3, len(days) - 0.7)
+        ax.set_ylim(0, max(max(messages_smooth), max(voice_smooth)) * 1.15)
+
+        ax.plot(x_smooth, messages_smooth, color="#5C7CFA", linewidth=2.5, label="Messages")
+        ax.plot(x_smooth, voice_smooth, color="#10B981", linewidth=2.5, label="Voice Hours")
+
+        ax.scatter(x, messages, color="#5C7CFA", s=35, zorder=5)
+        ax.scatter(x, voice, color="#10B981", s=35, zorder=5)
+
+        ax.fill_between(x_smooth, messages_smooth, alpha=0.1, color="#5C7CFA")
+        ax.fill_between(x_smooth, voice_smooth, alpha=0.1, color="#10B981")
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(days, color="#A1A1AA", fontsize=8)
+        ax.grid(True, color="#27272A", alpha=0.2)
+
+        ax.set_facecolor(CARD_COLOR)
+        fig.patch.set_facecolor(CARD_COLOR)
+
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        ax.legend(loc="lower right", frameon=False, labelcolor="#A1A1AA", fontsize=8)
+        fig.subplots_adjust(left=0.02, right=0.98, top=0.98, bottom=0.02)
+        chart = render_figure(fig)
+
+    return chart.resize((1100, 180), Image.Resampling.LANCZOS)
+
+
+def detailed_chart(data: List[float], days: List[str], width: int = 1060, height: int = 350) -> Image.Image:
+    import numpy as np
+    from matplotlib import style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    x = np.array(range(len(days)))
+    x_smooth, smooth_data = smooth(x, data)
+
+    with style.context("dark_background"):
+        fig = Figure(figsize=(width / 100, height / 100))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+
+        ax.set_xlim(-0.2, len(days) - 0.8)
+        max_val = max(smooth_data) if max(smooth_data) > 0 else 1
+        ax.set_ylim(0, max_val * 1.1)
+
+        yticks = np.linspace(0, max_val, 6)
+        ax.set_yticks(yticks)
+        ax.set_yticklabels([f"{int(y):,}" for y in yticks], color="#71717A", fontsize=8)
+
+        ax.plot(x_smooth, smooth_data, color=ACCENT_COLOR, linewidth=2.5)
+        ax.scatter(x, data, color=ACCENT_COLOR, s=35, zorder=5)
+        ax.fill_between(x_smooth, smooth_data, alpha=0.1, color=ACCENT_COLOR)
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(days, color="#71717A", fontsize=8)
+        ax.grid(True, color="#27272A", alpha=0.2)
+
+        ax.set_facecolor(CARD_COLOR)
+        fig.patch.set_facecolor(CARD_COLOR)
+
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.spines["left"].set_visible(True)
+        ax.spines["left"].set_color("#27272A")
+
+        fig.tight_layout(pad=0.5)
+        return render_figure(fig)
+
+
+def render_server_info(payload: Dict[str, Any]) -> bytes:
+    """Render the server statistics card from a plain payload."""
+    image = base_layer("server").copy()
+    draw = ImageDraw.Draw(image)
+
+    title_font, header_font = get_font(42), get_font(28)
+    text_font, period_font, stats_font = get_font(22), get_font(24), get_font(26)
+    stats = payload["stats"]
+
+    paste_avatar(image, payload.get("icon"))
+
+    draw.text((160, 35), truncate_text(draw, payload["name"], title_font, 280), TEXT_COLOR, font=title_font)
+    draw.text((160, 85), "Server Statistics", MUTED_COLOR, font=text_font)
+
+    draw.text((480, 35), "Created", TEXT_COLOR, font=header_font)
+    draw.text((480, 70), payload["created_at"], ACCENT_COLOR, font=text_font)
+
+    draw.text((840, 35), "Bot Added", TEXT_COLOR, font=header_font)
+    draw.text((840, 70), payload["bot_added"], ACCENT_COLOR, font=text_font)
+
+    periods = ["1d", "7d", "14d"]
+    draw.text((60, 145), "Messages", TEXT_COLOR, font=header_font)
+    for x, period in zip([80, 260, 440], periods):
+        draw.text((x, 200), period, ACCENT_COLOR, font=period_font)
+        draw.text((x, 230), f"{stats.get(f'messages_{period}', 0):,}", TEXT_COLOR, font=stats_font)
+
+    draw.text((620, 145), "Voice Activity", TEXT_COLOR, font=header_font)
+    for x, period in zip([640, 820, 1000], periods):
+        draw.text((x, 200), period, ACCENT_COLOR, font=period_font)
+        draw.text((x, 230), f"{stats.get(f'voice_{period}', 0):.1f}h", TEXT_COLOR, font=stats_font)
+
+    for column, title, prefix in ((60, "Top Members", ""), (620, "Top Channels", "#")):
+        draw.text((column, 325), title, TEXT_COLOR, font=header_font)
+        for i, (name, count) in enumerate(payload["members" if not prefix else "channels"]):
+            y = 370 + i * 80
+            draw.text((column + 20, y + 10), f"{prefix}{name}", TEXT_COLOR, font=text_font)
+            draw.text((column + 20, y + 35), count, ACCENT_COLOR, font=text_font)
+
+    draw.text((60, 640), "Activity Overview", TEXT_COLOR, font=header_font)
+    chart = activity_chart(payload["messages_series"], payload["voice_series"], payload["days"])
+    image.paste(chart, (60, 680), chart if chart.mode == "RGBA" else None)
+
+    paste_footer(image, draw, payload.get("logo"), 905)
+    return to_png(image)
+
+
+def render_user_info(payload: Dict[str, Any]) -> bytes:
+    """Render the member statistics card from a plain payload."""
+    image = base_layer("user").copy()
+    draw = ImageDraw.Draw(image)
+
+    title_font, header_font = get_font(42), get_font(28)
+    text_font, stats_font = get_font(22), get_font(26)
+    stats = payload["stats"]
+
+    paste_avatar(image, payload.get("avatar"))
+
+    draw.text((160, 35), payload["name"], TEXT_COLOR, font=title_font)
+    draw.text((160, 85), payload["display_name"], MUTED_COLOR, font=text_font)
+
+    draw.text((480, 35), "Created", TEXT_COLOR, font=header_font)
+    draw.text((480, 70), payload["created_at"], ACCENT_COLOR, font=text_font)
+
+    draw.text((840, 35), "Joined", TEXT_COLOR, font=header_font)
+    draw.text((840, 70), payload["joined_at"], ACCENT_COLOR, font=text_font)
+
+    periods = ["1d", "7d", "14d"]
+    for column, title, key, fmt in (
+        (60, "Message Stats", "messages", "{}"),
+        (620, "Voice Stats", "voice", "{:.1f}h"),
+    ):
+        draw.text((column, 145), title, TEXT_COLOR, font=header_font)
+        for i, period in enumerate(periods):
+            x_pos = column + (i * 180)
+
+            past_text = f"Past {period}"
+            past_x = x_pos + (150 - draw.textlength(past_text, font=text_font)) // 2
+            draw.text((past_x, 205), past_text, TEXT_COLOR, font=text_font)
+
+            value = fmt.format(stats[key][period])
+            value_x = x_pos + (150 - draw.textlength(value, font=stats_font)) // 2
+            draw.text((value_x, 235), value, ACCENT_COLOR, font=stats_font)
+
+    for column, title, key, fmt, value_x in (
+        (60, "Message Activity", "messages", "{} messages", 400),
+        (620, "Voice Activity", "voice", "{:.1f} hours", 980),
+    ):
+        draw.text((column, 325), title, TEXT_COLOR, font=header_font)
+        for i, period in enumerate(periods):
+            y_pos = 370 + (i * 57)
+            draw.text((column + 20, y_pos + 15), f"Past {period}:", TEXT_COLOR, font=text_font)
+            draw.text((value_x, y_pos + 15), fmt.format(stats[key][period]), ACCENT_COLOR, font=text_font)
+
+    draw.text((60, 640), "Activity Overview", TEXT_COLOR, font=header_font)
+    chart = activity_chart(payload["messages_series"], payload["voice_series"], payload["days"])
+    image.paste(chart, (60, 680), chart if chart.mode == "RGBA" else None)
+
+    paste_footer(image, draw, payload.get("logo"), 905)
+    return to_png(image)
+
+
+def render_chart(payload: Dict[str, Any]) -> bytes:
+    """Render a detailed message or voice activity chart from a plain payload."""
+    image = base_layer("chart").copy()
+    draw = ImageDraw.Draw(image)
+
+    title_font, header_font = get_font(42), get_font(28)
+    text_font, stats_font = get_font(22), get_font(16)
+    y_pos = 140
+
+    paste_avatar(image, payload.get("icon"))
+
+    draw.text((160, 35), truncate_text(draw, payload["name"], title_font, 280), TEXT_COLOR, font=title_font)
+    draw.text((160, 85), "Server Statistics", MUTED_COLOR, font=text_font)
+
+    draw.text((480, 35), "Created", TEXT_COLOR, font=header_font)
+    draw.text((480, 75), payload["created_at"], ACCENT_COLOR, font=text_font)
+
+    draw.text((840, 35), "Members", TEXT_COLOR, font=header_font)
+    draw.text((840, 75), str(payload["member_count"]), ACCENT_COLOR, font=text_font)
+
+    is_messages = payload["type"] == "messages"
+    draw.text(
+        (60, y_pos + 15),
+        "Message Activity" if is_messages else "Voice Activity",
+        TEXT_COLOR,
+        font=header_font,
+    )
+
+    label, value = (
+        ("Messages:", f"{int(payload['total']):,}")
+        if is_messages
+        else ("Hours:", f"{payload['total']:.1f}")
+    )
+    label_width = int(draw.textlength(label, font=stats_font))
+    draw.text((870, y_pos + 25), label, MUTED_COLOR, font=stats_font)
+    draw.text((870 + label_width + 5, y_pos + 25), value, ACCENT_COLOR, font=stats_font)
+
+    active_text = "Active:"
+    active_label_width = int(draw.textlength(active_text, font=stats_font))
+    draw.text((1060, y_pos + 25), active_text, MUTED_COLOR, font=stats_font)
+    draw.text((1060 + active_label_width + 5, y_pos + 25), str(payload["active_members"]), ACCENT_COLOR, font=stats_font)
+
+    chart = detailed_chart(payload["series"], payload["days"])
+    image.paste(chart, (60, y_pos + 60), chart if chart.mode == "RGBA" else None)
+
+    paste_footer(image, draw, payload.get("logo"), 615)
+    return to_png(image)
@@ -0,0 +1,5 @@
+import os
+
+# config validates these at import time.
+os.environ.setdefault("DISCORD_TOKEN", "test")
+os.environ.setdefault("OWNER_IDS", "1")
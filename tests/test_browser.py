@@ -0,0 +1,169 @@
+import asyncio
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("playwright.async_api")
+
+from playwright.async_api import Error
+
+from core.browser import BrowserHandler
+
+FIXTURES = Path(__file__).parent / "fixtures" / "browser"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def site():
+    """Serve the HTML fixtures over HTTP, cookies and storage need a real origin."""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(FIXTURES)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest_asyncio.fixture
+async def pool():
+    handlers = []
+
+    async def create(**kwargs) -> BrowserHandler:
+        handler = BrowserHandler(**kwargs)
+        try:
+            await handler.init()
+        except Error as exc:
+            pytest.skip(f"Chromium is unavailable: {exc.message.splitlines()[0]}")
+
+        handlers.append(handler)
+        return handler
+
+    yield create
+    for handler in handlers:
+        await handler.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_closed_idle_page_is_replaced(pool):
+    browser = await pool(contexts=1, min_pages=1, max_pages=1)
+    pooled = await browser.acquire()
+    await browser.release(pooled)
+    await pooled.page.close()
+
+    replacement = await browser.acquire()
+    assert replacement is not pooled
+    assert not replacement.page.is_closed()
+    assert browser.stats["pages"] == 1
+    await browser.release(replacement)
+
+
+@pytest.mark.asyncio
+async def test_borrowed_page_is_released(pool, site):
+    browser = await pool(contexts=1, min_pages=1, max_pages=1)
+    with pytest.raises(ValueError):
+        async with browser.borrow_page() as page:
+            await page.goto(f"{site}/index.html")
+            raise ValueError
+
+    assert browser.stats["in_use"] == 0
+    async with browser.borrow_page() as again:
+        assert again is page
+
+
+@pytest.mark.asyncio
+async def test_hung_page_fails_health_check(pool, site, monkeypatch):
+    monkeypatch.setattr("core.browser.HEALTH_TIMEOUT", 0.5)
+    monkeypatch.setattr("core.browser.RESET_TIMEOUT", 0.5)
+    browser = await pool(contexts=1, min_pages=1, max_pages=2)
+    pooled = await browser.acquire()
+    await pooled.page.goto(f"{site}/busy.html")
+    await asyncio.sleep(0.3)
+
+    assert not await browser._healthy(pooled)
+
+    await browser.release(pooled)
+    assert pooled.page.is_closed()
+    assert browser.stats["pages"] == 0
+
+
+@pytest.mark.asyncio
+async def test_page_recycled_after_max_uses(pool, site):
+    browser = await pool(contexts=1, min_pages=1, max_pages=1, max_uses=2)
+    first = await browser.acquire()
+    await first.page.goto(f"{site}/index.html")
+    await browser.release(first)
+
+    again = await browser.acquire()
+    assert again is first
+    await browser.release(again)
+
+    third = await browser.acquire()
+    assert third is not first
+    assert first.page.is_closed()
+    await browser.release(third)
+
+
+@pytest.mark.asyncio
+async def test_context_rotated_after_context_uses(pool, site):
+    browser = await pool(contexts=1, min_pages=1, max_pages=1, context_uses=2)
+    first = await browser.acquire()
+    slot = first.slot
+    await first.page.goto(f"{site}/index.html")
+    await browser.release(first)
+    await browser.release(await browser.acquire())
+
+    rotated = await browser.acquire()
+    assert rotated.slot is not slot
+    assert browser.stats["contexts"] == 1
+    await browser.release(rotated)
+
+
+@pytest.mark.asyncio
+async def test_reset_clears_cookies_and_storage(pool, site):
+    browser = await pool(contexts=1, min_pages=1, max_pages=1)
+    pooled = await browser.acquire()
+    await pooled.page.goto(f"{site}/storage.html")
+    assert await pooled.page.evaluate("() => document.cookie") == "session=leaked"
+    await browser.release(pooled)
+
+    fresh = await browser.acquire()
+    await fresh.page.goto(f"{site}/index.html")
+    assert await fresh.page.evaluate("() => document.cookie") == ""
+    assert await fresh.page.evaluate("() => localStorage.length") == 0
+    assert await fresh.page.evaluate("() => sessionStorage.length") == 0
+    assert fresh.slot is not pooled.slot
+    await browser.release(fresh)
+
+
+@pytest.mark.asyncio
+async def test_pool_grows_with_queue_depth(pool):
+    browser = await pool(contexts=2, min_pages=1, max_pages=3)
+    held = [await browser.acquire() for _ in range(3)]
+    assert browser.stats["pages"] == 3
+
+    waiter = asyncio.create_task(browser.acquire())
+    await asyncio.sleep(0.1)
+    assert browser.stats["queued"] == 1
+    assert not waiter.done()
+
+    await browser.release(held.pop())
+    held.append(await asyncio.wait_for(waiter, 5))
+    assert browser.stats["pages"] == 3
+
+    for pooled in held:
+        await browser.release(pooled)
+
+    # Demand decays with every quiet acquire, the pool shrinks back with it.
+    for _ in range(30):
+        await browser.release(await browser.acquire())
+
+    assert browser.stats["pages"] == 1
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import pytest_asyncio
+
+from core.jobs import JobQueue, JobTimeout, Priority, ResultTooLarge
+
+
+@pytest_asyncio.fixture
+async def jobs():
+    queue = JobQueue(workers=1, timeout=5, max_result_size=None, inline=True)
+    await queue.start()
+    yield queue
+    await queue.stop()
+
+
+def occupy(jobs: JobQueue) -> threading.Event:
+    """Keep the only worker busy until the returned event is set."""
+
+    release = threading.Event()
+    jobs.submit(release.wait, 5)
+    return release
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_runs_first(jobs: JobQueue):
+    ran = []
+    release = occupy(jobs)
+    await asyncio.sleep(0.05)
+
+    handles = [
+        jobs.submit(ran.append, priority.name, priority=priority)
+        for priority in (Priority.LOW, Priority.NORMAL, Priority.HIGH, Priority.NORMAL)
+    ]
+    release.set()
+    await asyncio.gather(*handles)
+
+    assert ran == ["HIGH", "NORMAL", "NORMAL", "LOW"]
+
+
+@pytest.mark.asyncio
+async def test_timeout(jobs: JobQueue):
+    with pytest.raises(JobTimeout):
+        await jobs.submit(time.sleep, 1, timeout=0.05)
+
+    # The worker is handed back and keeps serving jobs.
+    assert await jobs.run(sum, (1, 2)) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_job(jobs: JobQueue):
+    ran = []
+    release = occupy(jobs)
+    await asyncio.sleep(0.05)
+
+    handle = jobs.submit(ran.append, "cancelled")
+    assert handle.cancel()
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await handle
+
+    assert await jobs.run(ran.append, "next") is None
+    assert ran == ["next"]
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_job(jobs: JobQueue):
+    release = threading.Event()
+    handle = jobs.submit(release.wait, 5)
+    await asyncio.sleep(0.05)
+
+    handle.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await handle
+
+    release.set()
+    assert await jobs.run(sum, (2, 2)) == 4
+
+
+@pytest.mark.asyncio
+async def test_result_size_limit(jobs: JobQueue):
+    with pytest.raises(ResultTooLarge) as exc:
+        await jobs.submit(bytes, 4096, max_result_size=1024)
+
+    assert exc.value.limit == 1024
+    assert exc.value.size > 1024
+    assert await jobs.run(bytes, 16, max_result_size=1024) == bytes(16)
+
+
+@pytest.mark.asyncio
+async def test_rejects_coroutine_functions(jobs: JobQueue):
+    async def job():
+        return 1
+
+    with pytest.raises(TypeError):
+        jobs.submit(job)
@@ -0,0 +1,332 @@
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from prometheus_client import REGISTRY, Counter, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+import config
+from utils.logger import log
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "PostgreSQL statement latency",
+    ["statement"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to acquire a pooled connection",
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+REST_REQUEST_SECONDS = Histogram(
+    "discord_rest_request_seconds",
+    "Discord REST latency by route bucket",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+RATELIMIT_HITS = Counter(
+    "discord_ratelimit_hits_total",
+    "Discord REST responses which hit a rate limit",
+    ["route", "scope"],
+)
+GATEWAY_EVENTS = Counter(
+    "discord_gateway_events_total",
+    "Dispatched gateway events by type",
+    ["event"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+TRACE_SPANS = Counter(
+    "trace_spans_total",
+    "Finished spans by sampling outcome",
+    ["outcome"],
+)
+METRIC_SERIES_DROPPED = Counter(
+    "metric_series_dropped_total",
+    "Label values collapsed into the other bucket after a label budget ran out",
+    ["metric", "label"],
+)
+
+_STATEMENT = re.compile(
+    r"^\s*(?:WITH\b.*?\)\s*)?(SELECT|INSERT\s+INTO|UPDATE|DELETE\s+FROM|UPSERT|CREATE|ALTER|DROP|TRUNCATE)\b"
+    r"(?:.*?\b(?:FROM|INTO|UPDATE|JOIN)\s+|\s+)?([\w.\"]+)?",
+    re.IGNORECASE | re.DOTALL,
+)
+_exporter_port: Optional[int] = None
+_budgets: Dict[str, "BudgetedCounter"] = {}
+
+
+@lru_cache(maxsize=4096)
+def statement_label(query: str) -> str:
+    """
+    A low-cardinality label for a SQL statement, e.g. `select guildconfig`.
+
+    Arguments never reach the query text, so the verb and first
+    table identify the statement well enough for a dashboard.
+    """
+
+    match = _STATEMENT.match(query)
+    if not match:
+        return "other"
+
+    verb = match.group(1).split()[0].lower()
+    table = (match.group(2) or "").strip('"').lower()
+    return f"{verb} {table}".strip()
+
+
+@contextmanager
+def observe(histogram, **labels: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(
+            time.perf_counter() - started
+        )
+
+
+class CacheCounter:
+    """Hit and miss counters for one named cache."""
+
+    __slots__ = ("hit", "miss")
+
+    def __init__(self, name: str):
+        self.hit = CACHE_REQUESTS.labels(cache=name, result="hit")
+        self.miss = CACHE_REQUESTS.labels(cache=name, result="miss")
+
+
+class GatewayCounter:
+    """Per-event counters, resolved once per event name."""
+
+    def __init__(self) -> None:
+        self._children: Dict[str, Counter] = {}
+
+    def inc(self, event: str) -> None:
+        try:
+            child = self._children[event]
+        except KeyError:
+            child = self._children[event] = GATEWAY_EVENTS.labels(event=event)
+
+        child.inc()
+
+
+class TopK:
+    """
+    Space-Saving heavy hitters sketch.
+
+    Monitors `capacity` keys, a new key replaces the smallest one and
+    inherits its count as error, so any key whose true count exceeds
+    total / capacity is guaranteed to be among those monitored.
+    """
+
+    __slots__ = ("capacity", "counts", "errors")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, float] = {}
+        self.errors: Dict[str, float] = {}
+
+    def add(self, key: str, amount: float = 1.0) -> None:
+        if key in self.counts:
+            self.counts[key] += amount
+            return
+
+        floor = 0.0
+        if len(self.counts) >= self.capacity:
+            victim = min(self.counts, key=self.counts.__getitem__)
+            floor = self.counts.pop(victim)
+            del self.errors[victim]
+
+        self.counts[key] = floor + amount
+        self.errors[key] = floor
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class TopKCollector:
+    """Exposes a `TopK` sketch as one gauge family, e.g. `moderation_actions_top`."""
+
+    def __init__(self, name: str, documentation: str, label: str, k: int):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.k = k
+        self.sketch = TopK(k * 4)
+
+    def collect(self):
+        family = GaugeMetricFamily(self.name, self.documentation, labels=[self.label])
+        for key, count in self.sketch.top(self.k):
+            family.add_metric([key], count)
+
+        yield family
+
+
+class BudgetedChild:
+    __slots__ = ("child", "sketch", "key")
+
+    def __init__(self, child, sketch: TopK, key: str):
+        self.child = child
+        self.sketch = sketch
+        self.key = key
+
+    def inc(self, amount: float = 1) -> None:
+        self.child.inc(amount)
+        self.sketch.add(self.key, amount)
+
+
+class BudgetedCounter:
+    """
+    A counter whose `label` may only take `budget` distinct values.
+
+    The first values seen get their own series, every later one is
+    counted under `other` and reported once through
+    `metric_series_dropped_total`. The full per-value detail goes to a
+    top-K sketch exposed separately as `<name>_top`, so the busiest
+    values stay visible without a series for each of them.
+    """
+
+    OTHER = "other"
+    SEEN_DROPPED = 4096
+
+    def __init__(
+        self,
+        counter: Counter,
+        label: str,
+        budget: int = config.MONITORING.LABEL_BUDGET,
+        top_k: int = config.MONITORING.TOP_K,
+    ):
+        self.counter = counter
+        self.label = label
+        self.budget = budget
+        self._admitted: Set[str] = set()
+        self._dropped: OrderedDict[str, None] = OrderedDict()
+        self._dropped_series = METRIC_SERIES_DROPPED.labels(
+            metric=counter._name, label=label
+        )
+        self.top = TopKCollector(
+            f"{counter._name}_top",
+            f"Approximate top {top_k} {label} values of {counter._name}",
+            label,
+            top_k,
+        )
+        REGISTRY.register(self.top)
+
+    def _admit(self, value: str) -> str:
+        if value in self._admitted:
+            return value
+
+        if len(self._admitted) < self.budget:
+            self._admitted.add(value)
+            return value
+
+        # Remember recently dropped values so each is only reported once,
+        # bounded so an endless stream of new values can't grow it.
+        if value in self._dropped:
+            self._dropped.move_to_end(value)
+        else:
+            self._dropped[value] = None
+            self._dropped_series.inc()
+            if len(self._dropped) > self.SEEN_DROPPED:
+                self._dropped.popitem(last=False)
+
+        return self.OTHER
+
+    def labels(self, **labels: str) -> BudgetedChild:
+        value = str(labels[self.label])
+        labels[self.label] = self._admit(value)
+        return BudgetedChild(self.counter.labels(**labels), self.top.sketch, value)
+
+
+def budgeted(counter: Counter, label: str = "guild_id") -> BudgetedCounter:
+    """
+    Wrap `counter` in a label budget, once per metric name.
+
+    Modules re-creating their counters on reload get the existing
+    budget and sketch back, bound to the new counter.
+    """
+
+    budget = _budgets.get(counter._name)
+    if budget is None:
+        return _budgets.setdefault(counter._name, BudgetedCounter(counter, label))
+
+    budget.counter = counter
+    if budget.top not in REGISTRY._collector_to_names:
+        # Reloads unregister collectors by name prefix, the sketch included.
+        REGISTRY.register(budget.top)
+
+    return budget
+
+
+def metrics_port(cluster_id: int) -> int:
+    return config.MONITORING.METRICS_PORT + cluster_id
+
+
+def write_targets(cluster_count: int) -> None:
+    """
+    Write every cluster's exporter to the Prometheus file_sd targets,
+    so scraping follows CLUSTER_COUNT instead of a hardcoded port list.
+    """
+
+    path = config.MONITORING.METRICS_TARGETS
+    targets = [
+        {
+            "targets": [
+                f"{config.MONITORING.METRICS_HOST}:{metrics_port(cluster_id)}"
+                for cluster_id in range(cluster_count)
+            ],
+            "labels": {"service": config.MONITORING.SERVICE_NAME},
+        }
+    ]
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Prometheus watches the file, swap it in whole.
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(targets, file, indent=2)
+
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        log.error(f"Failed to write metrics targets to {path}: {e}")
+
+
+def start_exporter(cluster_id: int) -> Optional[int]:
+    """
+    Serve the process-wide registry on the cluster's fixed port.
+
+    Every cluster runs in its own process, so the port is derived
+    from the cluster id rather than probed for.
+    """
+
+    global _exporter_port
+    if _exporter_port is not None:
+        return _exporter_port
+
+    port = metrics_port(cluster_id)
+    try:
+        start_http_server(port)
+    except OSError as e:
+        log.error(f"Failed to serve metrics on :{port}: {e}")
+        return None
+
+    _exporter_port = port
+    log.info(f"Prometheus metrics available at :{port}/metrics")
+    return port
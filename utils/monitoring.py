@@ -1,13 +1,5 @@
-from opentelemetry import trace, metrics
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
-from opentelemetry.exporter.prometheus import PrometheusMetricReader
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.instrumentation.aiohttp_client import AioHttpClientInstrumentor
-from prometheus_client import start_http_server
 from pyinstrument import Profiler
 from typing import Optional, Dict
 from collections import defaultdict
@@ -15,75 +7,25 @@ import time
 import functools
 import config
 from utils.logger import log
+from utils.tracing import get_tracer, setup_tracing, shutdown_tracing
 import logging
-import socket
 
 logging.getLogger('opentelemetry').setLevel(logging.ERROR)
-logging.getLogger('distributed').setLevel(logging.ERROR)
 logging.getLogger('asyncio').setLevel(logging.ERROR)
 
-def is_port_in_use(port: int) -> bool:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        try:
-            s.bind(('', port))
-            return False
-        except OSError:
-            return True
-
 class PerformanceMonitoring:
+    """
+    OpenTelemetry tracer and client instrumentation for the process.
+
+    Created once per cluster process by `setup_monitoring`, instrumenting
+    the HTTP clients a second time would wrap them twice. Metrics are
+    plain prometheus_client metrics, see `utils.metrics`.
+    """
+
     def __init__(self, service_name: str = "evict-bot"):
         try:
-            resource = Resource.create({
-                "service.name": service_name,
-                "environment": "production"
-            })
-            
-            trace_provider = TracerProvider(resource=resource)
-            trace.set_tracer_provider(trace_provider)
-            self.tracer = trace.get_tracer(service_name)
-            
-            log.info("Jaeger exporter disabled (external service not available in Replit)")
-
-            reader = PrometheusMetricReader()
-            meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
-            metrics.set_meter_provider(meter_provider)
-            self.meter = metrics.get_meter(service_name)
-            
-            base_port = 28000
-            max_attempts = 10
-            prometheus_port = None
-            
-            for port in range(base_port, base_port + max_attempts):
-                if not is_port_in_use(port):
-                    prometheus_port = port
-                    break
-            
-            if prometheus_port is None:
-                log.warning("Could not find available port for Prometheus metrics")
-                self.metrics_enabled = False
-            else:
-                start_http_server(port=prometheus_port)
-                self.metrics_enabled = True
-                log.info(f"Prometheus metrics available at :{prometheus_port}/metrics")
-            
-            if self.metrics_enabled:
-                self.command_counter = self.meter.create_counter(
-                    name="bot_commands",
-                    description="Number of commands executed",
-                    unit="1"
-                )
-                
-                self.command_duration = self.meter.create_histogram(
-                    name="command_duration",
-                    description="Duration of command execution",
-                    unit="ms"
-                )
-                
-                self.guild_gauge = self.meter.create_up_down_counter(
-                    name="guild_count",
-                    description="Number of guilds the bot is in",
-                    unit="1"
-                )
+            setup_tracing()
+            self.tracer = get_tracer("bot")
 
             RequestsInstrumentor().instrument()
             AioHttpClientInstrumentor().instrument()
@@ -138,7 +80,7 @@ class PerformanceMonitoring:
 
     def shutdown(self):
         """Cleanup monitoring resources."""
-        pass
+        shutdown_tracing()
 
     def create_span(self, name: str, attributes: dict = None):
         """Create a new span with optional attributes."""
@@ -152,69 +94,28 @@ class PerformanceMonitoring:
             log.error(f"Failed to create span {name}: {e}")
             return None
 
-    async def record_metric(self, name: str, value: float, attributes: dict = None):
-        """Record a metric with optional attributes."""
-        try:
-            with self.tracer.start_span(name) as span:
-                span.set_attribute("value", value)
-                if attributes:
-                    for key, value in attributes.items():
-                        span.set_attribute(key, value)
-        except Exception as e:
-            log.error(f"Failed to record metric {name}: {e}")
 
-    def record_command(self, command_name: str, guild_id: str = None):
-        """Record a command execution."""
-        if not hasattr(self, 'metrics_enabled') or not self.metrics_enabled:
-            return
-        try:
-            self.command_counter.add(1, {"command": command_name, "guild": guild_id})
-        except Exception as e:
-            log.error(f"Failed to record command metric: {e}")
-
-    def time_command(self, command_name: str):
-        """Context manager to time command execution."""
-        if not hasattr(self, 'metrics_enabled') or not self.metrics_enabled:
-            return lambda: None
-            
-        start_time = time.time()
-        
-        def _record_duration():
-            try:
-                duration = (time.time() - start_time) * 1000
-                self.command_duration.record(duration, {"command": command_name})
-            except Exception as e:
-                log.error(f"Failed to record command duration: {e}")
-        
-        return _record_duration
-
-    def update_guild_count(self, count: int):
-        """Update the guild count metric."""
-        try:
-            self.guild_gauge.add(count)
-        except Exception as e:
-            log.error(f"Failed to update guild count: {e}")
+_monitoring: Optional[PerformanceMonitoring] = None
 
-monitoring = PerformanceMonitoring()
 
-def setup_monitoring():
-    """Setup monitoring with OpenTelemetry."""
-    resource = Resource.create({
-        "service.name": "evict.bot",
-        "service.version": "1.0.0"
-    })
+def setup_monitoring() -> PerformanceMonitoring:
+    """Set up tracing and monitoring for this process, once."""
+    global _monitoring
+    if _monitoring is None:
+        _monitoring = PerformanceMonitoring(config.MONITORING.SERVICE_NAME)
 
-    provider = TracerProvider(resource=resource)
-    trace.set_tracer_provider(provider)
+    return _monitoring
 
-    return provider
 
 def cleanup_monitoring():
     """Cleanup monitoring systems"""
+    if _monitoring is None:
+        return
+
     try:
-        monitoring.cleanup()
+        _monitoring.cleanup()
         log.info("Monitoring cleanup complete")
     except Exception as e:
         log.warning(f"Failed to cleanup monitoring: {e}")
 
-__all__ = ['monitoring', 'setup_monitoring', 'cleanup_monitoring'] 
\ No newline at end of file
+__all__ = ['PerformanceMonitoring', 'setup_monitoring', 'cleanup_monitoring']
@@ -1,7 +1,10 @@
 import os
 import psutil
-import onnxruntime
-from typing import Dict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    import onnxruntime
 
 def get_cpu_settings() -> Dict[str, str]:
     """Get optimal CPU environment settings"""
@@ -23,8 +26,11 @@ def get_cpu_settings() -> Dict[str, str]:
         "KMP_SETTINGS": "0"
     }
 
-def setup_onnx() -> onnxruntime.SessionOptions:
-    """Configure ONNX runtime settings"""
+@lru_cache(maxsize=1)
+def setup_onnx() -> "onnxruntime.SessionOptions":
+    """Configure ONNX runtime settings, importing the runtime on first use"""
+    import onnxruntime
+
     logical_cpu_count = psutil.cpu_count(logical=False)
     onnxruntime.set_default_logger_severity(3)
     
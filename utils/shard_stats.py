@@ -61,7 +61,7 @@ class ShardStatsManager:
             
             guilds = [g for g in self.bot.guilds if g.shard_id == shard_id]
             stats.guild_count = len(guilds)
-            stats.member_count = sum(g.member_count for g in guilds)
+            stats.member_count = sum(self.bot.member_cache.counts(g).total for g in guilds)
             stats.channel_count = sum(len(g.channels) for g in guilds)
             stats.voice_connections = len([vc for vc in self.bot.voice_clients 
                                         if vc.guild.shard_id == shard_id])
@@ -11,7 +11,7 @@ from pathlib import Path
 from secrets import token_hex
 from time import time
 from typing import TYPE_CHECKING, AsyncGenerator, Generator, List, Optional, Tuple, Union
-from urllib.parse import urlparse
+from urllib.parse import unquote_plus, urlparse
 
 from anyio import Path as AsyncPath
 from cairosvg import svg2png
@@ -35,7 +35,6 @@ from discord.ext import commands
 from discord.ui import Button as OriginalButton
 from discord.ui import View as OriginalView
 from jishaku.functools import executor_function
-from tornado.escape import url_unescape
 try:
     from wand.image import Image
     WAND_AVAILABLE = True
@@ -100,13 +99,13 @@ async def quietly_delete(message: Union[Message, PartialMessage]) -> None:
 
 def url_to_mime(url: str) -> Tuple[Optional[str], str]:
     """Get MIME type and suffix from URL."""
-    suffix = Path(urlparse(url_unescape(url)).path).suffix
+    suffix = Path(urlparse(unquote_plus(url)).path).suffix
     return (mimes.get(suffix, None), suffix)
 
 
 def get_filename(url: str) -> str:
     """Extract filename from URL."""
-    return AsyncPath(urlparse(url_unescape(url)).path).name
+    return AsyncPath(urlparse(unquote_plus(url)).path).name
 
 
 @asynccontextmanager
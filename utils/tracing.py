@@ -1,19 +1,344 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Sequence
+
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.context import Context
 from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_OFF,
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
 from opentelemetry.semconv.resource import ResourceAttributes
+from opentelemetry.trace import StatusCode
+
+import config
+from utils.logger import log
+from utils.metrics import TRACE_SPANS
+
+MAX_SPANS_PER_TRACE = 256
+MODES = ("off", "head", "tail", "always")
+
+_NOOP_TRACER = trace.NoOpTracer()
+_provider: Optional[TracerProvider] = None
+
+
+class TailSampler(Sampler):
+    """
+    Ratio head sampling which still records the traces it doesn't sample.
+
+    The head decision only sets the sampled flag, unsampled traces are
+    recorded so `TailSamplingProcessor` can keep them when they turn out
+    slow or errored.
+    """
+
+    def __init__(self, ratio: float):
+        self._head = TraceIdRatioBased(ratio)
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        parent = trace.get_current_span(parent_context).get_span_context()
+        if parent.is_valid:
+            decision = (
+                Decision.RECORD_AND_SAMPLE
+                if parent.trace_flags.sampled
+                else Decision.RECORD_ONLY
+            )
+            return SamplingResult(decision, attributes, parent.trace_state)
+
+        result = self._head.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        if result.decision is Decision.DROP:
+            return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+
+        return result
+
+    def get_description(self) -> str:
+        return f"TailSampler{{{self._head.get_description()}}}"
+
+
+class BoundedBatchExporter:
+    """
+    Feeds an exporter from a bounded queue on a background thread.
+
+    Batches go out once `max_batch` spans are queued or every `interval`
+    seconds. When the exporter falls behind new spans are dropped rather
+    than letting the queue grow.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = config.TRACING.MAX_QUEUE_SIZE,
+        max_batch: int = config.TRACING.MAX_EXPORT_BATCH,
+        interval: float = config.TRACING.EXPORT_INTERVAL,
+    ):
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_batch = max_batch
+        self.interval = interval
+
+        self._queue: Deque[ReadableSpan] = deque()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._thread = threading.Thread(
+            target=self._run, name="trace-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, spans: Sequence[ReadableSpan]) -> None:
+        with self._condition:
+            room = self.max_queue_size - len(self._queue)
+            if room < len(spans):
+                TRACE_SPANS.labels(outcome="queue_full").inc(len(spans) - max(room, 0))
+                spans = spans[: max(room, 0)]
+
+            self._queue.extend(spans)
+            if len(self._queue) >= self.max_batch:
+                self._condition.notify()
+
+    def _take(self) -> List[ReadableSpan]:
+        count = min(len(self._queue), self.max_batch)
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _export(self, batch: List[ReadableSpan]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            log.warning(f"Failed to export {len(batch)} spans: {e}")
+        else:
+            TRACE_SPANS.labels(outcome="exported").inc(len(batch))
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._shutdown or len(self._queue) >= self.max_batch,
+                    timeout=self.interval,
+                )
+                batch = self._take()
+                stopping = self._shutdown
+
+            if batch:
+                self._export(batch)
+
+            if stopping:
+                return
+
+    def force_flush(self) -> None:
+        while True:
+            with self._condition:
+                batch = self._take()
+
+            if not batch:
+                return
+
+            self._export(batch)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify()
+
+        self._thread.join(timeout=self.interval + 5)
+        self.force_flush()
+        self.exporter.shutdown()
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """
+    Buffers each trace's spans until its local root ends, then decides.
+
+    A trace is exported when the head sampler picked it, when any span
+    in it errored or when the root ran for at least `slow_threshold`
+    seconds. At most `max_traces` unfinished traces are buffered, the
+    oldest is dropped to make room.
+    """
+
+    def __init__(
+        self,
+        exporter: BoundedBatchExporter,
+        slow_threshold: Optional[float] = config.TRACING.SLOW_THRESHOLD,
+        max_traces: int = config.TRACING.MAX_PENDING_TRACES,
+    ):
+        self.exporter = exporter
+        self.slow_threshold = slow_threshold
+        self.max_traces = max_traces
+        self._traces: OrderedDict[int, List[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._kept_head = TRACE_SPANS.labels(outcome="kept_head")
+        self._kept_tail = TRACE_SPANS.labels(outcome="kept_tail")
+        self._discarded = TRACE_SPANS.labels(outcome="discarded")
+        self._evicted = TRACE_SPANS.labels(outcome="evicted")
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    @staticmethod
+    def _errored(span: ReadableSpan) -> bool:
+        if span.status.status_code is StatusCode.ERROR:
+            return True
+
+        return any(event.name == "exception" for event in span.events)
+
+    def _decide(self, root: ReadableSpan, spans: List[ReadableSpan]) -> None:
+        if root.context.trace_flags.sampled:
+            self._kept_head.inc(len(spans))
+        elif (
+            self.slow_threshold is not None
+            and (root.end_time - root.start_time) / 1e9 >= self.slow_threshold
+        ) or any(self._errored(span) for span in spans):
+            self._kept_tail.inc(len(spans))
+        else:
+            self._discarded.inc(len(spans))
+            return
+
+        self.exporter.submit(spans)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        local_root = span.parent is None or span.parent.is_remote
+
+        with self._lock:
+            spans = self._traces.pop(trace_id, None) if local_root else self._traces.get(trace_id)
+
+            if spans is None:
+                if local_root:
+                    spans = [span]
+                else:
+                    if len(self._traces) >= self.max_traces:
+                        _, evicted = self._traces.popitem(last=False)
+                        self._evicted.inc(len(evicted))
+
+                    self._traces[trace_id] = [span]
+                    return
+
+            elif len(spans) < MAX_SPANS_PER_TRACE:
+                spans.append(span)
+
+            if not local_root:
+                return
+
+        self._decide(span, spans)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        self.exporter.force_flush()
+        return True
+
+
+def create_exporter(name: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=config.MONITORING.OTLP_ENDPOINT)
+
+    if name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+
+    return None
+
+
+def build_provider(
+    mode: str = config.TRACING.MODE,
+    ratio: float = config.TRACING.SAMPLE_RATIO,
+    exporter: Optional[SpanExporter] = None,
+    resource: Optional[Resource] = None,
+) -> TracerProvider:
+    """A TracerProvider sampling and exporting according to `mode`."""
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown trace mode {mode!r}, expected one of {MODES}")
+
+    if exporter is None:
+        mode = "off"
+
+    sampler: Sampler
+    if mode == "off":
+        sampler = ALWAYS_OFF
+    elif mode == "always":
+        sampler = ALWAYS_ON
+    elif mode == "head":
+        sampler = ParentBased(TraceIdRatioBased(ratio))
+    else:
+        sampler = TailSampler(ratio)
+
+    provider = TracerProvider(resource=resource or Resource.create({}), sampler=sampler)
+    if mode != "off":
+        provider.add_span_processor(
+            TailSamplingProcessor(
+                BoundedBatchExporter(exporter),  # type: ignore
+                slow_threshold=config.TRACING.SLOW_THRESHOLD if mode == "tail" else None,
+            )
+        )
+
+    return provider
+
+
+def setup_tracing() -> TracerProvider:
+    """Install the process' TracerProvider, later calls return the same one."""
+
+    global _provider
+    if _provider is not None:
+        return _provider
+
+    resource = Resource.create({
+        ResourceAttributes.SERVICE_NAME: config.MONITORING.SERVICE_NAME,
+        ResourceAttributes.SERVICE_VERSION: "1.0.0",
+        ResourceAttributes.DEPLOYMENT_ENVIRONMENT: config.MONITORING.ENVIRONMENT,
+    })
+    exporter = create_exporter(config.TRACING.EXPORTER)
+    _provider = build_provider(exporter=exporter, resource=resource)
+    trace.set_tracer_provider(_provider)
+
+    log.info(
+        f"Tracing in {config.TRACING.MODE if exporter else 'off'} mode"
+        f" (ratio {config.TRACING.SAMPLE_RATIO}, exporter {config.TRACING.EXPORTER})"
+    )
+    return _provider
+
+
+def shutdown_tracing() -> None:
+    if _provider is not None:
+        _provider.shutdown()
+
 
-resource = Resource.create({
-    ResourceAttributes.SERVICE_NAME: "evict.bot",
-    ResourceAttributes.SERVICE_VERSION: "1.0.0",
-})
+def get_tracer(subsystem: str) -> trace.Tracer:
+    """
+    The tracer for a subsystem, or a no-op one if it is listed in
+    `TRACE_DISABLED`, so disabled spans cost nothing at all.
+    """
 
-provider = TracerProvider(resource=resource)
+    if subsystem in config.TRACING.DISABLED:
+        return _NOOP_TRACER
 
-# processor = BatchSpanProcessor(ConsoleSpanExporter())
-# provider.add_span_processor(processor)
+    return trace.get_tracer(f"evict.{subsystem}")
 
-trace.set_tracer_provider(provider)
 
-tracer = trace.get_tracer(__name__) 
\ No newline at end of file
+tracer = get_tracer("bot")